@@ -26,16 +26,22 @@
 
 import logging
 import re
+import sys
 from copy import deepcopy
 
 if MD_standalone:
-    from MD_Globals import (CMD_ATTR_PARAMS, CMD_STR_VAL_RAW, CMD_STR_VAL_UPP, CMD_STR_VAL_LOW, CMD_STR_VAL_CAP, CMD_STR_VALUE, CMD_STR_OPCODE, CMD_STR_PARAM, CMD_STR_CUSTOM, COMMAND_PARAMS, MINMAXKEYS)
+    from MD_Globals import (CMD_STR_VAL_RAW, CMD_STR_VAL_UPP, CMD_STR_VAL_LOW, CMD_STR_VAL_CAP, CMD_STR_VALUE, CMD_STR_OPCODE, CMD_STR_PARAM, CMD_STR_CUSTOM, COMMAND_PARAMS, MINMAXKEYS)
     import datatypes as DT
 else:
-    from .MD_Globals import (CMD_ATTR_PARAMS, CMD_STR_VAL_RAW, CMD_STR_VAL_UPP, CMD_STR_VAL_LOW, CMD_STR_VAL_CAP, CMD_STR_VALUE, CMD_STR_OPCODE, CMD_STR_PARAM, CMD_STR_CUSTOM, COMMAND_PARAMS, MINMAXKEYS)
+    from .MD_Globals import (CMD_STR_VAL_RAW, CMD_STR_VAL_UPP, CMD_STR_VAL_LOW, CMD_STR_VAL_CAP, CMD_STR_VALUE, CMD_STR_OPCODE, CMD_STR_PARAM, CMD_STR_CUSTOM, COMMAND_PARAMS, MINMAXKEYS)
     from . import datatypes as DT
 
 
+# loggers by device id and datatype instances by class, shared by all commands
+_loggers = {}
+_datatypes = {}
+
+
 #############################################################################################################################################################################################################################################
 #
 # class MD_Command
@@ -54,37 +60,51 @@ class MD_Command(object):
     dev_example/commands.py file.
 
     This class serves as a base class for further format-specific command types.
+
+    As many command objects are created, attributes are stored in slots. The
+    datatype instance is shared by all commands using the same DT class, so
+    DT classes must not keep state between calls.
+
+    Command objects are shared by all devices of one type, so the logger of
+    the calling device is supplied as 'logger' kwarg, as are the plugin params.
     """
-    device_id = ''
-    name = ''
-    opcode = ''
-    read = False
-    write = False
-    read_cmd = None
-    write_cmd = None
-    item_type = None
+    __slots__ = ('device_id', 'name', '_plugin_params', '_DT') + COMMAND_PARAMS
+
     reply_token = []
-    reply_pattern = ''
-    cmd_settings = None
-    lookup = None
-    _DT = None
 
     def __init__(self, device_id, command, dt_class, **kwargs):
 
-        # get MultiDevice.device logger (if not already defined by derived class calling us via super().__init__())
-        if not hasattr(self, 'logger'):
-            self.logger = logging.getLogger('.'.join(__name__.split('.')[:-1]) + f'.{device_id}')
+        # preset default values
+        self.device_id = ''
+        self.name = ''
+        self.opcode = ''
+        self.read = False
+        self.write = False
+        self.item_type = None
+        self.dev_datatype = None
+        self.read_cmd = None
+        self.write_cmd = None
+        self.reply_pattern = ''
+        self.cmd_settings = None
+        self.lookup = None
+        self.params = None
+        self.item_attrs = None
+        self._plugin_params = {}
+        self._DT = None
+
+        # logger of the device building the command, not stored as command is shared
+        logger = kwargs.get('logger') or self.logger
 
         if not device_id:
-            self.logger.warning(f'building command {command} without a device, aborting')
+            logger.warning(f'building command {command} without a device, aborting')
         else:
-            self.device_id = device_id
+            self.device_id = sys.intern(device_id)
 
         if not command:
-            self.logger.warning('building command without a name, aborting')
+            logger.warning('building command without a name, aborting')
             return
         else:
-            self.name = command
+            self.name = sys.intern(command)
 
         kw = kwargs['cmd']
         self._plugin_params = kwargs['plugin']
@@ -92,20 +112,22 @@ class MD_Command(object):
         self._get_kwargs(COMMAND_PARAMS, **kw)
 
         try:
-            self._DT = dt_class()
+            self._DT = _datatypes.get(dt_class)
+            if self._DT is None:
+                self._DT = _datatypes.setdefault(dt_class, dt_class())
         except Exception as e:
-            self.logger.error(f'building command {command} failed on instantiating datatype class {dt_class}. Error was: {e}')
+            logger.error(f'building command {command} failed on instantiating datatype class {dt_class}. Error was: {e}')
             self._DT = DT.DT_raw()
 
         # only log if base class. Derived classes log their own messages
         if self.__class__ is MD_Command:
-            self.logger.debug(f'learned command {command} with device datatype {dt_class} in {self.__class__.__name__}')
+            logger.debug(f'learned command {command} with device datatype {dt_class} in {self.__class__.__name__}')
 
     def get_send_data(self, data, **kwargs):
 
         cmd = None
 
-        data = self._check_value(data)
+        data = self._check_value(data, kwargs.get('logger'))
 
         # create read data
         if data is None:
@@ -122,9 +144,18 @@ class MD_Command(object):
         return {'payload': cmd, 'data': self._DT.get_send_data(data)}
 
     def get_shng_data(self, data, **kwargs):
+        kwargs.pop('logger', None)
         value = self._DT.get_shng_data(data, **kwargs)
         return value
 
+    @property
+    def logger(self):
+        """ MultiDevice.device_type logger, used if no device logger is supplied """
+        logger = _loggers.get(self.device_id)
+        if logger is None:
+            logger = _loggers.setdefault(self.device_id, logging.getLogger('.'.join(__name__.split('.')[:-1]) + f'.{self.device_id}'))
+        return logger
+
     def get_lookup(self):
         """ getter for lookup """
         return self.lookup
@@ -139,9 +170,12 @@ class MD_Command(object):
         """
         for arg in args:
             if kwargs.get(arg, None):
-                setattr(self, arg, kwargs[arg])
+                value = kwargs[arg]
+                if isinstance(value, str):
+                    value = sys.intern(value)
+                setattr(self, arg, value)
 
-    def _check_min_max(self, data, key, min=True, force=False):
+    def _check_min_max(self, data, key, min=True, force=False, logger=None):
         """ helper routine to check for min/max compliance and int/float type """
         if key in self.cmd_settings:
             bound = self.cmd_settings[key]
@@ -155,12 +189,12 @@ class MD_Command(object):
             if (min and data >= bound) or (not min and data <= bound):
                 return data
             if force:
-                self.logger.debug(f'Value {data} changed to {bound} due to cmd_settings {self.cmd_settings}')
+                (logger or self.logger).debug(f'Value {data} changed to {bound} due to cmd_settings {self.cmd_settings}')
                 return bound
             raise ValueError(f'value {data} not adhering to {"min" if min else "max"} value {bound}')
         return data
 
-    def _check_value(self, data):
+    def _check_value(self, data, logger=None):
         """
         check if value settings are defined and if so, if they are followed
         possibly adjust data in accordance with settings
@@ -168,11 +202,12 @@ class MD_Command(object):
         non-compliance will raise ValueError
 
         This can be overwritten; make sure to call
-        data = super()._check_value(data)
+        data = super()._check_value(data, logger)
         to run this code in addition to your own extension, if applicable.
         Take care of the sequence of changing data, though...
 
         :param data: data/value to send
+        :param logger: logger of the calling device
         :return: adjusted data
         """
         if data is not None:
@@ -190,7 +225,7 @@ class MD_Command(object):
                     # min/max not in addition to valid_list
                     elif any(key in self.cmd_settings.keys() for key in MINMAXKEYS):
                         for key in MINMAXKEYS:
-                            data = self._check_min_max(data, key, key[-3:] == 'min', key[:5] == 'force')
+                            data = self._check_min_max(data, key, key[-3:] == 'min', key[:5] == 'force', logger)
 
             except Exception as e:
                 raise ValueError(f'Given invalid value for command {self.name} due to settings. Error was: {e}')
@@ -228,34 +263,40 @@ class MD_Command_Str(MD_Command):
 
     This class is provided as a reference implementation for the Net-Connections.
     """
+    __slots__ = ()
+
     read_data = None
 
     def get_send_data(self, data, **kwargs):
 
-        self._plugin_params.update(kwargs)
-        data = self._check_value(data)
+        # plugin params and logger of the calling device, don't change the original dict
+        params = dict(kwargs.pop('plugin', self._plugin_params))
+        logger = kwargs.pop('logger', None)
+        params.update(kwargs)
+        data = self._check_value(data, logger)
 
         if data is None:
             # create read data
             if self.read_cmd:
-                cmd_str = self._parse_str(self.read_cmd, data, **kwargs)
+                cmd_str = self._parse_str(self.read_cmd, data, plugin=params, **kwargs)
             else:
-                cmd_str = self._parse_str(self.opcode, data, **kwargs)
+                cmd_str = self._parse_str(self.opcode, data, plugin=params, **kwargs)
         else:
             # create write data
             if self.write_cmd:
-                cmd_str = self._parse_str(self.write_cmd, data, **kwargs)
+                cmd_str = self._parse_str(self.write_cmd, data, plugin=params, **kwargs)
             else:
-                cmd_str = self._parse_str(self.opcode, data, **kwargs)
+                cmd_str = self._parse_str(self.opcode, data, plugin=params, **kwargs)
 
         data_dict = {}
         data_dict['payload'] = cmd_str
-        for k in self._plugin_params.keys():
-            data_dict[k] = self._parse_tree(self.params[k], data, **kwargs)
+        for k in params.keys():
+            data_dict[k] = self._parse_tree(self.params[k], data, plugin=params, **kwargs)
 
         return data_dict
 
     def get_shng_data(self, data, **kwargs):
+        kwargs.pop('logger', None)
         if isinstance(data, (bytes, bytearray)):
             data = data.decode('utf-8')
         value = self._DT.get_shng_data(data, **kwargs)
@@ -271,9 +312,13 @@ class MD_Command_Str(MD_Command):
 
         The replacement order ensures that PARAM-patterns from the opcode
         can be replaced as well as VALUE-pattern in any of the strings.
+
+        Plugin parameters are taken from kwargs['plugin'], if present.
         """
+        params = kwargs.get('plugin', self._plugin_params)
+
         def repl_func(matchobj):
-            return str(self._plugin_params.get(matchobj.group(2), ''))
+            return str(params.get(matchobj.group(2), ''))
 
         def cust_func(matchobj):
             if kwargs and 'custom' in kwargs:
@@ -361,24 +406,29 @@ class MD_Command_ParseStr(MD_Command_Str):
     might be an easier and cleaner solution. Please make sure to understand
     MRE by JF properly :)
     """
+    __slots__ = ()
+
 
     def get_send_data(self, data, **kwargs):
 
-        self._plugin_params.update(kwargs)
-        data = self._check_value(data)
+        # plugin params and logger of the calling device, don't change the original dict
+        params = dict(kwargs.pop('plugin', self._plugin_params))
+        logger = kwargs.pop('logger', None)
+        params.update(kwargs)
+        data = self._check_value(data, logger)
 
         if data is None:
             # create read data
             if self.read_cmd:
-                cmd_str = self._parse_str(self.read_cmd, data, **kwargs)
+                cmd_str = self._parse_str(self.read_cmd, data, plugin=params, **kwargs)
             else:
-                cmd_str = self._parse_str(self.opcode, data, **kwargs)
+                cmd_str = self._parse_str(self.opcode, data, plugin=params, **kwargs)
         else:
             # create write data
             if self.write_cmd:
-                cmd = self._parse_str(self.write_cmd, data, **kwargs)
+                cmd = self._parse_str(self.write_cmd, data, plugin=params, **kwargs)
             else:
-                cmd = self._parse_str(self.opcode, data, **kwargs)
+                cmd = self._parse_str(self.opcode, data, plugin=params, **kwargs)
 
             # apply substitutions
             if isinstance(data, str):
@@ -386,10 +436,10 @@ class MD_Command_ParseStr(MD_Command_Str):
                      CMD_STR_VAL_UPP: data.upper(),
                      CMD_STR_VAL_LOW: data.lower(),
                      CMD_STR_VAL_CAP: data.capitalize()}
-                cmd_str = self._parse_str(cmd.format(**d), data)
+                cmd_str = self._parse_str(cmd.format(**d), data, plugin=params)
             else:
                 d = {CMD_STR_VAL_RAW: data}
-                cmd_str = self._parse_str(cmd.format(**d), data)
+                cmd_str = self._parse_str(cmd.format(**d), data, plugin=params)
 
         return {'payload': cmd_str, 'data': None if data is None else self._DT.get_send_data(data)}
 
@@ -405,10 +455,11 @@ class MD_Command_ParseStr(MD_Command_Str):
         If no match can be achieved, it is not possible to return
         a meaningful value. To signal the error, an exception will be raised.
         """
+        logger = kwargs.pop('logger', None) or self.logger
         if isinstance(data, (bytes, bytearray)):
             data = data.decode('utf-8')
 
-        self.logger.debug(f'parse_str command got data {data} of type {type(data)}')
+        logger.debug(f'parse_str command got data {data} of type {type(data)}')
 
         if self.reply_pattern and isinstance(data, str):
             for pattern in self.reply_pattern:
@@ -450,11 +501,13 @@ class MD_Command_JSON(MD_Command):
 
     params needs to be None or a dict.
     """
+    __slots__ = ()
+
 
     def get_send_data(self, data, **kwargs):
 
         cmd = None
-        data = self._check_value(data)
+        data = self._check_value(data, kwargs.pop('logger', None))
         # create read data
         if data is None:
             if self.read_cmd:
@@ -470,6 +523,7 @@ class MD_Command_JSON(MD_Command):
         return {'payload': cmd, 'data': ddict}
 
     def get_shng_data(self, data, **kwargs):
+        kwargs.pop('logger', None)
         value = self._DT.get_shng_data(data.get('result'), **kwargs)
         return value
 
@@ -503,7 +557,7 @@ class MD_Command_JSON(MD_Command):
 
             return val
 
-        if not hasattr(self, CMD_ATTR_PARAMS):
+        if not self.params:
             return None
 
         params = deepcopy(self.params)
@@ -543,6 +597,8 @@ class MD_Command_Viessmann(MD_Command):
 
     params and param_value need to be None or lists of the same length.
     """
+    __slots__ = ('_len', '_mult', '_signed')
+
     def __init__(self, device_id, command, dt_class, **kwargs):
         super().__init__(device_id, command, dt_class, **kwargs)
 
@@ -550,12 +606,12 @@ class MD_Command_Viessmann(MD_Command):
         self._mult = 0
         self._signed = False
         for attr in ('len', 'mult', 'signed'):
-            if attr in self.params:
+            if self.params and attr in self.params:
                 setattr(self, '_' + attr, self.params[attr])
 
     def get_send_data(self, data, **kwargs):
 
-        data = self._check_value(data)
+        data = self._check_value(data, kwargs.pop('logger', None))
         # create read data
         if data is None:
             if self.read_cmd:
@@ -581,7 +637,7 @@ class MD_Command_Viessmann(MD_Command):
         :rtype: dict
         """
         params = {}
-        if not hasattr(self, CMD_ATTR_PARAMS):
+        if not self.params:
             return None
 
         for key in self.params:
@@ -24,20 +24,31 @@
 #
 #########################################################################
 
+import hashlib
 import logging
+import os
+import pickle
 import re
+import sys
+import threading
 from pydoc import locate
 
 if MD_standalone:
-    from MD_Globals import (update, CommandsError, CMD_ATTR_CMD_SETTINGS, CMD_ATTR_DEV_TYPE, CMD_ATTR_ITEM_ATTRS, CMD_ATTR_ITEM_TYPE, CMD_ATTR_LOOKUP, CMD_ATTR_OPCODE, CMD_ATTR_READ, CMD_ATTR_READ_CMD, CMD_ATTR_REPLY_PATTERN, CMD_ATTR_WRITE, CMD_ATTR_WRITE_CMD, COMMAND_PARAMS, COMMAND_SEP, INDEX_GENERIC, PATTERN_LOOKUP, PATTERN_VALID_LIST, PATTERN_VALID_LIST_CI, PATTERN_CUSTOM_PATTERN)
+    from MD_Globals import (update, CommandsError, CATALOG_PREFIX, CATALOG_VERSION, CMD_ATTR_CMD_SETTINGS, CMD_ATTR_DEV_TYPE, CMD_ATTR_ITEM_ATTRS, CMD_ATTR_ITEM_TYPE, CMD_ATTR_LOOKUP, CMD_ATTR_OPCODE, CMD_ATTR_READ, CMD_ATTR_READ_CMD, CMD_ATTR_REPLY_PATTERN, CMD_ATTR_WRITE, CMD_ATTR_WRITE_CMD, COMMAND_PARAMS, COMMAND_SEP, CUSTOM_SEP, INDEX_GENERIC, PATTERN_LOOKUP, PATTERN_VALID_LIST, PATTERN_VALID_LIST_CI, PATTERN_CUSTOM_PATTERN, PLUGIN_ATTR_LAZY)
     from MD_Command import MD_Command
     import datatypes as DT
 else:
-    from .MD_Globals import (update, CommandsError, CMD_ATTR_CMD_SETTINGS, CMD_ATTR_DEV_TYPE, CMD_ATTR_ITEM_ATTRS, CMD_ATTR_ITEM_TYPE, CMD_ATTR_LOOKUP, CMD_ATTR_OPCODE, CMD_ATTR_READ, CMD_ATTR_READ_CMD, CMD_ATTR_REPLY_PATTERN, CMD_ATTR_WRITE, CMD_ATTR_WRITE_CMD, COMMAND_PARAMS, COMMAND_SEP, INDEX_GENERIC, PATTERN_LOOKUP, PATTERN_VALID_LIST, PATTERN_VALID_LIST_CI, PATTERN_CUSTOM_PATTERN)
+    from .MD_Globals import (update, CommandsError, CATALOG_PREFIX, CATALOG_VERSION, CMD_ATTR_CMD_SETTINGS, CMD_ATTR_DEV_TYPE, CMD_ATTR_ITEM_ATTRS, CMD_ATTR_ITEM_TYPE, CMD_ATTR_LOOKUP, CMD_ATTR_OPCODE, CMD_ATTR_READ, CMD_ATTR_READ_CMD, CMD_ATTR_REPLY_PATTERN, CMD_ATTR_WRITE, CMD_ATTR_WRITE_CMD, COMMAND_PARAMS, COMMAND_SEP, CUSTOM_SEP, INDEX_GENERIC, PATTERN_LOOKUP, PATTERN_VALID_LIST, PATTERN_VALID_LIST_CI, PATTERN_CUSTOM_PATTERN, PLUGIN_ATTR_LAZY)
     from .MD_Command import MD_Command
     from . import datatypes as DT
 
 
+# shared catalogs of commands, lookups and structs, see MD_Commands._read_commands()
+_catalogs = {}
+_catalog_locks = {}
+_catalog_lock = threading.Lock()
+
+
 #############################################################################################################################################################################################################################################
 #
 # class MD_Commands
@@ -61,6 +72,8 @@ class MD_Commands(object):
 
         self.logger.debug(f'commands initializing from {command_obj_class.__name__}')
         self._commands = {}         # { 'cmd_x': MD_Command(params), ... }
+        self._definitions = {}      # { 'cmd_x': {compiled definition}, ... }, all commands incl. not yet created ones
+        self._shared = {}           # command objects shared with other devices, see _read_commands()
         self._lookups = {}          # { 'name_x': {'fwd': {'K1': 'V1', ...}, 'rev': {'V1': 'K1', ...}, 'rci': {'v1': 'K1', ...}}}
         self._lookup_tables = []
         self._dev_structs = []
@@ -72,6 +85,9 @@ class MD_Commands(object):
 
         self._model = self._params.get('model', None)
 
+        # only create command objects when needed
+        self._lazy = bool(self._params.get(PLUGIN_ATTR_LAZY, False))
+
         self._dt = {}
         self._return_value = None
 
@@ -81,32 +97,44 @@ class MD_Commands(object):
             return None
 
         if self._commands is not None:
-            self.logger.debug(f'{len(self._commands)} commands initialized')
+            if self._lazy:
+                self.logger.debug(f'{len(self._definitions)} commands defined, {len(self._commands)} commands initialized')
+            else:
+                self.logger.debug(f'{len(self._commands)} commands initialized')
         elif not MD_standalone:
             self.logger.error('commands could not be initialized')
 
     def is_valid_command(self, command, read=None):
-        if command not in self._commands:
+        if command in self._commands:
+            cmd = self._commands[command]
+        elif command in self._definitions:
+            # check definition, don't create command object yet
+            cmd = None
+        else:
             return False
 
         if read is None:
             return True
 
         # if the corresponding attribute is not defined, assume False (fail safe)
-        return getattr(self._commands[command], CMD_ATTR_READ if read else CMD_ATTR_WRITE, False)
+        if cmd is None:
+            return self._definitions[command].get(CMD_ATTR_READ if read else CMD_ATTR_WRITE) or False
+        return getattr(cmd, CMD_ATTR_READ if read else CMD_ATTR_WRITE, False)
 
     def get_send_data(self, command, data=None, **kwargs):
-        if command in self._commands:
-            lu = self._get_cmd_lookup(command)
+        cmd = self._get_command(command)
+        if cmd:
+            lu = cmd.get_lookup()
             if lu:
                 data = self._lookup(data, lu, rev=True)
-            return self._commands[command].get_send_data(data, **kwargs)
+            return cmd.get_send_data(data, plugin=self._params, logger=self.logger, **kwargs)
 
         raise Exception(f'command {command} not found in commands')
 
     def get_shng_data(self, command, data, **kwargs):
-        if command in self._commands:
-            result = self._commands[command].get_shng_data(data, **kwargs)
+        cmd = self._get_command(command)
+        if cmd:
+            result = cmd.get_shng_data(data, logger=self.logger, **kwargs)
             lu = self._get_cmd_lookup(command)
             if lu:
                 result = self._lookup(result, lu)
@@ -121,8 +149,7 @@ class MD_Commands(object):
         if type(data) in (bytes, bytearray):
             data = str(data.decode('utf-8'))
 
-        for command in self._commands:
-            patterns = getattr(self._commands[command], CMD_ATTR_REPLY_PATTERN, None)
+        for command, patterns in self._get_reply_patterns():
             if patterns:
                 for pattern in patterns:
                     if pattern:
@@ -132,10 +159,63 @@ class MD_Commands(object):
                                 self.logger.debug(f'matched reply_pattern {pattern} as regex against data {data}, found command {command}')
                                 return command
                         except Exception as e:
-                            self.logger.warning(f'parsing or matching reply_pattern {getattr(self._commands[command], CMD_ATTR_REPLY_PATTERN)} from command {command} as regex failed. Error was: {e}. Ignoring')
+                            self.logger.warning(f'parsing or matching reply_pattern {patterns} from command {command} as regex failed. Error was: {e}. Ignoring')
 
         return None
 
+    def prewarm(self, commands):
+        """
+        create command objects for the given commands, e.g. all commands bound
+        to items, so they don't need to be created on first use. Only
+        applicable in lazy mode.
+
+        :param commands: command names, possibly including custom token
+        :type commands: iterable
+        """
+        if not self._lazy:
+            return
+
+        for command in commands:
+            self._get_command(command.split(CUSTOM_SEP)[0])
+        self.logger.debug(f'{len(self._commands)} of {len(self._definitions)} commands initialized after prewarming')
+
+    def _get_command(self, command):
+        """
+        return command object. In lazy mode, the command object is created
+        on first use.
+
+        :param command: command name
+        :type command: str
+        :return: command object or None if command is unknown
+        :rtype: MD_Command
+        """
+        cmd = self._commands.get(command)
+        if cmd is None and command in self._definitions:
+            cmd = self._shared.get(command)
+            if cmd is None:
+                self._build_commands({command: self._definitions[command]})
+                cmd = self._shared.setdefault(command, self._commands[command])
+            self._commands[command] = cmd
+        return cmd
+
+    def _get_reply_patterns(self):
+        """
+        yield command names and reply patterns of all commands. In lazy mode,
+        reply patterns are taken from the command definitions, so command
+        objects are not created.
+
+        :return: iterator of (command, patterns)
+        """
+        if self._lazy:
+            for command, kw in self._definitions.items():
+                yield command, kw.get(CMD_ATTR_REPLY_PATTERN)
+            commands = [command for command in self._commands if command not in self._definitions]
+        else:
+            commands = list(self._commands)
+
+        for command in commands:
+            yield command, getattr(self._commands[command], CMD_ATTR_REPLY_PATTERN, None)
+
     def get_lookup(self, lookup, type='fwd'):
         """ returns the contents of the lookup table named <lookup>, None on error """
         if lookup in self._lookups and type in ('fwd', 'rev', 'rci'):
@@ -189,8 +269,9 @@ class MD_Commands(object):
 
     def _get_cmd_lookup(self, command):
         """ returns lookup name for command or None """
-        if command in self._commands:
-            return self._commands[command].get_lookup()
+        cmd = self._get_command(command)
+        if cmd:
+            return cmd.get_lookup()
 
         raise Exception(f'command {command} not found in commands')
 
@@ -247,23 +328,41 @@ class MD_Commands(object):
         # remove empty dicts (old 'level names')
         walk(cmds, '', None, removeEmptyItems)
 
-    def _get_cmdlist(self, cmds, cmdlist):
+    def _get_cmdlist(self, cmds, cmdlist, trie=None):
+        """
+        return all commands from cmds which are identical to or below an
+        entry in cmdlist to capture categories, e.g. cmdlist = ['generic']
+        gets all commands starting with generic + COMMAND_SEP
+
+        :param cmds: flattened commands dict
+        :param cmdlist: list of commands and categories, all commands if None
+        :param trie: MD_CommandTrie of cmds for repeated calls
+        :type cmds: dict
+        :type cmdlist: list
+        :type trie: MD_CommandTrie
+        :return: list of commands in order of cmds
+        :rtype: list
+        """
         # now get command list, if not already provided
         if cmdlist is None:
-            cmdlist = cmds.keys()
+            return list(cmds.keys())
 
-        # find all commands starting with any entry in cmdlist to capture categories
-        # e.g. cmdlist = ['generic'] -> get all commands starting with generic + COMMAND_SEP
-        new_cmdlist = []
-        for cmd in cmds:
-            if any(cmdspec + COMMAND_SEP == cmd[:len(cmdspec) + len(COMMAND_SEP)] or cmdspec == cmd for cmdspec in cmdlist):
-                new_cmdlist.append(cmd)
+        if trie is None:
+            trie = MD_CommandTrie(cmds)
 
-        return new_cmdlist
+        return trie.select(cmdlist)
 
     def _read_commands(self, device_id):
         """
-        This is the loader portion for the commands.py file.
+        Get commands, lookups and structs from the shared catalog of all
+        devices with identical device type, model, custom patterns and
+        command class. If not yet present, load them and add them to the
+        shared catalog.
+
+        Command objects and lookups are shared read-only, the dict of
+        commands is copied, so commands can be added or removed per device.
+        In lazy mode, command objects are created on first use and then
+        shared with the other devices, too.
 
         Errors preventing the device from working raise `Exception`
         """
@@ -272,6 +371,60 @@ class MD_Commands(object):
         if not self._device_type:
             raise Exception('device_type not set, not reading commands')
 
+        # param is read by yaml parser which converts None to "None"...
+        if self._model == 'None':
+            self._model = None
+
+        if self._model == INDEX_GENERIC:
+            self.logger.warning('configured model is identical to generic identifier, loading all commands.')
+            self._model = None
+
+        key = (type(self), self._device_type, self._model, repr(self._params.get('custom_patterns')), self._cmd_class)
+        with _catalog_lock:
+            lock = _catalog_locks.setdefault(key, threading.Lock())
+
+        # devices of the same type wait for the first one to load the catalog
+        with lock:
+            catalog = _catalogs.get(key)
+            if catalog is None:
+                if not self._load_commands(device_id):
+                    return False
+                catalog = _catalogs[key] = {'definitions': self._definitions,
+                                            'commands': self._commands,
+                                            'lookups': self._lookups,
+                                            'lookup_tables': self._lookup_tables,
+                                            'structs': self._dev_structs}
+            else:
+                self.logger.debug(f'using shared catalog with {len(catalog["definitions"]) or len(catalog["commands"])} commands for device type {self._device_type}')
+
+            # catalog might have been loaded by a device in lazy mode
+            if not self._lazy and len(catalog['commands']) < len(catalog['definitions']):
+                self._commands = catalog['commands']
+                self._build_commands({cmd: kw for cmd, kw in catalog['definitions'].items() if cmd not in self._commands})
+
+        self._definitions = catalog['definitions']
+        self._shared = catalog['commands']
+        if self._lazy or not self._definitions:
+            self._commands = dict(self._shared)
+        else:
+            # keep order of definitions for reply pattern matching
+            self._commands = {cmd: self._shared[cmd] for cmd in self._definitions}
+        self._lookups = catalog['lookups']
+        self._lookup_tables = catalog['lookup_tables']
+        self._dev_structs = catalog['structs']
+        return True
+
+    def _load_commands(self, device_id):
+        """
+        This is the loader portion for the commands.py file.
+
+        Errors preventing the device from working raise `Exception`
+        """
+
+        # try to use compiled catalog from previous run
+        if not MD_standalone and self._load_catalog():
+            return True
+
         # try to load commands.py from device directory
         mod_str = 'dev_' + self._device_type + '.commands'
         if not MD_standalone:
@@ -285,13 +438,6 @@ class MD_Commands(object):
         except Exception as e:
             raise CommandsError(f'importing commands from external module {"dev_" + self._device_type + "/commands.py"} failed. Error was: "{e}"')
             return False
-        # param is read by yaml parser which converts None to "None"...
-        if self._model == 'None':
-            self._model = None
-
-        if self._model == INDEX_GENERIC:
-            self.logger.warning('configured model is identical to generic identifier, loading all commands.')
-            self._model = None
 
         if self._model:
             if hasattr(cmd_module, 'models'):
@@ -302,6 +448,8 @@ class MD_Commands(object):
                         raise CommandsError(f'configured model {self._model} not found in commands.py models {cmd_module.models.keys()}')
                 else:
                     raise CommandsError(f'model configuration for device type {self._device_type} invalid, "models" is not a dict')
+
+        compiled = {}
         if hasattr(cmd_module, 'commands') and isinstance(cmd_module.commands, dict) and not MD_standalone:
             cmds = cmd_module.commands
             cmdlist = None
@@ -328,20 +476,133 @@ class MD_Commands(object):
                 self.logger.debug('no lookups found')
 
             # actually import commands
-            self._parse_commands(device_id, cmds, self._get_cmdlist(cmds, cmdlist))
+            if type(self)._parse_commands is not MD_Commands._parse_commands:
+                # derived class uses own parser
+                self._parse_commands(device_id, cmds, self._get_cmdlist(cmds, cmdlist))
+            else:
+                compiled = self._compile_commands(cmds, self._get_cmdlist(cmds, cmdlist))
+                self._definitions = compiled
+                if not self._lazy:
+                    self._build_commands(compiled)
         else:
             if not MD_standalone:
                 self.logger.warning('no command definitions found. This device probably will not work...')
 
         if hasattr(cmd_module, 'structs') and isinstance(cmd_module.structs, dict):
-            self._dev_structs = cmd_module.structs.get(INDEX_GENERIC, [])
+            self._dev_structs = list(cmd_module.structs.get(INDEX_GENERIC, []))
             self.logger.debug(f'found {len(self._dev_structs)} generic structs')
             if self._model:
                 self._dev_structs += cmd_module.structs.get(self._model, [])
                 self.logger.debug(f'found {len(cmd_module.structs.get(self._model, []))} model-specific structs')
 
+        if compiled:
+            self._save_catalog(compiled)
+
+        return True
+
+    def _get_catalog_file(self):
+        """
+        return path of catalog cache file and hash of all sources of the
+        compiled catalog. If commands.py is not found, no catalog is used.
+
+        :return: tuple of (filename, hash) or (None, None)
+        :rtype: tuple
+        """
+        # derived classes might use their own file format or parsing
+        if any(getattr(type(self), method) is not getattr(MD_Commands, method) for method in ('_parse_commands', '_compile_commands', '_parse_lookups', '_flatten_cmds')):
+            return None, None
+
+        dev_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dev_' + self._device_type)
+        sources = (os.path.join(dev_dir, 'commands.py'),
+                   os.path.join(dev_dir, 'datatypes.py'),
+                   os.path.abspath(DT.__file__),
+                   os.path.abspath(__file__),
+                   os.path.join(os.path.dirname(os.path.abspath(__file__)), 'MD_Globals.py'))
+        if not os.path.isfile(sources[0]):
+            return None, None
+
+        sha = hashlib.sha1(f'{CATALOG_VERSION}|{self._model}|{self._params.get("custom_patterns")}'.encode())
+        for source in sources:
+            try:
+                with open(source, 'rb') as f:
+                    sha.update(f.read())
+            except OSError:
+                # file (e.g. device datatypes.py) not present
+                sha.update(b'-')
+
+        model = re.sub(r'[^\w.-]', '_', str(self._model or INDEX_GENERIC))
+        # devices with different custom patterns need separate catalog files
+        patterns = hashlib.sha1(repr(self._params.get('custom_patterns')).encode()).hexdigest()[:8]
+        filename = os.path.join(dev_dir, '__pycache__', f'{CATALOG_PREFIX}.{model}.{patterns}.{sys.implementation.cache_tag}.pickle')
+        return filename, sha.hexdigest()
+
+    def _load_catalog(self):
+        """
+        load commands, lookups and structs from compiled catalog, if catalog
+        is present and matches the current sources
+
+        :return: True if catalog was loaded
+        :rtype: bool
+        """
+        filename, digest = self._get_catalog_file()
+        if not filename or not os.path.isfile(filename):
+            return False
+
+        try:
+            with open(filename, 'rb') as f:
+                catalog = pickle.load(f)
+            if catalog.get('hash') != digest:
+                self.logger.debug(f'compiled catalog {filename} outdated, rebuilding')
+                return False
+            self._lookups = catalog['lookups']
+            self._lookup_tables = catalog['lookup_tables']
+            self._dev_structs = catalog['structs']
+            commands = catalog['commands']
+        except Exception as e:
+            self.logger.debug(f'loading compiled catalog {filename} failed, rebuilding. Error was: {e}')
+            self._lookups = {}
+            self._lookup_tables = []
+            self._dev_structs = []
+            return False
+
+        self._definitions = commands
+        if not self._lazy:
+            self._build_commands(commands)
+        self.logger.debug(f'loaded {len(commands)} commands and {len(self._lookups)} lookups from compiled catalog {filename}')
         return True
 
+    def _save_catalog(self, commands):
+        """
+        save compiled commands, lookups and structs to catalog cache file.
+        Errors are not critical, so they are only logged.
+
+        :param commands: compiled commands as returned by _compile_commands()
+        :type commands: dict
+        """
+        filename, digest = self._get_catalog_file()
+        if not filename:
+            return
+
+        catalog = {'hash': digest,
+                   'commands': commands,
+                   'lookups': self._lookups,
+                   'lookup_tables': self._lookup_tables,
+                   'structs': self._dev_structs}
+        # write to temporary file first, as multiple devices might write concurrently
+        tmpfile = f'{filename}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            with open(tmpfile, 'wb') as f:
+                pickle.dump(catalog, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpfile, filename)
+            self.logger.debug(f'saved compiled catalog to {filename}')
+        except Exception as e:
+            self.logger.debug(f'saving compiled catalog to {filename} failed. Error was: {e}')
+            try:
+                os.remove(tmpfile)
+            except OSError:
+                pass
+
     def _parse_commands(self, device_id, commands, cmds=[]):
         """
         This is a reference implementation for parsing the commands dict imported
@@ -349,7 +610,23 @@ class MD_Commands(object):
         For special purposes, this can be overwritten, if you want to use your
         own file format.
         """
+        self._build_commands(self._compile_commands(commands, cmds))
+
+    def _compile_commands(self, commands, cmds=[]):
+        """
+        Compile the command definitions from the commands dict into keyword
+        dicts for command object creation, including substitution of reply
+        patterns. The result only contains plain data and can be cached.
+
+        :param commands: flattened commands dict
+        :param cmds: list of commands to compile
+        :type commands: dict
+        :type cmds: list
+        :return: dict of {command: kw}
+        :rtype: dict
+        """
         custom_patterns = self._params.get('custom_patterns')
+        compiled = {}
 
         for cmd in cmds:
             # we found a "section" entry for which initial or cyclic read is specified. Just skip it...
@@ -380,12 +657,6 @@ class MD_Commands(object):
                 if 'valid_list_ci' in kw[CMD_ATTR_CMD_SETTINGS]:
                     kw[CMD_ATTR_CMD_SETTINGS]['valid_list_ci'] = [entry.lower() if isinstance(entry, str) else entry for entry in kw[CMD_ATTR_CMD_SETTINGS]['valid_list_ci']]
 
-            dt_class = None
-            dev_datatype = kw.get(CMD_ATTR_DEV_TYPE, '')
-            if dev_datatype:
-                class_name = '' if dev_datatype[:2] == 'DT_' else 'DT_' + dev_datatype
-                dt_class = self._dt.get(class_name)
-
             # process pattern substitution
             if CMD_ATTR_REPLY_PATTERN in kw:
                 if not isinstance(kw[CMD_ATTR_REPLY_PATTERN], list):
@@ -421,6 +692,28 @@ class MD_Commands(object):
                 # store processed patterns
                 kw[CMD_ATTR_REPLY_PATTERN] = processed_patterns
 
+            compiled[cmd] = kw
+
+        return compiled
+
+    def _build_commands(self, compiled):
+        """
+        Create command objects from compiled command definitions
+
+        :param compiled: dict of {command: kw} as returned by _compile_commands()
+        :type compiled: dict
+        """
+        # commands are shared between devices, so plugin params and device logger are supplied on use
+        plugin = {}
+
+        for cmd, kw in compiled.items():
+
+            dt_class = None
+            dev_datatype = kw.get(CMD_ATTR_DEV_TYPE, '')
+            if dev_datatype:
+                class_name = '' if dev_datatype[:2] == 'DT_' else 'DT_' + dev_datatype
+                dt_class = self._dt.get(class_name)
+
             if kw.get(CMD_ATTR_READ, False) and kw.get(CMD_ATTR_OPCODE, '') == '' and kw.get(CMD_ATTR_READ_CMD, '') == '':
                 self.logger.info(f'command {cmd} will not create a command for reading values. Check commands.py configuration...')
             if kw.get(CMD_ATTR_WRITE, False) and kw.get(CMD_ATTR_OPCODE, '') == '' and kw.get(CMD_ATTR_WRITE_CMD, '') == '':
@@ -428,7 +721,7 @@ class MD_Commands(object):
             if not dt_class:
                 self.logger.error(f'importing command {cmd} found invalid datatype "{dev_datatype}", replacing with DT_raw. Check function of device')
                 dt_class = DT.DT_raw
-            self._commands[cmd] = self._cmd_class(self.device_id, cmd, dt_class, **{'cmd': kw, 'plugin': self._params})
+            self._commands[cmd] = self._cmd_class(self._device_type, cmd, dt_class, **{'cmd': kw, 'plugin': plugin, 'logger': self.logger})
 
     def _parse_lookups(self, device_id, lookups):
         """
@@ -466,3 +759,58 @@ class MD_Commands(object):
                     self.logger.warning(f'key {table} in lookups not in dict format, ignoring')
         except Exception as e:
             self.logger.error(f'importing lookup tables not possible, check syntax. Error was: {e}')
+
+
+#############################################################################################################################################################################################################################################
+#
+# class MD_CommandTrie
+#
+#############################################################################################################################################################################################################################################
+
+class MD_CommandTrie(object):
+    """ Prefix trie over dotted command paths
+
+    Each node is a dict of path components, the key None marks the index of
+    a command ending at this node. Selecting all commands of a category is a
+    walk of its subtree instead of comparing all commands to all categories.
+
+    :param commands: command names, e.g. keys of flattened commands dict
+    :type commands: iterable
+    """
+
+    def __init__(self, commands):
+        self._commands = list(commands)
+        self._root = {}
+        for index, cmd in enumerate(self._commands):
+            node = self._root
+            for part in cmd.split(COMMAND_SEP):
+                node = node.setdefault(part, {})
+            node[None] = index
+
+    def select(self, cmdlist):
+        """
+        return all commands identical to or below an entry in cmdlist
+
+        :param cmdlist: list of commands and categories
+        :type cmdlist: list
+        :return: list of commands in original order
+        :rtype: list
+        """
+        found = set()
+        for cmdspec in cmdlist:
+            node = self._root
+            for part in cmdspec.split(COMMAND_SEP):
+                node = node.get(part)
+                if node is None:
+                    break
+            else:
+                nodes = [node]
+                while nodes:
+                    node = nodes.pop()
+                    for key, child in node.items():
+                        if key is None:
+                            found.add(child)
+                        else:
+                            nodes.append(child)
+
+        return [self._commands[index] for index in sorted(found)]
@@ -24,21 +24,25 @@
 #
 #########################################################################
 
+import asyncio
 import logging
-from time import sleep, time
-import requests
-import serial
+from time import sleep, time, perf_counter
 import socket
-from threading import Lock, Thread
+from threading import Lock, Thread, current_thread
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 import json
 
-from lib.network import Tcp_client
-
 if MD_standalone:
-    from MD_Globals import (sanitize_param, PLUGIN_ATTRS, PLUGIN_ATTR_CB_ON_CONNECT, PLUGIN_ATTR_CB_ON_DISCONNECT, PLUGIN_ATTR_CONN_AUTO_CONN, PLUGIN_ATTR_CONN_BINARY, PLUGIN_ATTR_CONN_CYCLE, PLUGIN_ATTR_CONN_RETRIES, PLUGIN_ATTR_CONN_TERMINATOR, PLUGIN_ATTR_CONN_TIMEOUT, PLUGIN_ATTR_NET_HOST, PLUGIN_ATTR_NET_PORT, PLUGIN_ATTR_PROTOCOL, PLUGIN_ATTR_SERIAL_BAUD, PLUGIN_ATTR_SERIAL_BSIZE, PLUGIN_ATTR_SERIAL_PARITY, PLUGIN_ATTR_SERIAL_PORT, PLUGIN_ATTR_SERIAL_STOP, REQUEST_DICT_ARGS)
+    from MD_Globals import (lazy_import, sanitize_param, PLUGIN_ATTRS, PLUGIN_ATTR_CB_ON_CONNECT, PLUGIN_ATTR_CB_ON_DISCONNECT, PLUGIN_ATTR_CONN_AUTO_CONN, PLUGIN_ATTR_CONN_BINARY, PLUGIN_ATTR_CONN_CYCLE, PLUGIN_ATTR_CONN_RETRIES, PLUGIN_ATTR_CONN_TERMINATOR, PLUGIN_ATTR_CONN_TIMEOUT, PLUGIN_ATTR_LATENCY, PLUGIN_ATTR_NET_HOST, PLUGIN_ATTR_NET_PORT, PLUGIN_ATTR_PROTOCOL, PLUGIN_ATTR_SERIAL_BAUD, PLUGIN_ATTR_SERIAL_BSIZE, PLUGIN_ATTR_SERIAL_PARITY, PLUGIN_ATTR_SERIAL_PORT, PLUGIN_ATTR_SERIAL_STOP, REQUEST_DICT_ARGS, REQUEST_DICT_COMMAND, LATENCY_WIRE)
 else:
-    from .MD_Globals import (sanitize_param, PLUGIN_ATTRS, PLUGIN_ATTR_CB_ON_CONNECT, PLUGIN_ATTR_CB_ON_DISCONNECT, PLUGIN_ATTR_CONN_AUTO_CONN, PLUGIN_ATTR_CONN_BINARY, PLUGIN_ATTR_CONN_CYCLE, PLUGIN_ATTR_CONN_RETRIES, PLUGIN_ATTR_CONN_TERMINATOR, PLUGIN_ATTR_CONN_TIMEOUT, PLUGIN_ATTR_NET_HOST, PLUGIN_ATTR_NET_PORT, PLUGIN_ATTR_PROTOCOL, PLUGIN_ATTR_SERIAL_BAUD, PLUGIN_ATTR_SERIAL_BSIZE, PLUGIN_ATTR_SERIAL_PARITY, PLUGIN_ATTR_SERIAL_PORT, PLUGIN_ATTR_SERIAL_STOP, REQUEST_DICT_ARGS)
+    from .MD_Globals import (lazy_import, sanitize_param, PLUGIN_ATTRS, PLUGIN_ATTR_CB_ON_CONNECT, PLUGIN_ATTR_CB_ON_DISCONNECT, PLUGIN_ATTR_CONN_AUTO_CONN, PLUGIN_ATTR_CONN_BINARY, PLUGIN_ATTR_CONN_CYCLE, PLUGIN_ATTR_CONN_RETRIES, PLUGIN_ATTR_CONN_TERMINATOR, PLUGIN_ATTR_CONN_TIMEOUT, PLUGIN_ATTR_LATENCY, PLUGIN_ATTR_NET_HOST, PLUGIN_ATTR_NET_PORT, PLUGIN_ATTR_PROTOCOL, PLUGIN_ATTR_SERIAL_BAUD, PLUGIN_ATTR_SERIAL_BSIZE, PLUGIN_ATTR_SERIAL_PARITY, PLUGIN_ATTR_SERIAL_PORT, PLUGIN_ATTR_SERIAL_STOP, REQUEST_DICT_ARGS, REQUEST_DICT_COMMAND, LATENCY_WIRE)
+
+# connection libraries are only loaded when a connection class needs them
+requests = lazy_import('requests')
+serial = lazy_import('serial')
+network = lazy_import('lib.network')
 
 
 #############################################################################################################################################################################################################################################
@@ -59,6 +63,10 @@ class MD_Connection(object):
     :type device_type: str
     :type device_id: str
     """
+
+    # record wire latency in send(). Set to False if _send() doesn't wait for the reply
+    _measure_wire = True
+
     def __init__(self, device_type, device_id, data_received_callback, **kwargs):
 
         # get MultiDevice.device logger (if not already defined by derived class calling us via super().__init__())
@@ -140,7 +148,10 @@ class MD_Connection(object):
         response = None
 
         if self._send_init_on_send():
+            start = perf_counter()
             response = self._send(data_dict)
+            if self._measure_wire:
+                self._record_latency(data_dict, LATENCY_WIRE, perf_counter() - start)
 
         return response
 
@@ -227,6 +238,18 @@ class MD_Connection(object):
     #
     #
 
+    def _record_latency(self, data_dict, phase, seconds):
+        """
+        record latency in device statistics, if present
+
+        :param data_dict: data_dict as sent, used to identify the command
+        :param phase: latency phase
+        :param seconds: latency in seconds
+        """
+        stats = self._params.get(PLUGIN_ATTR_LATENCY)
+        if stats:
+            stats.record(data_dict.get(REQUEST_DICT_COMMAND, str(data_dict.get('payload'))), phase, seconds)
+
     def _set_connection_params(self):
         """
         Try to set some of the common parameters.
@@ -318,6 +341,10 @@ class MD_Connection_Net_Tcp_Client(MD_Connection):
         def data_received_callback(command, message)
     If callbacks are class members, they need the additional first parameter 'self'
     """
+
+    # replies are received asynchronously
+    _measure_wire = False
+
     def __init__(self, device_type, device_id, data_received_callback, **kwargs):
 
         super().__init__(device_type, device_id, data_received_callback, done=False, **kwargs)
@@ -326,7 +353,7 @@ class MD_Connection_Net_Tcp_Client(MD_Connection):
             self._params[PLUGIN_ATTR_CONN_TERMINATOR] = bytes(self._params[PLUGIN_ATTR_CONN_TERMINATOR], 'utf-8')
 
         # initialize connection
-        self._tcp = Tcp_client(host=self._params[PLUGIN_ATTR_NET_HOST],
+        self._tcp = network.Tcp_client(host=self._params[PLUGIN_ATTR_NET_HOST],
                                port=self._params[PLUGIN_ATTR_NET_PORT],
                                name=f'{device_id}-TcpConnection',
                                autoreconnect=self._params[PLUGIN_ATTR_CONN_AUTO_CONN],
@@ -454,6 +481,7 @@ class MD_Connection_Serial(MD_Connection):
         def data_received_callback(by, message)
     If callbacks are class members, they need the additional first parameter 'self'
     """
+
     def __init__(self, device_type, device_id, data_received_callback, **kwargs):
 
         class TimeoutLock(object):
@@ -717,6 +745,10 @@ class MD_Connection_Serial_Async(MD_Connection_Serial):
         def data_received_callback(by, message)
     If callbacks are class members, they need the additional first parameter 'self'
     """
+
+    # replies are received asynchronously
+    _measure_wire = False
+
     def __init__(self, device_type, device_id, data_received_callback, **kwargs):
         # set additional class members
         self.__receive_thread = None
@@ -788,3 +820,464 @@ class MD_Connection_Serial_Async(MD_Connection_Serial):
                 return
             else:
                 self.logger.error(f'serial receive thread {self.__receive_thread.name} died with unexpected error: {e}')
+
+
+#############################################################################################################################################################################################################################################
+#
+# asyncio support
+#
+#############################################################################################################################################################################################################################################
+
+class MD_Event_Loop(object):
+    """ Shared asyncio event loop for all devices
+
+    All asyncio connections of all devices share one event loop, which runs
+    in its own thread. The loop is started by the first user calling acquire()
+    and stopped when the last user calls release().
+
+    Callbacks into device code must not run on the loop thread, as they might
+    block (e.g. by sending commands). They are handed to a small thread pool
+    by MD_Callback_Dispatcher instances.
+    """
+
+    # number of threads for running device callbacks
+    CALLBACK_WORKERS = 4
+
+    _instance = None
+    _instance_lock = Lock()
+
+    def __init__(self):
+        self.logger = logging.getLogger('.'.join(__name__.split('.')[:-1]))
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=self.CALLBACK_WORKERS, thread_name_prefix='MD_asyncio_cb')
+        self._users = 0
+        self._thread = Thread(target=self._run, name='MD_asyncio', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def acquire(cls):
+        """
+        get shared event loop instance, start loop if necessary
+
+        :return: event loop instance
+        :rtype: MD_Event_Loop
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            cls._instance._users += 1
+            return cls._instance
+
+    @classmethod
+    def release(cls):
+        """ release shared event loop instance, stop loop if not used anymore """
+        with cls._instance_lock:
+            instance = cls._instance
+            if instance is None:
+                return
+            instance._users -= 1
+            if instance._users <= 0:
+                cls._instance = None
+                instance.loop.call_soon_threadsafe(instance.loop.stop)
+                instance.executor.shutdown(wait=False)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.logger.debug('asyncio event loop started')
+        self.loop.run_forever()
+        self.loop.close()
+        self.logger.debug('asyncio event loop stopped')
+
+    def in_loop(self):
+        """ return True if called from event loop thread """
+        return current_thread() is self._thread
+
+    def run(self, coro, timeout=None):
+        """
+        Blocking wrapper: run coroutine on the event loop and wait for the result.
+        Must not be called from the event loop thread.
+
+        :param coro: coroutine to run
+        :param timeout: max time to wait in seconds, None to wait indefinitely
+        :return: result of coroutine, exceptions are raised
+        """
+        if self.in_loop():
+            coro.close()
+            raise RuntimeError('blocking call from event loop thread')
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def submit(self, coro):
+        """
+        Run coroutine on the event loop without waiting
+
+        :param coro: coroutine to run
+        :return: future for result
+        :rtype: concurrent.futures.Future
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+
+class MD_Callback_Dispatcher(object):
+    """ Run callbacks in the event loop's thread pool, one at a time and in order
+
+    :param event_loop: shared event loop instance
+    :param logger: logger for errors in callbacks
+    :type event_loop: MD_Event_Loop
+    """
+
+    def __init__(self, event_loop, logger):
+        self._executor = event_loop.executor
+        self.logger = logger
+        self._pending = deque()
+        self._lock = Lock()
+        self._running = False
+
+    def __call__(self, func, *args):
+        with self._lock:
+            self._pending.append((func, args))
+            if self._running:
+                return
+            self._running = True
+        try:
+            self._executor.submit(self._drain)
+        except RuntimeError:
+            # executor already shut down
+            self._running = False
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._running = False
+                    return
+                func, args = self._pending.popleft()
+            try:
+                func(*args)
+            except Exception as e:
+                self.logger.warning(f'error in callback {func.__name__}, error was {e}')
+
+
+class MD_Connection_Aio(object):
+    """ Mixin for asyncio connections
+
+    Provides access to the shared event loop, ordered dispatching of
+    callbacks and terminator-based splitting of received data.
+    Needs to be used together with MD_Connection or a subclass.
+    """
+
+    _aio = None
+    _aio_dispatch = None
+
+    def _aio_acquire(self):
+        """ acquire shared event loop, if not already done """
+        if self._aio is None:
+            self._aio = MD_Event_Loop.acquire()
+            self._aio_dispatch = MD_Callback_Dispatcher(self._aio, self.logger)
+
+    def _aio_release(self):
+        """ release shared event loop """
+        if self._aio is not None:
+            self._aio = None
+            MD_Event_Loop.release()
+
+    def _aio_run(self, coro, timeout=None):
+        """ run coroutine on shared event loop and wait for the result """
+        if self._aio is None:
+            coro.close()
+            raise RuntimeError('event loop not acquired')
+        return self._aio.run(coro, timeout)
+
+    def _aio_split(self, buffer):
+        """
+        split buffer at terminator (bytes/str) or in fixed size chunks (int)
+
+        :return: list of complete chunks (including terminator) and remaining buffer
+        :rtype: tuple
+        """
+        terminator = self._params[PLUGIN_ATTR_CONN_TERMINATOR]
+        if isinstance(terminator, str):
+            terminator = terminator.encode('utf-8')
+        chunks = []
+        while terminator:
+            if isinstance(terminator, int):
+                i = terminator
+                if i > len(buffer):
+                    break
+            else:
+                i = buffer.find(terminator)
+                if i == -1:
+                    break
+                i += len(terminator)
+            chunks.append(buffer[:i])
+            buffer = buffer[i:]
+        return chunks, buffer
+
+    def _aio_forward(self, by, data, strip=True):
+        """ dispatch received data to data_received_callback """
+        if not self._params[PLUGIN_ATTR_CONN_BINARY]:
+            data = str(data, 'utf-8')
+            if strip:
+                data = data.strip()
+        if self._data_received_callback:
+            self._aio_dispatch(self.on_data_received, by, data)
+
+
+class MD_Connection_Aio_Net_Tcp_Client(MD_Connection_Aio, MD_Connection):
+    """ Connection via direct TCP connection with asyncio listener
+
+    This class provides the same functionality as MD_Connection_Net_Tcp_Client,
+    but the connection and listener run on the shared asyncio event loop
+    instead of own threads.
+
+    Data received is dispatched via callback, thus the send()-method does not
+    return any response data.
+    """
+
+    # replies are received asynchronously
+    _measure_wire = False
+
+    def __init__(self, device_type, device_id, data_received_callback, **kwargs):
+
+        super().__init__(device_type, device_id, data_received_callback, done=False, **kwargs)
+
+        if isinstance(self._params[PLUGIN_ATTR_CONN_TERMINATOR], str):
+            self._params[PLUGIN_ATTR_CONN_TERMINATOR] = bytes(self._params[PLUGIN_ATTR_CONN_TERMINATOR], 'utf-8')
+
+        self._reader = None
+        self._writer = None
+        self._receive_task = None
+        self._closing = False
+
+        # tell someone about our actual class
+        self.logger.debug(f'connection initialized from {self.__class__.__name__}')
+
+    def _open(self):
+        self.logger.debug(f'{self.__class__.__name__} opening connection with params {self._params}')
+        if self._writer and not self._writer.is_closing():
+            return True
+
+        self._aio_acquire()
+        self._closing = False
+        retries = self._params[PLUGIN_ATTR_CONN_RETRIES] + 1
+        try:
+            return self._aio_run(self._aio_connect(), retries * (self._params[PLUGIN_ATTR_CONN_TIMEOUT] + self._params[PLUGIN_ATTR_CONN_CYCLE]) + 1)
+        except Exception as e:
+            self.logger.error(f'error on connection to {self._params[PLUGIN_ATTR_NET_HOST]}:{self._params[PLUGIN_ATTR_NET_PORT]}, error was {e}')
+            return False
+
+    def _close(self):
+        self.logger.debug(f'{self.__class__.__name__} closing connection')
+        self._closing = True
+        if self._aio is None:
+            return
+        try:
+            self._aio_run(self._aio_disconnect(), self._params[PLUGIN_ATTR_CONN_TIMEOUT] + 1)
+        except Exception as e:
+            self.logger.debug(f'error on closing connection, error was {e}')
+        self._aio_release()
+
+    def _send(self, data_dict):
+        self._aio_run(self._aio_send(data_dict['payload']), self._params[PLUGIN_ATTR_CONN_TIMEOUT] * 3)
+
+        # we receive only via callback, so we return "no reply".
+        return None
+
+    async def _aio_connect(self):
+        """ try to connect, start receive task on success """
+        host = self._params[PLUGIN_ATTR_NET_HOST]
+        port = self._params[PLUGIN_ATTR_NET_PORT]
+        retries = self._params[PLUGIN_ATTR_CONN_RETRIES]
+        for attempt in range(retries + 1):
+            try:
+                self._reader, self._writer = await asyncio.wait_for(asyncio.open_connection(host, port), self._params[PLUGIN_ATTR_CONN_TIMEOUT])
+            except (OSError, asyncio.TimeoutError) as e:
+                self.logger.debug(f'connection attempt {attempt + 1} to {host}:{port} failed, error was {e}')
+                if attempt < retries and not self._closing:
+                    await asyncio.sleep(self._params[PLUGIN_ATTR_CONN_CYCLE])
+            else:
+                self.logger.info(f'connected to {host}:{port}')
+                self._receive_task = asyncio.ensure_future(self._aio_receive())
+                self._aio_dispatch(self.on_connect, self)
+                return True
+        return False
+
+    async def _aio_disconnect(self):
+        """ stop receive task and close connection """
+        if self._receive_task:
+            self._receive_task.cancel()
+            self._receive_task = None
+        if self._writer:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+            self._writer = None
+
+    async def _aio_send(self, data):
+        if not self._writer or self._writer.is_closing():
+            raise OSError('trying to send, but not connected')
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self._writer.write(data)
+        await self._writer.drain()
+
+    async def _aio_receive(self):
+        """ receive data, split at terminator and dispatch to callback """
+        buffer = b''
+        try:
+            while True:
+                data = await self._reader.read(4096)
+                if not data:
+                    break
+                if self._params[PLUGIN_ATTR_CONN_TERMINATOR]:
+                    chunks, buffer = self._aio_split(buffer + data)
+                    for chunk in chunks:
+                        self._aio_forward(self, chunk)
+                else:
+                    self._aio_forward(self, data, strip=False)
+        except OSError as e:
+            self.logger.debug(f'error on receiving, error was {e}')
+
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+        self._receive_task = None
+        self._aio_dispatch(self.on_disconnect, self)
+
+        if not self._closing and self._params[PLUGIN_ATTR_CONN_AUTO_CONN]:
+            self.logger.info('connection lost, trying to reconnect')
+            await asyncio.sleep(self._params[PLUGIN_ATTR_CONN_CYCLE])
+            if not self._closing:
+                await self._aio_connect()
+
+
+class MD_Connection_Aio_Net_Udp_Request(MD_Connection_Aio, MD_Connection_Net_Tcp_Request):
+    """ Connection via TCP / HTTP requests with asyncio UDP listener
+
+    This class provides the same functionality as MD_Connection_Net_Udp_Request,
+    but the UDP listener runs on the shared asyncio event loop instead of an
+    own thread. Sending uses HTTP requests as in MD_Connection_Net_Tcp_Request.
+    """
+
+    class Datagram_Protocol(asyncio.DatagramProtocol):
+        """ asyncio protocol forwarding datagrams to connection """
+        def __init__(self, connection):
+            self._connection = connection
+
+        def datagram_received(self, data, addr):
+            self._connection._aio_datagram_received(data, addr)
+
+    def __init__(self, device_type, device_id, data_received_callback, **kwargs):
+
+        super().__init__(device_type, device_id, data_received_callback, **kwargs)
+
+        self._transport = None
+
+    def _open(self):
+        self.logger.debug(f'{self.__class__.__name__} opening connection with params {self._params}')
+        if self._transport:
+            return True
+
+        self._aio_acquire()
+        try:
+            self._aio_run(self._aio_listen(), self._params[PLUGIN_ATTR_CONN_TIMEOUT] + 1)
+        except Exception as e:
+            self.logger.error(f'error on opening UDP listener on port {self._params[PLUGIN_ATTR_NET_PORT]}, error was {e}')
+            return False
+
+        if self._params[PLUGIN_ATTR_CB_ON_CONNECT]:
+            self._aio_dispatch(self._params[PLUGIN_ATTR_CB_ON_CONNECT], self.__str__() + ' UDP_listener')
+        return True
+
+    def _close(self):
+        self.logger.debug(f'{self.__class__.__name__} closing connection')
+        if self._transport:
+            self._aio.loop.call_soon_threadsafe(self._transport.close)
+            self._transport = None
+            if self._params[PLUGIN_ATTR_CB_ON_DISCONNECT]:
+                self._aio_dispatch(self._params[PLUGIN_ATTR_CB_ON_DISCONNECT], self.__str__() + ' UDP_listener')
+        self._aio_release()
+
+    async def _aio_listen(self):
+        sock = UDPServer(self._params[PLUGIN_ATTR_NET_PORT])
+        sock.setblocking(False)
+        self._transport, protocol = await asyncio.get_running_loop().create_datagram_endpoint(lambda: self.Datagram_Protocol(self), sock=sock)
+
+    def _aio_datagram_received(self, data, addr):
+        try:
+            host, port = addr
+        except Exception as e:
+            self.logger.warning(f'error receiving data - host/port not readable. Error was: {e}')
+            return
+        if self._data_received_callback:
+            self._aio_dispatch(self._data_received_callback, host, data.decode('utf-8'))
+
+
+class MD_Connection_Aio_Serial_Async(MD_Connection_Aio, MD_Connection_Serial):
+    """ Connection for serial connectivity with asyncio listener
+
+    This class provides the same functionality as MD_Connection_Serial_Async,
+    but instead of a listener thread, the serial port is watched by the shared
+    asyncio event loop (using add_reader, so POSIX only).
+
+    The ``data_received_callback`` needs to be set or you won't get data.
+    """
+
+    # replies are received asynchronously
+    _measure_wire = False
+
+    def __init__(self, device_type, device_id, data_received_callback, **kwargs):
+
+        super().__init__(device_type, device_id, data_received_callback, **kwargs)
+
+        self._aio_buffer = b''
+        self._aio_fd = None
+
+    def _setup_listener(self):
+        if not self._is_connected:
+            return
+
+        self._aio_acquire()
+        self._listener_active = True
+        self._aio_buffer = b''
+        self._aio_fd = self._connection.fileno()
+        self._aio.loop.call_soon_threadsafe(self._aio.loop.add_reader, self._aio_fd, self._aio_read)
+
+    def _close(self):
+        self._listener_active = False
+        if self._aio_fd is not None:
+            try:
+                self._aio_run(self._aio_remove_reader(self._aio_fd), 1)
+            except Exception:
+                pass
+            self._aio_fd = None
+        super()._close()
+        self._aio_release()
+
+    async def _aio_remove_reader(self, fd):
+        asyncio.get_running_loop().remove_reader(fd)
+
+    def _aio_read(self):
+        """ read available data, runs on event loop """
+        try:
+            waiting = self._connection.in_waiting
+            data = self._connection.read(waiting) if waiting else b''
+        except (serial.SerialException, OSError) as e:
+            self.logger.error(f'error reading from serial port, stopping listener. Error was: {e}')
+            self._aio.loop.remove_reader(self._aio_fd)
+            self._aio_fd = None
+            self._listener_active = False
+            self._is_connected = False
+            return
+
+        if not data:
+            return
+
+        self.logger.debug(f'received raw data {data}, buffer is {self._aio_buffer}')
+        if self._params[PLUGIN_ATTR_CONN_TERMINATOR]:
+            chunks, self._aio_buffer = self._aio_split(self._aio_buffer + data)
+            for chunk in chunks:
+                self._aio_forward(self, chunk)
+        else:
+            self._aio_forward(self, data, strip=False)
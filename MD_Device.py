@@ -24,25 +24,33 @@
 #
 #########################################################################
 
+import asyncio
 import logging
 import time
 import sys
 import re
+import heapq
+import itertools
+import queue
+import threading
+from datetime import datetime
 from lib.shyaml import yaml_load
 import importlib
 
 if MD_standalone:
-    from MD_Globals import (CONNECTION_TYPES, CONN_NULL, CONN_NET_TCP_REQ, CONN_SER_DIR, CUSTOM_SEP, PLUGIN_ATTRS, PLUGIN_ATTR_CB_ON_CONNECT, PLUGIN_ATTR_CB_ON_DISCONNECT, PLUGIN_ATTR_CMD_CLASS, PLUGIN_ATTR_CONNECTION, PLUGIN_ATTR_ENABLED, PLUGIN_ATTR_NET_HOST, PLUGIN_ATTR_PROTOCOL, PLUGIN_ATTR_RECURSIVE, PLUGIN_ATTR_SERIAL_PORT, PROTOCOL_TYPES, PROTO_NULL)
+    from MD_Globals import (CONNECTION_TYPES, CONN_AIO_CLASSES, CONN_NULL, CONN_NET_TCP_REQ, CONN_SER_DIR, CUSTOM_SEP, LATENCY_DECODE, LATENCY_ENCODE, LATENCY_PHASES, PLUGIN_ATTRS, PLUGIN_ATTR_ADAPTIVE, PLUGIN_ATTR_ASYNC, PLUGIN_ATTR_CB_ON_CONNECT, PLUGIN_ATTR_CB_ON_DISCONNECT, PLUGIN_ATTR_CMD_CLASS, PLUGIN_ATTR_CONNECTION, PLUGIN_ATTR_ENABLED, PLUGIN_ATTR_LATENCY, PLUGIN_ATTR_NET_HOST, PLUGIN_ATTR_PROTOCOL, PLUGIN_ATTR_RECURSIVE, PLUGIN_ATTR_SERIAL_PORT, PRIO_CYCLIC, PRIO_GROUP, PRIO_INITIAL, PRIO_WRITE, PROTOCOL_TYPES, PROTO_NULL, REQUEST_DICT_COMMAND)
     from MD_Commands import MD_Commands
     from MD_Command import MD_Command
-    from MD_Connection import MD_Connection
+    from MD_Connection import (MD_Connection, MD_Event_Loop)
     from MD_Protocol import MD_Protocol
+    from MD_Stats import MD_LatencyStats
 else:
-    from .MD_Globals import (CONNECTION_TYPES, CONN_NULL, CONN_NET_TCP_REQ, CONN_SER_DIR, CUSTOM_SEP, PLUGIN_ATTRS, PLUGIN_ATTR_CB_ON_CONNECT, PLUGIN_ATTR_CB_ON_DISCONNECT, PLUGIN_ATTR_CMD_CLASS, PLUGIN_ATTR_CONNECTION, PLUGIN_ATTR_ENABLED, PLUGIN_ATTR_NET_HOST, PLUGIN_ATTR_PROTOCOL, PLUGIN_ATTR_RECURSIVE, PLUGIN_ATTR_SERIAL_PORT, PROTOCOL_TYPES, PROTO_NULL)
+    from .MD_Globals import (CONNECTION_TYPES, CONN_AIO_CLASSES, CONN_NULL, CONN_NET_TCP_REQ, CONN_SER_DIR, CUSTOM_SEP, LATENCY_DECODE, LATENCY_ENCODE, LATENCY_PHASES, PLUGIN_ATTRS, PLUGIN_ATTR_ADAPTIVE, PLUGIN_ATTR_ASYNC, PLUGIN_ATTR_CB_ON_CONNECT, PLUGIN_ATTR_CB_ON_DISCONNECT, PLUGIN_ATTR_CMD_CLASS, PLUGIN_ATTR_CONNECTION, PLUGIN_ATTR_ENABLED, PLUGIN_ATTR_LATENCY, PLUGIN_ATTR_NET_HOST, PLUGIN_ATTR_PROTOCOL, PLUGIN_ATTR_RECURSIVE, PLUGIN_ATTR_SERIAL_PORT, PRIO_CYCLIC, PRIO_GROUP, PRIO_INITIAL, PRIO_WRITE, PROTOCOL_TYPES, PROTO_NULL, REQUEST_DICT_COMMAND)
     from .MD_Commands import MD_Commands
     from .MD_Command import MD_Command
-    from .MD_Connection import MD_Connection
+    from .MD_Connection import (MD_Connection, MD_Event_Loop)
     from .MD_Protocol import MD_Protocol
+    from .MD_Stats import MD_LatencyStats
 
 
 #############################################################################################################################################################################################################################################
@@ -110,19 +118,32 @@ class MD_Device(object):
         # set class properties
         self._connection = None                             # connection instance
         self._commands = None                               # commands instance
-        self._custom_values = {1: [], 2: [], 3: []}         # keep custom123 values
+        self._latency = MD_LatencyStats(device_id)          # latency statistics
+        self._custom_values = {1: set(), 2: set(), 3: set()}    # keep custom123 values, frozen in set_runtime_data()
+        self._custom_keys = {1: {}, 2: {}, 3: {}}           # normalized custom123 values: original values
+        self._token_regex = None                            # compiled self._token_pattern
 
         self.device_type = device_type
         self.device_id = device_id
         self.alive = False
+        self._stop_requested = threading.Event()           # set by stop(), aborts running start()
         self.disabled = True
         self._discard_unknown_command = True                # by default, discard data not assignable to known command
         self._unknown_command = '.notify.'                  # if not discarding data, set this command instead
         self._runtime_data_set = False
         self._initial_values_read = False
-        self._cyclic_update_active = False
+        self._cyclic_heap = []                              # [next due time, sequence, is_group, command/group]
+        self._cyclic_stop = threading.Event()               # stop event for asyncio cyclic scheduler
+        self._cyclic_replan = 0                             # time to plan cyclic phases again
+        self._cyclic_adaptive = {}                          # adaptive intervals - <command>: {'interval': <interval>, 'last': <last read>, 'value': <last value>}
+        self._queue = queue.PriorityQueue()                 # command queue, entries are (priority, sequence, job)
+        self._queue_seq = itertools.count()                 # keep order of jobs with same priority
+        self._queue_pending = set()                         # keys of queued read jobs
+        self._queue_lock = threading.Lock()                 # lock for _queue_thread, _queue and _queue_pending
+        self._queue_thread = None                           # queue worker thread
 
         self._data_received_callback = None
+        self._data_received_callback_many = None
         self._commands_read = {}
         self._commands_read_grp = {}
         self._commands_initial = []
@@ -143,6 +164,10 @@ class MD_Device(object):
         # possibly initialize additional (overwrite _set_device_defaults)
         self._set_device_defaults()
 
+        # precompile pattern for custom token extraction
+        if self._token_pattern:
+            self._token_regex = re.compile(self._token_pattern)
+
         # save modified value for passing to MD_Commands
         self._params['custom_patterns'] = self._custom_patterns
 
@@ -165,11 +190,8 @@ class MD_Device(object):
             self.logger.error(f'configuration could not be read, device disabled. Original error: {e}')
             return
 
-        # instantiate connection object
-        self._connection = self._get_connection()
-        if not self._connection:
-            self.logger.error(f'could not setup connection with {kwargs}, device disabled')
-            return
+        # connection object is instantiated in start(), so devices which are
+        # not started don't need to load connection libraries
 
         # the following code should only be run if not called from subclass via super()
         if self.__class__ is MD_Device:
@@ -192,20 +214,45 @@ class MD_Device(object):
             self.logger.error('start method called, but runtime data not set, device (still) disabled')
             return
 
+        self._stop_requested.clear()
+
+        # instantiate connection object
+        if not self._connection:
+            self._connection = self._get_connection()
+            if not self._connection:
+                self.logger.error(f'could not setup connection with {self._params}, device disabled')
+                self.disabled = True
+                return
+
+        if self._stop_requested.is_set():
+            self.logger.info('device stopped while starting, start aborted')
+            return
+
         self.alive = True
+        self._start_queue_worker()
         self._connection.open()
 
+        # stop() might have been called while connecting, e.g. on startup timeout
+        if self._stop_requested.is_set():
+            self.logger.info('device stopped while starting, start aborted')
+            self.stop()
+            return
+
         if self._connection.connected():
             self._read_initial_values()
-            if not MD_standalone:
+            if not MD_standalone and not self._stop_requested.is_set():
                 self._create_cyclic_scheduler()
 
     def stop(self):
         self.logger.debug('stop method called')
+        self._stop_requested.set()
         self.alive = False
+        self._cyclic_stop.set()
         if self._plugin and self._plugin.scheduler_get(self.device_id + '_cyclic'):
             self._plugin.scheduler_remove(self.device_id + '_cyclic')
-        self._connection.close()
+        self._stop_queue_worker()
+        if self._connection:
+            self._connection.close()
 
     # def run_standalone(self):
     #     """
@@ -254,6 +301,7 @@ class MD_Device(object):
                 self.logger.warning(f'trying to send command {command} with value {value}, but connection could not be established.')
                 return False
 
+        start = time.perf_counter()
         try:
             data_dict = self._commands.get_send_data(command, value, **kwargs)
         except Exception as e:
@@ -265,7 +313,9 @@ class MD_Device(object):
             return False
 
         data_dict = self._transform_send_data(data_dict, **kwargs)
+        self._latency.record(command, LATENCY_ENCODE, time.perf_counter() - start)
         self.logger.debug(f'command {command} with value {value} yielded send data_dict {data_dict}')
+        data_dict[REQUEST_DICT_COMMAND] = command
 
         # if an error occurs on sending, an exception is thrown
         result = None
@@ -277,18 +327,21 @@ class MD_Device(object):
 
         if result:
             self.logger.debug(f'command {command} received result {result}')
+            start = time.perf_counter()
             try:
                 value = self._commands.get_shng_data(command, result, **kwargs)
+                self._latency.record(command, LATENCY_DECODE, time.perf_counter() - start)
             except Exception as e:
                 self.logger.info(f'command {command} received result {result}, error {e} occurred while converting. Discarding result.')
             else:
                 self.logger.debug(f'command {command} received result {result}, converted to value {value}')
+                if self.custom_commands and custom_value:
+                    command = command + CUSTOM_SEP + custom_value
+                self._observe_value(command, value)
                 if self._data_received_callback:
                     by = None
                     if self.custom_commands:
                         by = kwargs['custom'][self.custom_commands]
-                        if custom_value:
-                            command = command + CUSTOM_SEP + custom_value
                     self._data_received_callback(self.device_id, command, value, by)
                 else:
                     self.logger.warning(f'command {command} received result {result}, but _data_received_callback is not set. Discarding result.')
@@ -326,14 +379,17 @@ class MD_Device(object):
 
         base_command = command
         value = None
+        start = time.perf_counter()
         try:
             value = self._commands.get_shng_data(command, data)
+            self._latency.record(command, LATENCY_DECODE, time.perf_counter() - start)
             if custom:
                 command = command + CUSTOM_SEP + custom
         except OSError as e:  # Exception as e:
             self.logger.info(f'received data "{data}" for command {command}, error {e} occurred while converting. Discarding data.')
         else:
             self.logger.debug(f'received data "{data}" for command {command} converted to value {value}')
+            self._observe_value(command, value)
             if self._data_received_callback:
                 self._data_received_callback(self.device_id, command, value, by)
             else:
@@ -341,17 +397,55 @@ class MD_Device(object):
 
         self._process_additional_data(base_command, data, value, custom, by)
 
-    def read_all_commands(self, group=''):
+    def queue_command(self, command, value=None, priority=PRIO_WRITE, wait=False, callback=None, **kwargs):
+        """
+        Queues the specified command to be sent by the queue worker. Commands
+        are sent by priority (see PRIO_* constants), so writes are sent before
+        pending reads. Read commands already waiting in the queue are not
+        queued again.
+
+        :param command: the command to send
+        :param value: the data to send, if applicable
+        :param priority: priority of the command, lower values are sent first
+        :param wait: wait for the command to be sent and return the result of send_command
+        :param callback: function to call with the result of send_command
+        :type command: str
+        :type priority: int
+        :type wait: bool
+        :return: result of send_command if wait is True, otherwise True if command was queued
+        :rtype: bool
+        """
+        key = None
+        if value is None and priority != PRIO_WRITE:
+            key = command
+            if self.custom_commands and 'custom' in kwargs:
+                key = (command, str(kwargs['custom']))
+        return self._queue_job(priority, self.send_command, command, value, key=key, wait=wait, callback=callback, **kwargs)
+
+    def read_all_commands(self, group='', priority=PRIO_GROUP):
         """
         Triggers all configured read commands or all configured commands of given group
         """
         if not group:
-            for cmd in self._commands_read:
-                self.send_command(cmd)
+            self._read_commands(list(self._commands_read.keys()), priority)
         else:
             if group in self._commands_read_grp:
-                for cmd in self._commands_read_grp[group]:
-                    self.send_command(cmd)
+                self._read_commands(self._commands_read_grp[group], priority)
+
+    def get_latency_stats(self, command=None):
+        """
+        Return latency statistics for all commands or the given command
+
+        :param command: command name, return all commands if None
+        :type command: str
+        :return: dict of {command: {phase: histogram dict}}, phases are encode, wire and decode
+        :rtype: dict
+        """
+        return self._latency.get(command)
+
+    def reset_latency_stats(self):
+        """ Clear latency statistics """
+        self._latency.reset()
 
     def is_valid_command(self, command, read=None):
         """
@@ -368,7 +462,7 @@ class MD_Device(object):
         if self.custom_commands:
             try:
                 command, custom_value = command.split(CUSTOM_SEP)
-                if custom_value not in self._custom_values[self.custom_commands]:
+                if self._find_custom_value(custom_value) is None:
                     self.logger.debug(f'custom value {custom_value} not in known custom values {self._custom_values[self.custom_commands]}')
                     return None
             except ValueError:
@@ -393,6 +487,11 @@ class MD_Device(object):
             self._triggers_cyclic = kwargs.get('cycle_triggers', [])
             self._triggers_initial = kwargs.get('initial_triggers', [])
             self._data_received_callback = kwargs.get('callback', None)
+            self._data_received_callback_many = kwargs.get('callback_many', None)
+            if self._commands:
+                self._commands.prewarm(kwargs.get('bound_commands', []))
+            # items are parsed, no more changes to custom values expected
+            self._custom_values = {index: frozenset(values) for index, values in self._custom_values.items()}
             self._runtime_data_set = True
         except Exception as e:
             self.logger.error(f'error in runtime data: {e}.')
@@ -414,8 +513,8 @@ class MD_Device(object):
         # merge new params with self._params, overwrite old values if necessary
         self._params.update(kwargs)
 
-        # update = recreate the connection with new parameters
-        self._connection = self._get_connection()
+        # update = recreate the connection with new parameters on next start
+        self._connection = None
 
     def get_lookup(self, lookup, mode='fwd'):
         """ returns the lookup table for name <lookup>, None on error """
@@ -433,8 +532,33 @@ class MD_Device(object):
 
     def set_custom_item(self, item, command, index, value):
         """ this is called by parse_items if md_custom[123] is found. """
-        self._custom_values[index].append(value)
-        self._custom_values[index] = list(set(self._custom_values[index]))
+        values = self._custom_values[index]
+        if value in values:
+            return
+        if isinstance(values, frozenset):
+            # item added after runtime data was set
+            self._custom_values[index] = values | {value}
+        else:
+            values.add(value)
+        self._custom_keys[index][self._normalize_custom_value(value)] = value
+
+    def _find_custom_value(self, value, index=None):
+        """
+        find configured custom value matching value after normalization
+
+        :param value: custom value, e.g. received from device
+        :param index: custom index, defaults to self.custom_commands
+        :type index: int
+        :return: custom value as configured in item or None if not known
+        """
+        try:
+            return self._custom_keys[index or self.custom_commands].get(self._normalize_custom_value(value))
+        except (KeyError, TypeError):
+            return None
+
+    def _normalize_custom_value(self, value):
+        """ return value in normalized form for comparison, e.g. lowercase. Overwrite as needed. """
+        return value
 
     #
     #
@@ -503,16 +627,47 @@ class MD_Device(object):
             return None
         if not isinstance(data, str):
             return None
-        res = re.search(self._token_pattern, data)
+        res = self._token_regex.search(data) if self._token_regex else None
         if not res:
             self.logger.debug(f'custom token not found in {data}, ignoring')
             return None
-        elif res[0] in self._custom_values[self.custom_commands]:
-            return res[0]
+
+        custom = self._find_custom_value(res[0])
+        if custom is not None:
+            return custom
         else:
             self.logger.debug(f'received custom token {res[0]}, not in list of known tokens {self._custom_values[self.custom_commands]}')
             return None
 
+    def _dispatch_many(self, values, callback=None):
+        """
+        Send multiple values to the plugin at once, e.g. if one status
+        message contains values for multiple commands. If the plugin doesn't
+        provide a callback for multiple values, the values are sent one by one.
+
+        :param values: list of (command, value) or (command, value, by) tuples
+        :param callback: callback for sending single values, defaults to _data_received_callback
+        :type values: list
+        """
+        if not values:
+            return
+
+        values = [entry if len(entry) == 3 else (entry[0], entry[1], None) for entry in values]
+        for command, value, by in values:
+            self._observe_value(command, value)
+
+        if self._data_received_callback_many:
+            self._data_received_callback_many(self.device_id, values)
+            return
+
+        if callback is None:
+            callback = self._data_received_callback
+        if not callback:
+            self.logger.warning(f'received values {values}, but _data_received_callback is not set. Discarding data.')
+            return
+        for command, value, by in values:
+            callback(self.device_id, command, value, by)
+
     def _process_additional_data(self, command, data, value, custom, by):
         """ do additional processing of received data
 
@@ -565,6 +720,9 @@ class MD_Device(object):
             self._params[PLUGIN_ATTR_CB_ON_CONNECT] = self.on_connect
             self._params[PLUGIN_ATTR_CB_ON_DISCONNECT] = self.on_disconnect
 
+        # let connection and protocol record latencies
+        self._params[PLUGIN_ATTR_LATENCY] = self._latency
+
         conn_type = None
         conn_classname = None
         conn_cls = None
@@ -613,6 +771,14 @@ class MD_Device(object):
             conn_classname = 'MD_Connection_' + '_'.join([tok.capitalize() for tok in conn_type.split('_')])
         self.logger.debug(f'wanting connection class named {conn_classname}')
 
+        # use asyncio version of connection class, if available
+        if not conn_cls and self._params.get(PLUGIN_ATTR_ASYNC):
+            aio_classname = CONN_AIO_CLASSES.get(conn_classname)
+            if aio_classname and hasattr(conn_module, aio_classname):
+                conn_classname = aio_classname
+            else:
+                self.logger.info(f'no asyncio version of connection class {conn_classname} available, using threaded connection')
+
         if not conn_cls:
             conn_cls = getattr(conn_module, conn_classname, getattr(conn_module, 'MD_Connection'))
 
@@ -663,7 +829,8 @@ class MD_Device(object):
 
     def _create_cyclic_scheduler(self):
         """
-        Setup the scheduler to handle cyclic read commands and find the proper time for the cycle.
+        Setup the heap of cyclic read commands and triggers, ordered by next due
+        time, and schedule the first due entry.
         """
         if not self.alive:
             return
@@ -672,28 +839,186 @@ class MD_Device(object):
         if not self._plugin:
             return
 
-        # find shortest cycle
-        shortestcycle = -1
+        # just in case it already exists...
+        self._cyclic_stop.set()
+        if self._plugin.scheduler_get(self.device_id + '_cyclic'):
+            self._plugin.scheduler_remove(self.device_id + '_cyclic')
+
+        self._cyclic_adaptive = {}
+        heap = self._get_cyclic_heap(time.time())
+
+        # Start the scheduler
+        if heap:
+            # as round trip times are not known on first start, plan again
+            # after the longest cycle has run once
+            self._cyclic_replan = time.time() + max(self._get_cyclic_cycle(is_group, name) for due, seq, is_group, name in heap)
+            self._cyclic_heap = heap
+            self._cyclic_stop = threading.Event()
+            if self._params.get(PLUGIN_ATTR_ASYNC):
+                aio = MD_Event_Loop.acquire()
+                aio.submit(self._aio_cyclic_worker(aio, self._cyclic_stop))
+                self.logger.info(f'Started cyclic scheduler on asyncio event loop for {len(self._commands_cyclic)} commands and {len(self._triggers_cyclic)} read groups')
+            else:
+                self._schedule_cyclic()
+                self.logger.info(f'Added cyclic scheduler {self.device_id}_cyclic for {len(self._commands_cyclic)} commands and {len(self._triggers_cyclic)} read groups')
+
+    def _get_cyclic_cycle(self, is_group, name):
+        """ return cycle of cyclic command or read group """
+        return (self._triggers_cyclic if is_group else self._commands_cyclic)[name]['cycle']
+
+    def _get_cyclic_heap(self, starttime):
+        """
+        Create heap of cyclic commands and read groups.
+
+        Entries with the same cycle are spread over the cycle period, so sends
+        don't occur in bursts. The measured round trip times (encode, wire and
+        decode) of the commands are taken into account, so the idle time
+        between consecutive entries is the same. Entries with different cycles
+        start with different phases.
+
+        :param starttime: time of first due entry
+        :type starttime: float
+        :return: heap of [next due time, sequence, is_group, command/group]
+        :rtype: list
+        """
+        def duration(cmd):
+            times = [self._latency.mean(cmd, phase) for phase in LATENCY_PHASES]
+            times = [t for t in times if t is not None]
+            return sum(times) if times else None
+
+        # estimated duration per entry, None if not measured (yet)
+        entries = {}
         for cmd in self._commands_cyclic:
-            cycle = self._commands_cyclic[cmd]['cycle']
-            if shortestcycle == -1 or cycle < shortestcycle:
-                shortestcycle = cycle
+            entries[(False, cmd)] = duration(cmd)
         for grp in self._triggers_cyclic:
-            cycle = self._triggers_cyclic[grp]['cycle']
-            if shortestcycle == -1 or cycle < shortestcycle:
-                shortestcycle = cycle
+            durations = [duration(cmd) for cmd in self._commands_read_grp.get(grp, [])]
+            entries[(True, grp)] = sum(d for d in durations if d is not None) if any(d is not None for d in durations) else None
+
+        # use mean of measured durations for unmeasured entries
+        measured = [d for d in entries.values() if d is not None]
+        default = sum(measured) / len(measured) if measured else 0
+
+        cycles = {}
+        for (is_group, name), dur in entries.items():
+            cycles.setdefault(self._get_cyclic_cycle(is_group, name), []).append((is_group, name, default if dur is None else dur))
+
+        # time from each entry to the next one within its cycle
+        layouts = []
+        for cycle, group in cycles.items():
+            total = sum(dur for is_group, name, dur in group)
+            gap = max(cycle - total, 0) / len(group)
+            scale = min(1, cycle / total) if total else 1
+            layouts.append([(is_group, name, dur * scale + gap) for is_group, name, dur in group])
+
+        # shift the cycles against each other within the shortest first step,
+        # so the first entries of all cycles are not due at the same time
+        shift = min(layout[0][2] for layout in layouts) / len(layouts) if layouts else 0
+
+        heap = []
+        for index, layout in enumerate(layouts):
+            offset = index * shift
+            for is_group, name, step in layout:
+                due = starttime + offset
+                (self._triggers_cyclic if is_group else self._commands_cyclic)[name]['next'] = due
+                heap.append([due, len(heap), is_group, name])
+                offset += step
+
+        heapq.heapify(heap)
+        return heap
+
+    def _schedule_cyclic(self, due=None):
+        """
+        (Re-)add one-shot scheduler for the next due cyclic entry.
 
-        # Start the worker thread
-        if shortestcycle != -1:
+        :param due: time to run scheduler, defaults to next due entry
+        :type due: float
+        """
+        if not self.alive or not self._cyclic_heap:
+            return
 
-            # Balance unnecessary calls and precision
-            workercycle = int(shortestcycle / 2)
+        if due is None:
+            due = self._cyclic_heap[0][0]
+        self._plugin.scheduler_add(self.device_id + '_cyclic', self._run_cyclic_scheduler, prio=5, next=datetime.fromtimestamp(max(due, time.time())).astimezone())
 
-            # just in case it already exists...
-            if self._plugin.scheduler_get(self.device_id + '_cyclic'):
-                self._plugin.scheduler_remove(self.device_id + '_cyclic')
-            self._plugin.scheduler_add(self.device_id + '_cyclic', self._read_cyclic_values, cycle=workercycle, prio=5, offset=0)
-            self.logger.info(f'Added cyclic worker thread {self.device_id}_cyclic with {workercycle} s cycle. Shortest item update cycle found was {shortestcycle} s')
+    def _run_cyclic_scheduler(self):
+        """
+        Scheduler callback for cyclic reads. Reads all due entries and schedules
+        the next due entry.
+        """
+        try:
+            self._read_cyclic_values()
+        finally:
+            self._schedule_cyclic()
+
+    async def _aio_cyclic_worker(self, aio, stop_event):
+        """
+        Cyclic scheduler on the shared asyncio event loop. Sleeps until the
+        next entry is due, then reads all due entries. As reading runs device
+        code, which might block, it is run in the callback thread pool.
+
+        :param aio: shared event loop instance
+        :param stop_event: event to stop this scheduler, checked at least every second
+        :type aio: MD_Event_Loop
+        :type stop_event: threading.Event
+        """
+        try:
+            while self.alive and self._cyclic_heap and not stop_event.is_set():
+                wait = self._cyclic_heap[0][0] - time.time()
+                if wait > 0:
+                    await asyncio.sleep(min(wait, 1))
+                else:
+                    await aio.loop.run_in_executor(aio.executor, self._read_cyclic_values)
+        except Exception as e:
+            self.logger.error(f'cyclic scheduler stopped by unexpected error: {e}')
+        finally:
+            self.logger.debug('cyclic scheduler stopped')
+            MD_Event_Loop.release()
+
+    def _is_adaptive_due(self, command, currenttime):
+        """
+        Check if cyclic command is due with adaptive interval. Cyclic commands
+        are scheduled with their configured cycle, but are only read if the
+        adaptive interval has passed since the last read.
+
+        :param command: cyclic command
+        :param currenttime: current time
+        :type command: str
+        :type currenttime: float
+        :return: True if command should be read
+        :rtype: bool
+        """
+        entry = self._cyclic_adaptive.setdefault(command, {'interval': self._commands_cyclic[command]['cycle'], 'last': 0, 'value': None})
+
+        # allow for half a cycle of jitter
+        if currenttime + self._commands_cyclic[command]['cycle'] / 2 < entry['last'] + entry['interval']:
+            return False
+
+        entry['last'] = currenttime
+        return True
+
+    def _observe_value(self, command, value):
+        """
+        Adjust adaptive interval of cyclic command. If the value is unchanged,
+        the interval is doubled up to adaptive_cycle seconds, otherwise it is
+        reset to the configured cycle.
+
+        :param command: command for which value was received
+        :param value: received value
+        :type command: str
+        """
+        entry = self._cyclic_adaptive.get(command)
+        if entry is None:
+            return
+
+        cycle = self._commands_cyclic[command]['cycle']
+        if entry['value'] is not None and value == entry['value']:
+            interval = min(entry['interval'] * 2, max(self._params.get(PLUGIN_ATTR_ADAPTIVE, 0), cycle))
+        else:
+            interval = cycle
+        if interval != entry['interval']:
+            self.logger.debug(f'adaptive interval for cyclic command {command} changed from {entry["interval"]} to {interval} seconds')
+        entry['interval'] = interval
+        entry['value'] = value
 
     def _read_initial_values(self):
         """
@@ -704,88 +1029,202 @@ class MD_Device(object):
         else:
             if self._commands_initial:  # also read after reconnect and not self._initial_values_read:
                 self.logger.info('Starting initial read commands')
-                for cmd in self._commands_initial:
-                    self.logger.debug(f'Sending initial command {cmd}')
-                    self.send_command(cmd)
+                self.logger.debug(f'Sending initial commands {self._commands_initial}')
+                self._read_commands(self._commands_initial, PRIO_INITIAL)
                 self._initial_values_read = True
                 self.logger.info('Initial read commands sent')
             if self._triggers_initial:  # also read after reconnect and not self._initial_values_read:
                 self.logger.info('Starting initial read group triggers')
                 for grp in self._triggers_initial:
                     self.logger.debug(f'Triggering initial read group {grp}')
-                    self.read_all_commands(grp)
+                    self.read_all_commands(grp, PRIO_INITIAL)
                 self.logger.info('Initial read group triggers sent')
 
     def _read_cyclic_values(self):
         """
-        Recall function for cyclic scheduler. Reads all values configured to be read cyclically.
+        Queue all due cyclic commands and trigger all due read groups.
+        Due entries are rescheduled before reading, so they can't get lost.
         """
-        # check if another cyclic cmd run is still active
-        if self._cyclic_update_active:
-            self.logger.warning('Triggered cyclic command read, but previous cyclic run is still active. Check device and cyclic configuration (too much/too short?)')
+        currenttime = time.time()
+
+        # spread entries again with measured round trip times
+        if self._cyclic_replan and currenttime >= self._cyclic_replan:
+            self._cyclic_replan = 0
+            self._cyclic_heap = self._get_cyclic_heap(currenttime)
+            self.logger.debug('Planned cyclic read phases with measured round trip times')
+
+        cmds = []
+        grps = []
+        while self._cyclic_heap and self._cyclic_heap[0][0] <= currenttime:
+            entry = heapq.heappop(self._cyclic_heap)
+            due, seq, is_group, name = entry
+            if is_group:
+                grps.append(name)
+                cycle = self._triggers_cyclic[name]['cycle']
+            else:
+                cmds.append(name)
+                cycle = self._commands_cyclic[name]['cycle']
+
+            # keep phase, but don't try to catch up on missed cycles
+            entry[0] = due + cycle
+            if entry[0] <= currenttime:
+                entry[0] = currenttime + cycle
+            (self._triggers_cyclic if is_group else self._commands_cyclic)[name]['next'] = entry[0]
+            heapq.heappush(self._cyclic_heap, entry)
+
+        # also leave early on disconnect
+        if not self._connection.connected():
+            self.logger.info('Disconnect detected, cancelling cyclic read')
             return
-        else:
-            self.logger.info('Triggering cyclic command read')
 
-        # set lock
-        self._cyclic_update_active = True
-        currenttime = time.time()
-        read_cmds = 0
-        todo = []
-        for cmd in self._commands_cyclic:
+        # skip commands with stretched intervals
+        if self._params.get(PLUGIN_ATTR_ADAPTIVE):
+            cmds = [cmd for cmd in cmds if self._is_adaptive_due(cmd, currenttime)]
 
-            # Is the command already due?
-            if self._commands_cyclic[cmd]['next'] <= currenttime:
-                todo.append(cmd)
+        # reads are only queued, duplicates of still waiting reads are dropped by the queue
+        if cmds:
+            self.logger.debug(f'Triggering cyclic read of commands {cmds}')
+            self._read_commands(cmds, PRIO_CYCLIC)
 
-        for cmd in todo:
-            # as this loop can take considerable time, repeatedly check if shng wants to stop
+        for grp in grps:
             if not self.alive:
-                self.logger.info('Stop command issued, cancelling cyclic read')
+                self.logger.info('Stop command issued, cancelling cyclic trigger')
                 return
 
-            # also leave early on disconnect
-            if not self._connection.connected():
-                self.logger.info('Disconnect detected, cancelling cyclic read')
+            self.logger.debug(f'Triggering cyclic read of group {grp}')
+            self.read_all_commands(grp, PRIO_CYCLIC)
+
+    def _read_commands(self, commands, priority=PRIO_GROUP):
+        """
+        Queue all given commands for reading. This is used for group, initial
+        and cyclic reads. Overwrite this if the device can read multiple
+        commands at once.
+
+        :param commands: list of commands to read
+        :param priority: queue priority
+        :type commands: list
+        :type priority: int
+        """
+        for cmd in commands:
+            if not self.alive:
+                self.logger.info('Stop command issued, cancelling read')
                 return
+            self.queue_command(cmd, priority=priority)
 
-            self.logger.debug(f'Triggering cyclic read of command {cmd}')
-            self.send_command(cmd)
-            self._commands_cyclic[cmd]['next'] = currenttime + self._commands_cyclic[cmd]['cycle']
-            read_cmds += 1
+    def _queue_job(self, priority, func, *args, key=None, wait=False, callback=None, **kwargs):
+        """
+        Put job into command queue. If the queue worker is not running or this
+        is called from the queue worker, the job is executed immediately.
+
+        :param priority: priority of the job, lower values are executed first
+        :param func: function to call
+        :param key: if set, don't queue job if a job with the same key is waiting in queue
+        :param wait: wait for the job to finish and return the result
+        :param callback: function to call with the result of func
+        :type priority: int
+        :type wait: bool
+        :return: result of func if wait is True or job was executed immediately, otherwise True if job was queued
+        """
+        job = {'func': func, 'args': args, 'kwargs': kwargs, 'key': key, 'callback': callback, 'result': False, 'done': None}
 
-        if read_cmds:
-            self.logger.debug(f'Cyclic command read took {(time.time() - currenttime):.1f} seconds for {read_cmds} items')
+        if not self.alive:
+            self.logger.warning(f'trying to queue {func.__name__}{args}, but device is not active.')
+            self._finish_job(job)
+            return False
 
-        currenttime = time.time()
-        read_grps = 0
-        todo = []
-        for grp in self._triggers_cyclic:
+        if wait:
+            job['done'] = threading.Event()
+
+        # check worker and queue job under lock, so _stop_queue_worker can't
+        # drain the queue in between and leave the job unfinished
+        with self._queue_lock:
+            worker = self._queue_thread
+            queued = worker is not None and threading.current_thread() is not worker
+            if queued:
+                if key is not None:
+                    if key in self._queue_pending:
+                        self.logger.debug(f'job {func.__name__}{args} already waiting in queue, not adding it again')
+                        return True
+                    self._queue_pending.add(key)
+                self._queue.put((priority, next(self._queue_seq), job))
+
+        if not queued:
+            self._run_job(job)
+            return job['result']
+
+        if not wait:
+            return True
+        job['done'].wait()
+        return job['result']
+
+    def _run_job(self, job):
+        """ execute queued job and notify waiting threads / callback """
+        if job['key'] is not None:
+            with self._queue_lock:
+                self._queue_pending.discard(job['key'])
+        try:
+            if self.alive:
+                job['result'] = job['func'](*job['args'], **job['kwargs'])
+        except Exception as e:
+            self.logger.warning(f'error on executing {job["func"].__name__}{job["args"]}, error was {e}')
+        self._finish_job(job)
+
+    def _finish_job(self, job):
+        """ notify waiting threads / callback about job result """
+        if job['done']:
+            job['done'].set()
+        if job['callback']:
+            try:
+                job['callback'](job['result'])
+            except Exception as e:
+                self.logger.warning(f'error in callback for {job["func"].__name__}{job["args"]}, error was {e}')
+
+    def _start_queue_worker(self):
+        """ start queue worker thread with new queue """
+        with self._queue_lock:
+            self._queue = queue.PriorityQueue()
+            self._queue_pending = set()
+            self._queue_thread = threading.Thread(target=self._queue_worker, args=(self._queue,), name=f'{self.device_id}_queue', daemon=True)
+            self._queue_thread.start()
+
+    def _stop_queue_worker(self):
+        """ stop queue worker thread, discard waiting jobs """
+        jobs = []
+        with self._queue_lock:
+            if not self._queue_thread:
+                return
 
-            # Is the trigger already due?
-            if self._triggers_cyclic[grp]['next'] <= currenttime:
-                todo.append(grp)
+            self._queue_thread = None
+            while True:
+                try:
+                    priority, seq, job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job:
+                    jobs.append(job)
+            self._queue_pending.clear()
 
-        for grp in todo:
-            # as this loop can take considerable time, repeatedly check if shng wants to stop
-            if not self.alive:
-                self.logger.info('Stop command issued, cancelling cyclic trigger')
-                return
+            # stop marker, sorted before all jobs
+            self._queue.put((-1, next(self._queue_seq), None))
 
-            # also leave early on disconnect
-            if not self._connection.connected():
-                self.logger.info('Disconnect detected, cancelling cyclic trigger')
-                return
+        # notify outside of lock, as callbacks might queue new jobs
+        for job in jobs:
+            self._finish_job(job)
 
-            self.logger.debug(f'Triggering cyclic read of group {grp}')
-            self.read_all_commands(grp)
-            self._triggers_cyclic[grp]['next'] = currenttime + self._triggers_cyclic[grp]['cycle']
-            read_grps += 1
+    def _queue_worker(self, cmd_queue):
+        """
+        Worker thread for command queue. Executes jobs by priority.
 
-        if read_grps:
-            self.logger.debug(f'Cyclic triggers took {(time.time() - currenttime):.1f} seconds for {read_grps} groups')
+        :param cmd_queue: queue to process, stop on None job
+        :type cmd_queue: queue.PriorityQueue
+        """
+        while True:
+            priority, seq, job = cmd_queue.get()
+            if job is None:
+                break
+            self._run_job(job)
 
-        self._cyclic_update_active = False
+        self.logger.debug('queue worker thread stopped')
 
     def _read_configuration(self):
         """
@@ -29,6 +29,8 @@
 from lib.utils import Utils
 from ast import literal_eval
 from collections import abc
+import importlib.util
+import sys
 import types
 
 #############################################################################################################################################################################################################################################
@@ -47,6 +49,10 @@ PLUGIN_ATTR_MODEL            = 'model'                   # select model if appli
 PLUGIN_ATTR_CLEAN_STRUCTS    = 'clean_structs'           # remove items from stucts not supported by chosen model (not necessary if using generated structs)
 PLUGIN_ATTR_CMD_CLASS        = 'command_class'           # name of class to use for commands
 PLUGIN_ATTR_RECURSIVE        = 'recursive_custom'        # indices of custom item attributes for which to enable recursive lookup (number or list of numbers)
+PLUGIN_ATTR_ADAPTIVE         = 'adaptive_cycle'          # max interval in seconds for cyclic reads of unchanged values, 0 = fixed intervals
+PLUGIN_ATTR_CHANGES_ONLY     = 'changes_only'            # only update items if value changed (default for md_changes_only)
+PLUGIN_ATTR_LAZY             = 'lazy_commands'           # create command objects on first use
+PLUGIN_ATTR_ASYNC            = 'asyncio'                 # use asyncio connections and cyclic scheduler on shared event loop, if available
 
 # general connection attributes
 PLUGIN_ATTR_CONNECTION       = 'conn_type'               # manually set connection class, classname or type (see below)
@@ -77,7 +83,10 @@ PLUGIN_ATTR_MSG_REPEAT       = 'message_repeat'          # how often to repeat c
 PLUGIN_ATTR_CB_ON_CONNECT    = 'connected_callback'      # callback function, called if connection is established
 PLUGIN_ATTR_CB_ON_DISCONNECT = 'disconnected_callback'   # callback function, called if connection is lost
 
-PLUGIN_ATTRS = (PLUGIN_ATTR_ENABLED, PLUGIN_ATTR_MODEL, PLUGIN_ATTR_CLEAN_STRUCTS, PLUGIN_ATTR_CMD_CLASS, PLUGIN_ATTR_RECURSIVE,
+# internal objects, not in plugin.yaml
+PLUGIN_ATTR_LATENCY          = 'latency_stats'           # MD_LatencyStats object of device, used by connection and protocol
+
+PLUGIN_ATTRS = (PLUGIN_ATTR_ENABLED, PLUGIN_ATTR_MODEL, PLUGIN_ATTR_CLEAN_STRUCTS, PLUGIN_ATTR_CMD_CLASS, PLUGIN_ATTR_RECURSIVE, PLUGIN_ATTR_ADAPTIVE, PLUGIN_ATTR_CHANGES_ONLY, PLUGIN_ATTR_LAZY, PLUGIN_ATTR_ASYNC,
                 PLUGIN_ATTR_CONNECTION, PLUGIN_ATTR_CB_ON_CONNECT, PLUGIN_ATTR_CB_ON_DISCONNECT, PLUGIN_ATTR_CONN_TIMEOUT,
                 PLUGIN_ATTR_CONN_TERMINATOR, PLUGIN_ATTR_CONN_AUTO_CONN, PLUGIN_ATTR_CONN_RETRIES, PLUGIN_ATTR_CONN_CYCLE,
                 PLUGIN_ATTR_CONN_BINARY, PLUGIN_ATTR_NET_HOST, PLUGIN_ATTR_NET_PORT,
@@ -95,6 +104,11 @@ CONN_SER_ASYNC               = 'serial_async'     # serial connection with only
 
 CONNECTION_TYPES = (CONN_NULL, CONN_NET_TCP_REQ, CONN_NET_TCP_CLI, CONN_NET_TCP_JSONRPC, CONN_NET_UDP_SRV, CONN_SER_DIR, CONN_SER_ASYNC)
 
+# asyncio versions of connection classes, used if PLUGIN_ATTR_ASYNC is set - <connection class name>: <asyncio connection class name>
+CONN_AIO_CLASSES = {'MD_Connection_Net_Tcp_Client': 'MD_Connection_Aio_Net_Tcp_Client',
+                    'MD_Connection_Net_Udp_Request': 'MD_Connection_Aio_Net_Udp_Request',
+                    'MD_Connection_Serial_Async': 'MD_Connection_Aio_Serial_Async'}
+
 # protocol types for PLUGIN_ATTR_PROTOCOL
 PROTO_NULL                   = ''                 # use base protocol class without added functionality (why??)
 PROTO_JSONRPC                = 'jsonrpc'          # JSON-RPC 2.0 support with send queue, msgid and resend of unanswered commands
@@ -112,12 +126,13 @@ ITEM_ATTR_GROUP              = 'md_read_group'          # trigger read with read
 ITEM_ATTR_WRITE              = 'md_write'               # command can be called for writing values
 ITEM_ATTR_READ_GRP           = 'md_read_group_trigger'  # item triggers reading of read group <foo>
 ITEM_ATTR_LOOKUP             = 'md_lookup'              # create lookup item <item>.lookup
+ITEM_ATTR_CHANGES_ONLY       = 'md_changes_only'        # only update item if received value changed
 ITEM_ATTR_CUSTOM_PREFIX      = 'md_custom'              # prefix for custom attributes (used internally)
 ITEM_ATTR_CUSTOM1            = 'md_custom1'             # custom attribute 1
 ITEM_ATTR_CUSTOM2            = 'md_custom2'             # custom attribute 2
 ITEM_ATTR_CUSTOM3            = 'md_custom3'             # custom attribute 3
 
-ITEM_ATTRS = (ITEM_ATTR_DEVICE, ITEM_ATTR_COMMAND, ITEM_ATTR_READ, ITEM_ATTR_CYCLE, ITEM_ATTR_READ_INIT, ITEM_ATTR_WRITE, ITEM_ATTR_READ_GRP, ITEM_ATTR_GROUP, ITEM_ATTR_LOOKUP, ITEM_ATTR_CUSTOM1, ITEM_ATTR_CUSTOM2, ITEM_ATTR_CUSTOM3)
+ITEM_ATTRS = (ITEM_ATTR_DEVICE, ITEM_ATTR_COMMAND, ITEM_ATTR_READ, ITEM_ATTR_CYCLE, ITEM_ATTR_READ_INIT, ITEM_ATTR_WRITE, ITEM_ATTR_READ_GRP, ITEM_ATTR_GROUP, ITEM_ATTR_LOOKUP, ITEM_ATTR_CHANGES_ONLY, ITEM_ATTR_CUSTOM1, ITEM_ATTR_CUSTOM2, ITEM_ATTR_CUSTOM3)
 
 # command definition
 COMMAND_READ                 = True                     # used internally
@@ -189,6 +204,27 @@ INDEX_MODEL                  = 'MODEL'                  # placeholder for model-
 # dict keys for request data_dict
 REQUEST_DICT_ARGS = ('params', 'headers', 'data', 'cookies', 'files')
 
+# dict key for command name in data_dict, used for latency statistics
+REQUEST_DICT_COMMAND         = 'stats_command'
+
+# phases for latency statistics
+LATENCY_ENCODE               = 'encode'                 # creating send data from value
+LATENCY_WIRE                 = 'wire'                   # round trip on connection
+LATENCY_DECODE               = 'decode'                 # converting reply to value
+
+LATENCY_PHASES = (LATENCY_ENCODE, LATENCY_WIRE, LATENCY_DECODE)
+
+# priorities for device command queue, lower values are sent first
+PRIO_WRITE                   = 0                        # write item value to device
+PRIO_INITIAL                 = 1                        # initial read on startup
+PRIO_GROUP                   = 2                        # read all / read group triggered by item
+PRIO_CYCLIC                  = 3                        # cyclic read
+
+# compiled command catalog, cached in __pycache__ of the device directory
+CATALOG_VERSION              = 1                        # increase if format of compiled catalog changes
+CATALOG_PREFIX               = 'catalog'                # file name prefix for catalog cache files
+STRUCT_CACHE_PREFIX          = 'struct'                 # file name prefix for struct.yaml generator cache files
+
 
 #############################################################################################################################################################################################################################################
 #
@@ -206,6 +242,30 @@ class CommandsError(Exception):
 #
 #############################################################################################################################################################################################################################################
 
+def lazy_import(name):
+    """
+    Return module, which is only loaded on first access to one of its
+    attributes. Already loaded modules are returned directly.
+
+    :param name: full module name
+    :type name: str
+    :return: module
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f'No module named {name}', name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
 def sanitize_param(val):
     """
     Try to correct type of val if val is string:
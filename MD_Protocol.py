@@ -27,15 +27,15 @@
 import logging
 
 if MD_standalone:
-    from MD_Globals import (CONN_NET_TCP_CLI, CONN_SER_DIR, JSON_MOVE_KEYS, PLUGIN_ATTR_CB_ON_CONNECT, PLUGIN_ATTR_CB_ON_DISCONNECT, PLUGIN_ATTR_CONNECTION, PLUGIN_ATTR_CONN_AUTO_CONN, PLUGIN_ATTR_CONN_BINARY, PLUGIN_ATTR_CONN_CYCLE, PLUGIN_ATTR_CONN_RETRIES, PLUGIN_ATTR_CONN_TIMEOUT, PLUGIN_ATTR_MSG_REPEAT, PLUGIN_ATTR_MSG_TIMEOUT, PLUGIN_ATTR_NET_HOST, PLUGIN_ATTR_NET_PORT, PLUGIN_ATTR_SERIAL_BAUD, PLUGIN_ATTR_SERIAL_BSIZE, PLUGIN_ATTR_SERIAL_PARITY, PLUGIN_ATTR_SERIAL_PORT, PLUGIN_ATTR_SERIAL_STOP, REQUEST_DICT_ARGS)
+    from MD_Globals import (CONN_NET_TCP_CLI, CONN_SER_DIR, JSON_MOVE_KEYS, PLUGIN_ATTR_CB_ON_CONNECT, PLUGIN_ATTR_CB_ON_DISCONNECT, PLUGIN_ATTR_CONNECTION, PLUGIN_ATTR_CONN_AUTO_CONN, PLUGIN_ATTR_CONN_BINARY, PLUGIN_ATTR_CONN_CYCLE, PLUGIN_ATTR_CONN_RETRIES, PLUGIN_ATTR_CONN_TIMEOUT, PLUGIN_ATTR_MSG_REPEAT, PLUGIN_ATTR_MSG_TIMEOUT, PLUGIN_ATTR_NET_HOST, PLUGIN_ATTR_NET_PORT, PLUGIN_ATTR_SERIAL_BAUD, PLUGIN_ATTR_SERIAL_BSIZE, PLUGIN_ATTR_SERIAL_PARITY, PLUGIN_ATTR_SERIAL_PORT, PLUGIN_ATTR_SERIAL_STOP, REQUEST_DICT_ARGS, LATENCY_WIRE)
     from MD_Connection import MD_Connection
 else:
-    from .MD_Globals import (CONN_NET_TCP_CLI, CONN_SER_DIR, JSON_MOVE_KEYS, PLUGIN_ATTR_CB_ON_CONNECT, PLUGIN_ATTR_CB_ON_DISCONNECT, PLUGIN_ATTR_CONNECTION, PLUGIN_ATTR_CONN_AUTO_CONN, PLUGIN_ATTR_CONN_BINARY, PLUGIN_ATTR_CONN_CYCLE, PLUGIN_ATTR_CONN_RETRIES, PLUGIN_ATTR_CONN_TIMEOUT, PLUGIN_ATTR_MSG_REPEAT, PLUGIN_ATTR_MSG_TIMEOUT, PLUGIN_ATTR_NET_HOST, PLUGIN_ATTR_NET_PORT, PLUGIN_ATTR_SERIAL_BAUD, PLUGIN_ATTR_SERIAL_BSIZE, PLUGIN_ATTR_SERIAL_PARITY, PLUGIN_ATTR_SERIAL_PORT, PLUGIN_ATTR_SERIAL_STOP, REQUEST_DICT_ARGS)
+    from .MD_Globals import (CONN_NET_TCP_CLI, CONN_SER_DIR, JSON_MOVE_KEYS, PLUGIN_ATTR_CB_ON_CONNECT, PLUGIN_ATTR_CB_ON_DISCONNECT, PLUGIN_ATTR_CONNECTION, PLUGIN_ATTR_CONN_AUTO_CONN, PLUGIN_ATTR_CONN_BINARY, PLUGIN_ATTR_CONN_CYCLE, PLUGIN_ATTR_CONN_RETRIES, PLUGIN_ATTR_CONN_TIMEOUT, PLUGIN_ATTR_MSG_REPEAT, PLUGIN_ATTR_MSG_TIMEOUT, PLUGIN_ATTR_NET_HOST, PLUGIN_ATTR_NET_PORT, PLUGIN_ATTR_SERIAL_BAUD, PLUGIN_ATTR_SERIAL_BSIZE, PLUGIN_ATTR_SERIAL_PARITY, PLUGIN_ATTR_SERIAL_PORT, PLUGIN_ATTR_SERIAL_STOP, REQUEST_DICT_ARGS, LATENCY_WIRE)
     from .MD_Connection import MD_Connection
 
 
 from collections import OrderedDict
-from time import time, sleep
+from time import time, perf_counter
 import threading
 import queue
 import json
@@ -62,6 +62,9 @@ class MD_Protocol(MD_Connection):
     of the device and the connection classes.
     """
 
+    # wire latency is recorded by the connection (or by the protocol itself)
+    _measure_wire = False
+
     def __init__(self, device_type, device_id, data_received_callback, **kwargs):
 
         # get MultiDevice.device logger
@@ -239,8 +242,10 @@ class MD_Protocol_Jsonrpc(MD_Protocol):
                     # possibly the command was resent and removed before processing the reply
                     # so let's 'try' at least...
                     try:
-                        command = self._message_archive[response_id][1]
+                        (send_time, command, ddict, repeat) = self._message_archive[response_id]
                         del self._message_archive[response_id]
+                        if not self._connection._measure_wire:
+                            self._record_latency(ddict, LATENCY_WIRE, time() - send_time)
                     except KeyError:
                         command = '(deleted)' if '_' not in response_id else response_id[response_id.find('_') + 1:]
                 else:
@@ -431,9 +436,16 @@ class MD_Protocol_Viessmann(MD_Protocol):
         self._is_connected = False
         self._error_count = 0
         self._lock = threading.Lock()
-        self._is_initialized = False
         self._data_received_callback = data_received_callback
 
+        # P300 session state, only change via _set_session_state()
+        self._is_initialized = False
+        self._last_comm = 0
+        self._session_ready = threading.Event()
+        self._session_wakeup = threading.Event()
+        self._session_thread = None
+        self._session_gen = 0
+
         self._controlsets = {
             'P300': {
                 'baudrate': 4800,
@@ -457,6 +469,9 @@ class MD_Protocol_Viessmann(MD_Protocol):
                 'sync_command_response': 0x06,
                 'command_bytes_read': 5,
                 'command_bytes_write': 5,
+                'max_frame_len': 255,       # max number of bytes to skip while waiting for frame start
+                'keepalive': 5,             # send sync command after <keepalive> seconds without communication
+                'session_timeout': 5,       # max wait time for session (re)initialization before sending
                 # init:              send'Reset_Command' receive'Reset_Command_Response' send'Sync_Command'
                 # request:           send('StartByte' 'Länge der Nutzdaten als Anzahl der Bytes zwischen diesem Byte und der Prüfsumme' 'Request' 'Read' 'addr' 'checksum')
                 # request_response:  receive('Acknowledge' 'StartByte' 'Länge der Nutzdaten als Anzahl der Bytes zwischen diesem Byte und der Prüfsumme' 'Response' 'Read' 'addr' 'Anzahl der Bytes des Wertes' 'Wert' 'checksum')
@@ -474,6 +489,8 @@ class MD_Protocol_Viessmann(MD_Protocol):
                 'reset_command': 0x04,
                 'not_initiated': 0x05,
                 'write_ack': 0x00,
+                'sync_timeout': 5,          # max wait time for sync byte, device sends sync every ~2 seconds
+                'sequence_window': 1,       # max time between reply and follow-up request without new sync
             },
         }
 
@@ -516,94 +533,222 @@ class MD_Protocol_Viessmann(MD_Protocol):
         # tell someone about our actual class
         self.logger.debug(f'protocol initialized from {self.__class__.__name__}')
 
+    def _open(self):
+        if not super()._open():
+            return False
+
+        # P300 keeps a session, which is managed by the session worker
+        if self._viess_proto == 'P300':
+            self._start_session()
+        return True
+
     def _close(self):
-        self._is_initialized = False
+        self._stop_session()
         super()._close()
 
     def _send_init_on_send(self):
         """
         setup the communication protocol prior to sending
 
+        For P300, the session is established and kept alive by the session
+        worker, so normally this only checks the session state. If no session
+        worker is running, the session is initialized synchronously.
+
         :return: Returns True, if communication was established successfully, False otherwise
         :rtype: bool
         """
-        if self._viess_proto == 'P300' and not self._is_initialized:
-
-            # init procedure is
-            # interface: 0x04 (reset)
-            #                           device: 0x05 (repeated)
-            # interface: 0x160000 (sync)
-            #                           device: 0x06 (sync ok)
-            # interface: resume communication, periodically send 0x160000 as keepalive if necessary
-
-            RESET = self._int2bytes(self._controlset['reset_command'], 1)
-            NOTINIT = self._int2bytes(self._controlset["not_initiated"], 1)
-            ACK = self._int2bytes(self._controlset['acknowledge'], 1)
-            SYNC = self._int2bytes(self._controlset['sync_command'], 3)
-            ERR = self._int2bytes(self._controlset['init_error'], 1)
-
-            self.logger.debug('init communication....')
-            syncsent = False
+        if self._viess_proto == 'P300':
 
-            self.logger.debug(f'send_bytes: send reset command {RESET}')
-            self._send_bytes(RESET)
+            if self._is_initialized:
+                return True
 
-            readbyte = self._read_bytes(1)
-            self.logger.debug(f'read_bytes: read {readbyte}')
+            if self._session_thread and self._session_thread.is_alive() and self._session_thread is not threading.current_thread():
+                # let the session worker resync and wait for it
+                self._session_wakeup.set()
+                if not self._session_ready.wait(self._controlset['session_timeout']):
+                    self.logger.warning('session not established in time, not sending')
+                return self._is_initialized
 
-            for i in range(10):
-                if syncsent and readbyte == ACK:
-                    self.logger.debug('device acknowledged initialization')
-                    self._is_initialized = True
-                    break
-                elif readbyte == NOTINIT:
-                    self.logger.debug(f'send_bytes: send sync command {SYNC}')
-                    self._send_bytes(SYNC)
-                    syncsent = True
-                elif readbyte == ERR:
-                    self.logger.error(f'interface reported an error, loop increment {i}')
-                    self.logger.debug(f'send_bytes: send reset command {RESET}')
-                    self._send_bytes(RESET)
-                    syncsent = False
-                else:   # elif readbyte != b'':
-                    self.logger.debug(f'send_bytes: send reset command {RESET}')
-                    self._send_bytes(RESET)
-                    syncsent = False
-                readbyte = self._read_bytes(1)
-                self.logger.debug(f'read_bytes: read {readbyte}')
-
-            self.logger.debug(f'communication initialized: {self._is_initialized}')
-            return self._is_initialized
+            with self._lock:
+                return self._init_session()
 
         elif self._viess_proto == 'KW':
 
-            retries = 5
             RESET = self._int2bytes(self._controlset['reset_command'], 1)
             NOINIT = self._int2bytes(self._controlset['not_initiated'], 1, signed=False)
 
             # try to reset communication, especially if previous P300 comms is still open
             self._send_bytes(RESET)
+            self._connection.reset_input_buffer()
 
-            attempt = 0
-            while attempt < retries:
-                self.logger.debug(f'starting sync loop - attempt {attempt + 1}/{retries}')
-
-                self._connection.reset_input_buffer()
+            # the device sends the sync byte periodically. Every read waits up
+            # to timeout for the next byte, so no additional sleeping is needed
+            self.logger.debug('starting sync loop')
+            end = time() + self._controlset['sync_timeout']
+            while time() < end:
                 chunk = self._read_bytes(1)
                 # enable for 'raw' debugging
                 # self.logger.debug(f'sync loop - got {self._bytes2hexstring(chunk)}')
                 if chunk == NOINIT:
                     self.logger.debug('got sync, commencing command send')
-                    self._is_initialized = True
+                    self._set_session_state(True)
                     return True
-                sleep(.8)
-                attempt = attempt + 1
-            self.logger.error(f'sync not acquired after {attempt} attempts')
+                if not self._connection.connected():
+                    break
+            self.logger.error(f'sync not acquired after {self._controlset["sync_timeout"]} seconds')
             self._close()
             return False
 
         return True
 
+    def _set_session_state(self, initialized):
+        """
+        set session state. This is the only place where the session state is changed
+
+        :param initialized: True if communication is initialized
+        :type initialized: bool
+        """
+        if initialized != self._is_initialized:
+            self.logger.debug(f'session state changed to {"initialized" if initialized else "not initialized"}')
+        self._is_initialized = initialized
+        if initialized:
+            self._last_comm = time()
+            self._session_ready.set()
+        else:
+            self._session_ready.clear()
+
+    def _request_resync(self):
+        """ mark session as lost and have the session worker resync in the background """
+        self._set_session_state(False)
+        self._session_wakeup.set()
+
+    def _start_session(self):
+        """ start P300 session worker thread """
+        self._session_gen += 1
+        self._session_wakeup.clear()
+        self._session_thread = threading.Thread(target=self._session_worker, args=(self._session_gen,), name=f'{self.device_id}_session', daemon=True)
+        self._session_thread.start()
+
+    def _stop_session(self):
+        """ stop P300 session worker thread and reset session state """
+        # the worker exits on its own when the generation changes
+        self._session_gen += 1
+        self._session_wakeup.set()
+        self._set_session_state(False)
+
+    def _session_worker(self, generation):
+        """
+        keep P300 session alive
+
+        Initializes the session, resyncs if the session is lost and sends sync
+        commands as keepalive if no communication occured for the keepalive
+        period. All session traffic is done while holding the send lock, so
+        it doesn't interfere with commands.
+
+        :param generation: session generation, worker exits if it changes
+        :type generation: int
+        """
+        keepalive = self._controlset['keepalive']
+        self.logger.debug('session worker started')
+
+        while self._session_gen == generation and self._connection.connected():
+
+            if self._lock.acquire(timeout=keepalive):
+                try:
+                    if self._session_gen != generation:
+                        break
+                    if not self._is_initialized:
+                        self._init_session()
+                    elif time() - self._last_comm >= keepalive:
+                        self._keepalive()
+                except IOError as e:
+                    self.logger.error(f'session handling failed with IO error: {e}')
+                    self._set_session_state(False)
+                finally:
+                    self._lock.release()
+
+            if self._is_initialized:
+                wait = self._last_comm + keepalive - time()
+            else:
+                wait = self._params[PLUGIN_ATTR_CONN_CYCLE]
+            self._session_wakeup.wait(max(wait, 0))
+            self._session_wakeup.clear()
+
+        self.logger.debug('session worker stopped')
+
+    def _keepalive(self):
+        """
+        send sync command as keepalive, needs to be called with lock held
+
+        :return: True if session is still active
+        :rtype: bool
+        """
+        SYNC = self._int2bytes(self._controlset['sync_command'], 3)
+        ACK = self._int2bytes(self._controlset['acknowledge'], 1)
+
+        self._send_bytes(SYNC)
+        readbyte = self._read_bytes(1)
+        if readbyte == ACK:
+            self._last_comm = time()
+            return True
+
+        self.logger.debug(f'keepalive got {readbyte} instead of ACK, resyncing')
+        return self._init_session()
+
+    def _init_session(self):
+        """
+        initialize P300 communication, needs to be called with lock held
+
+        :return: True if communication is initialized
+        :rtype: bool
+        """
+        # init procedure is
+        # interface: 0x04 (reset)
+        #                           device: 0x05 (repeated)
+        # interface: 0x160000 (sync)
+        #                           device: 0x06 (sync ok)
+        # interface: resume communication, periodically send 0x160000 as keepalive if necessary
+
+        RESET = self._int2bytes(self._controlset['reset_command'], 1)
+        NOTINIT = self._int2bytes(self._controlset["not_initiated"], 1)
+        ACK = self._int2bytes(self._controlset['acknowledge'], 1)
+        SYNC = self._int2bytes(self._controlset['sync_command'], 3)
+        ERR = self._int2bytes(self._controlset['init_error'], 1)
+
+        self._set_session_state(False)
+        self.logger.debug('init communication....')
+        syncsent = False
+
+        self.logger.debug(f'send_bytes: send reset command {RESET}')
+        self._send_bytes(RESET)
+
+        readbyte = self._read_bytes(1)
+        self.logger.debug(f'read_bytes: read {readbyte}')
+
+        for i in range(10):
+            if syncsent and readbyte == ACK:
+                self.logger.debug('device acknowledged initialization')
+                self._set_session_state(True)
+                break
+            elif readbyte == NOTINIT:
+                self.logger.debug(f'send_bytes: send sync command {SYNC}')
+                self._send_bytes(SYNC)
+                syncsent = True
+            elif readbyte == ERR:
+                self.logger.error(f'interface reported an error, loop increment {i}')
+                self.logger.debug(f'send_bytes: send reset command {RESET}')
+                self._send_bytes(RESET)
+                syncsent = False
+            else:   # elif readbyte != b'':
+                self.logger.debug(f'send_bytes: send reset command {RESET}')
+                self._send_bytes(RESET)
+                syncsent = False
+            readbyte = self._read_bytes(1)
+            self.logger.debug(f'read_bytes: read {readbyte}')
+
+        self.logger.debug(f'communication initialized: {self._is_initialized}')
+        return self._is_initialized
+
     def _send(self, data_dict):
         """
         send data. data_dict needs to contain the following information:
@@ -623,34 +768,30 @@ class MD_Protocol_Viessmann(MD_Protocol):
         # send payload
         self._lock.acquire()
         try:
+            start = perf_counter()
             self._send_bytes(packet)
             self.logger.debug(f'successfully sent packet {self._bytes2hexstring(packet)}')
 
             # receive response
-            response_packet = bytearray()
-            self.logger.debug(f'trying to receive {responselen} bytes of the response')
-            chunk = self._read_bytes(responselen)
             if self._viess_proto == 'P300':
-                self.logger.debug(f'received {len(chunk)} bytes chunk of response as hexstring {self._bytes2hexstring(chunk)} and as bytes {chunk}')
-                if len(chunk) != 0:
-                    if chunk[:1] == self._int2bytes(self._controlset['error'], 1):
-                        self.logger.error(f'interface returned error, response was {chunk}')
-                    elif len(chunk) == 1 and chunk[:1] == self._int2bytes(self._controlset['not_initiated'], 1):
-                        self.logger.error('received invalid chunk, connection not initialized, forcing re-initialize...')
-                        self._initialized = False
-                    elif chunk[:1] != self._int2bytes(self._controlset['acknowledge'], 1):
-                        self.logger.error(f'received invalid chunk, not starting with ACK, response was {chunk}')
-                        self._error_count += 1
-                        if self._error_count >= 5:
-                            self.logger.warning('encountered 5 invalid chunks in sequence, maybe communication was lost, forcing re-initialize')
-                            self._initialized = False
-                    else:
-                        response_packet.extend(chunk)
-                        self._error_count = 0
-                        return self._parse_response(response_packet)
-                else:
-                    self.logger.error(f'received 0 bytes chunk - ignoring response_packet, chunk was {chunk}')
-            elif self._protocol == 'KW':
+                addr = bytes.fromhex(data_dict['payload'])
+                response_packet = self._read_frame()
+                # drop stale frames left over from previous requests
+                discarded = 0
+                while response_packet is not None and response_packet[5:7] != addr:
+                    self.logger.debug(f'discarding frame for address {self._bytes2hexstring(response_packet[5:7])}, waiting for address {self._bytes2hexstring(addr)}')
+                    discarded += 1
+                    response_packet = self._read_frame() if discarded < 3 else None
+                self._record_latency(data_dict, LATENCY_WIRE, perf_counter() - start)
+                if response_packet is not None:
+                    self._error_count = 0
+                    self._last_comm = time()
+                    return self._parse_response(response_packet)
+            elif self._viess_proto == 'KW':
+                response_packet = bytearray()
+                self.logger.debug(f'trying to receive {responselen} bytes of the response')
+                chunk = self._read_bytes(responselen)
+                self._record_latency(data_dict, LATENCY_WIRE, perf_counter() - start)
                 self.logger.debug(f'received {len(chunk)} bytes chunk of response as hexstring {self._bytes2hexstring(chunk)} and as bytes {chunk}')
                 if len(chunk) != 0:
                     response_packet.extend(chunk)
@@ -671,6 +812,169 @@ class MD_Protocol_Viessmann(MD_Protocol):
         # if we didn't return with data earlier, we hit an error. Act accordingly
         return None
 
+    def send_sequence(self, data_dicts):
+        """
+        send a sequence of read requests and return the responses
+
+        With KW protocol, the requests following the first request after
+        syncing are sent as follow-up telegrams without the start byte, as
+        long as the sync window is not exceeded. Only if a reply is missing or
+        the sync window is exceeded, the device is synced again.
+
+        With P300 protocol, the requests are sent one by one.
+
+        For the contents of the data_dicts see _send().
+
+        :param data_dicts: list of data_dicts of read requests
+        :type data_dicts: list
+        :return: list of responses in the order of data_dicts, None for failed requests
+        :rtype: list
+        """
+        if not self._is_connected:
+            if self._params[PLUGIN_ATTR_CONN_AUTO_CONN]:
+                self._open()
+            if not self._is_connected:
+                raise RuntimeError('trying to send, but not connected')
+
+        if self._viess_proto != 'KW':
+            results = []
+            for data_dict in data_dicts:
+                results.append(self._send(data_dict) if self._send_init_on_send() else None)
+            return results
+
+        results = []
+        synced = False
+        last_reply = 0
+
+        with self._lock:
+            for data_dict in data_dicts:
+
+                if data_dict['data']['value'] is not None:
+                    self.logger.warning(f'write request for {data_dict["payload"]} not possible in sequence, ignoring')
+                    results.append(None)
+                    continue
+
+                if not synced or time() - last_reply > self._controlset['sequence_window']:
+                    if not self._send_init_on_send():
+                        results.extend([None] * (len(data_dicts) - len(results)))
+                        break
+                    synced = True
+                    follow_up = False
+
+                try:
+                    (packet, responselen) = self._build_payload({'payload': data_dict['payload'], 'data': dict(data_dict['data'], kwseq=follow_up)})
+                    start = perf_counter()
+                    self._send_bytes(packet)
+                    chunk = self._read_bytes(responselen)
+                    self._record_latency(data_dict, LATENCY_WIRE, perf_counter() - start)
+                except IOError as e:
+                    self.logger.error(f'send_sequence failed with IO error, trying to reconnect. Error was: {e}')
+                    self._close()
+                    results.extend([None] * (len(data_dicts) - len(results)))
+                    break
+                except Exception as e:
+                    self.logger.error(f'send_sequence failed for {data_dict["payload"]} with error: {e}')
+                    results.append(None)
+                    synced = False
+                    continue
+
+                if chunk and len(chunk) == responselen:
+                    last_reply = time()
+                    follow_up = True
+                    results.append(self._parse_response(bytearray(chunk)))
+                else:
+                    # missing reply, resync before next request
+                    self.logger.error(f'received {len(chunk) if chunk else 0} of {responselen} bytes for address {data_dict["payload"]}, possibly a wrong datapoint address?')
+                    results.append(None)
+                    synced = False
+
+        return results
+
+    def _read_frame(self):
+        """
+        read P300 response frame, needs to be called with lock held
+
+        The frame length is taken from the length byte of the telegram, so
+        only the bytes actually sent by the device are read. The checksum is
+        calculated while reading. Garbage before the start byte is skipped.
+
+        A frame looks like this: ACK (1 byte), startbyte (1 byte), payload
+        length (1 byte), payload (<payload length> bytes), checksum (1 byte)
+
+        :return: response frame including ACK, None on error
+        :rtype: bytearray
+        """
+        ACK = self._int2bytes(self._controlset['acknowledge'], 1)
+        START = self._int2bytes(self._controlset['startbyte'], 1)
+        NOTINIT = self._int2bytes(self._controlset['not_initiated'], 1)
+        ERR = self._int2bytes(self._controlset['error'], 1)
+
+        # wait for ACK and start byte, skip anything else
+        acked = False
+        found = False
+        skipped = 0
+        for i in range(self._controlset['max_frame_len']):
+            readbyte = self._read_bytes(1)
+            if not readbyte:
+                self.logger.error(f'received no data while waiting for {"start byte" if acked else "ACK"}')
+                return None
+            if readbyte == START and (acked or i == 0):
+                # accept frame with lost ACK if nothing else came before
+                found = True
+                break
+            if readbyte == ACK:
+                acked = True
+            elif not acked and readbyte == NOTINIT:
+                self.logger.error('received invalid chunk, connection not initialized, forcing re-initialize...')
+                self._request_resync()
+                return None
+            elif not acked and readbyte == ERR:
+                self.logger.error('interface returned error')
+                return None
+            else:
+                skipped += 1
+
+        if not found:
+            self.logger.error('no start byte found, discarding response')
+            skipped += 1
+
+        if skipped:
+            self.logger.debug(f'skipped {skipped} bytes of garbage before start of frame')
+            self._error_count += 1
+            if self._error_count >= 5:
+                self.logger.warning('encountered 5 invalid responses in sequence, maybe communication was lost, forcing re-initialize')
+                self._error_count = 0
+                self._request_resync()
+                return None
+            if not found:
+                return None
+
+        # get payload length and read payload, calculating checksum on the way
+        length = self._read_bytes(1)
+        if not length:
+            self.logger.error('received no payload length')
+            return None
+        checksum = length[0]
+        payload = bytearray()
+        while len(payload) < length[0]:
+            chunk = self._read_bytes(length[0] - len(payload))
+            if not chunk:
+                self.logger.error(f'received incomplete frame, got {len(payload)} of {length[0]} payload bytes: {self._bytes2hexstring(payload)}')
+                return None
+            checksum += sum(chunk)
+            payload.extend(chunk)
+
+        received_checksum = self._read_bytes(1)
+        if not received_checksum or received_checksum[0] != checksum % 256:
+            self.logger.error(f'calculated checksum {checksum % 256} does not match received checksum of {received_checksum}! Ignoring frame {self._bytes2hexstring(payload)}')
+            return None
+
+        frame = bytearray(ACK + START + length)
+        frame.extend(payload)
+        frame.extend(received_checksum)
+        self.logger.debug(f'received frame {self._bytes2hexstring(frame)}')
+        return frame
+
     def _parse_response(self, response, read_response=True):
         """
         Process device response data, try to parse type and value
@@ -701,7 +1005,7 @@ class MD_Protocol_Viessmann(MD_Protocol):
             # Extract databytes out of response
             rawdatabytes = bytearray()
             rawdatabytes.extend(response[8:8 + (valuebytecount)])
-        elif self._protocol == 'KW':
+        elif self._viess_proto == 'KW':
 
             # imitate P300 response code data for easier combined handling afterwards
             # a read_response telegram consists only of the value bytes
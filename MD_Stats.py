@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+#########################################################################
+#  Copyright 2020-      Sebastian Helms             Morg @ knx-user-forum
+#########################################################################
+#  This file aims to become part of SmartHomeNG.
+#  https://www.smarthomeNG.de
+#  https://knx-user-forum.de/forum/supportforen/smarthome-py
+#
+#  MD_LatencyStats and MD_LatencyHistogram classes for MultiDevice plugin
+#
+#  SmartHomeNG is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  SmartHomeNG is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with SmartHomeNG. If not, see <http://www.gnu.org/licenses/>.
+#
+#########################################################################
+
+from bisect import bisect_left
+
+if MD_standalone:
+    from MD_Globals import (LATENCY_PHASES)
+else:
+    from .MD_Globals import (LATENCY_PHASES)
+
+
+#############################################################################################################################################################################################################################################
+#
+# class MD_LatencyHistogram
+#
+#############################################################################################################################################################################################################################################
+
+class MD_LatencyHistogram(object):
+    """ Latency histogram with fixed buckets
+
+    The bucket limits are fixed (1-2-5 steps from 100 µs to 60 s), so
+    recording a value is only a bisect and some additions. No locks are used;
+    as recording is done from few threads per device, the very rare case of
+    concurrent updates losing a count is accepted for statistics purposes.
+    """
+
+    # upper bucket limits in seconds, last bucket is for everything above
+    BUCKETS = (0.0001, 0.0002, 0.0005,
+               0.001, 0.002, 0.005,
+               0.01, 0.02, 0.05,
+               0.1, 0.2, 0.5,
+               1, 2, 5,
+               10, 20, 60)
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """ clear all recorded values """
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def record(self, seconds):
+        """
+        record a latency value
+
+        :param seconds: latency in seconds
+        :type seconds: float
+        """
+        self.counts[bisect_left(self.BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def mean(self):
+        """
+        return mean latency
+
+        :return: mean latency in seconds or None if no values recorded
+        :rtype: float
+        """
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def percentile(self, percent):
+        """
+        return upper bucket limit of the given percentile
+
+        :param percent: percentile (0-100)
+        :type percent: float
+        :return: upper bucket limit in seconds (max value for last bucket) or None if no values recorded
+        :rtype: float
+        """
+        if not self.count:
+            return None
+
+        limit = self.count * percent / 100
+        total = 0
+        for index, count in enumerate(self.counts):
+            total += count
+            if total >= limit and count:
+                return self.BUCKETS[index] if index < len(self.BUCKETS) else self.max
+        return self.max
+
+    def as_dict(self):
+        """
+        return histogram data
+
+        :return: dict with count, mean, min, max, p50, p90, p99 and buckets (upper limit: count, 'inf' for last bucket)
+        :rtype: dict
+        """
+        return {'count': self.count,
+                'mean': self.mean(),
+                'min': self.min,
+                'max': self.max,
+                'p50': self.percentile(50),
+                'p90': self.percentile(90),
+                'p99': self.percentile(99),
+                'buckets': {str(limit): count for limit, count in zip(self.BUCKETS + ('inf',), self.counts) if count}}
+
+
+#############################################################################################################################################################################################################################################
+#
+# class MD_LatencyStats
+#
+#############################################################################################################################################################################################################################################
+
+class MD_LatencyStats(object):
+    """ Latency statistics for one device
+
+    Holds one MD_LatencyHistogram per command and phase. Phases are encode
+    (creating the data to send), wire (round trip on the connection) and
+    decode (converting the reply).
+
+    :param device_id: device id
+    :type device_id: str
+    """
+
+    def __init__(self, device_id):
+        self.device_id = device_id
+        self._histograms = {}
+
+    def record(self, command, phase, seconds):
+        """
+        record latency of command in phase
+
+        :param command: command name
+        :param phase: one of LATENCY_PHASES
+        :param seconds: latency in seconds
+        :type command: str
+        :type phase: str
+        :type seconds: float
+        """
+        try:
+            histogram = self._histograms[command][phase]
+        except KeyError:
+            histogram = self._histograms.setdefault(command, {}).setdefault(phase, MD_LatencyHistogram())
+        histogram.record(seconds)
+
+    def mean(self, command, phase):
+        """
+        return mean latency of command in phase
+
+        :return: mean latency in seconds or None if no values recorded
+        :rtype: float
+        """
+        try:
+            return self._histograms[command][phase].mean()
+        except KeyError:
+            return None
+
+    def get(self, command=None):
+        """
+        return statistics
+
+        :param command: command name, return all commands if None
+        :type command: str
+        :return: dict of {command: {phase: histogram dict}}
+        :rtype: dict
+        """
+        if command is None:
+            commands = list(self._histograms.keys())
+        elif command in self._histograms:
+            commands = [command]
+        else:
+            return {}
+
+        return {cmd: {phase: self._histograms[cmd][phase].as_dict() for phase in LATENCY_PHASES if phase in self._histograms[cmd]} for cmd in commands}
+
+    def reset(self):
+        """ clear all statistics """
+        self._histograms = {}
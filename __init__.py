@@ -170,6 +170,10 @@ A basic framework for managing the device, i.e. (re-)configuring, starting
 and stopping the device is already implemented and can be used via by device
 configuration without the need for code changes.
 
+The connection object is created on the first call to ``start()``, so devices
+which are not started don't create connections. Devices with the device
+attribute ``enabled: False`` are not imported at all.
+
 
 ``MD_Device(device_type, device_id, **kwargs)``
 
@@ -179,13 +183,16 @@ Public methods:
 * ``start()``
 * ``stop()``
 * ``send_command(command, value=None, **kwargs)``
-* ``read_all_commands(group=0)``
+* ``queue_command(command, value=None, priority=PRIO_WRITE, wait=False, callback=None, **kwargs)``
+* ``read_all_commands(group=0, priority=PRIO_GROUP)``
 * ``is_valid_command(command, read=None)``
 * ``set_runtime_data(**kwargs)``
 * ``update_device_params(**kwargs)``
 * ``get_lookup(lookup, mode='fwd')``
 * ``has_recursive_custom_attribute(index=1)``
 * ``set_custom_item(item, command, index, value)``
+* ``get_latency_stats(command=None)``
+* ``reset_latency_stats()``
 
 
 Public callback methods:
@@ -202,7 +209,9 @@ Methods possibly needed to overwrite for inherited classes:
 * ``_transform_send_data(data_dict, **kwargs)``
 * ``_transform_received_data(data_dict)``
 * ``_send(data_dict)``
+* ``_read_commands(commands, priority=PRIO_GROUP)``
 * ``_get_custom_value(command, data)``
+* ``_normalize_custom_value(value)``
 * ``_process_additional_data(command, data, custom)``
 * ``run_standalone()``
 
@@ -217,6 +226,9 @@ asynchronous push-to-callback are already available. If more complex
 communication setup is needed, this can be implemented on top of the existing
 classes.
 
+The libraries ``requests``, ``serial`` and ``lib.network`` are only loaded when a
+connection class first uses them.
+
 
 Data is exchanged with ``MD_Device`` in a special dict format:
 
@@ -321,6 +333,22 @@ datatype association.
 No need to find out if ``command`` is defined, just call the method and the
 class will handle failure cases. Beware of NoneType-return values, though.
 
+The parsed command definitions are cached as compiled catalog in the
+``__pycache__`` folder of the device folder. The catalog is rebuilt
+automatically if ``commands.py``, ``datatypes.py``, model or custom patterns
+change.
+
+Devices with identical device type, model, custom patterns and command class
+share one catalog of command objects and lookups, so these are only created
+once. As command objects are shared, plugin parameters and logger of the
+respective device are supplied to ``MD_Command.get_send_data()`` as ``plugin``
+and ``logger`` kwargs, the logger also to ``MD_Command.get_shng_data()``.
+
+With the device attribute ``lazy_commands: True``, command objects are only
+created on first use. All commands bound to items are created before the
+device is started (``prewarm(commands)``), so usually only commands not bound
+to items are created on demand.
+
 
 ``MD_Commands(device_type, device_id, command_obj_class=MD_Command, **kwargs)``
 
@@ -366,7 +394,7 @@ Methods possible to overwrite:
 
 * ``get_send_data(data, **kwargs)``
 * ``get_shng_data(data, **kwargs)``
-* ``_check_value(data)``
+* ``_check_value(data, logger=None)``
 
 
 This class has subclasses defined for the following types of commands:
@@ -548,18 +576,27 @@ information in items immediately, or if multiple data points are transmitted
 at once, which requires splitting data or other means of data management.
 """
 
+import hashlib
 import importlib
 import builtins
 import logging
 import re
 import os
+import pickle
 import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from copy import deepcopy
 from ast import literal_eval
 from collections import OrderedDict
+from types import MappingProxyType
 
 __pdoc__ = {'multidevice.tools': False, 'multidevice.webif': False}
 
+# processed struct definitions, see MultiDevice._load_structs() - (<device_type>, <model>, <mtime>, <clean_structs>): (<struct_names>, <structs>)
+_struct_cache = {}
+
 if __name__ == '__main__':
     # just needed for standalone mode
     builtins.MD_standalone = True
@@ -573,8 +610,8 @@ if __name__ == '__main__':
     BASE = os.path.sep.join(os.path.realpath(__file__).split(os.path.sep)[:-3])
     sys.path.insert(0, BASE)
 
-    from MD_Globals import (sanitize_param, update, CMD_ATTR_CMD_SETTINGS, CMD_ATTR_ITEM_ATTRS, CMD_ATTR_ITEM_TYPE, CMD_ATTR_LOOKUP, CMD_ATTR_OPCODE, CMD_ATTR_PARAMS, CMD_ATTR_READ, CMD_ATTR_READ_CMD, CMD_ATTR_WRITE, CMD_IATTR_ATTRIBUTES, CMD_IATTR_CYCLE, CMD_IATTR_ENFORCE, CMD_IATTR_INITIAL, CMD_IATTR_LOOKUP_ITEM, CMD_IATTR_READ_GROUPS, CMD_IATTR_RG_LEVELS, CMD_IATTR_TEMPLATE, COMMAND_READ, COMMAND_SEP, COMMAND_WRITE, CUSTOM_SEP, INDEX_GENERIC, INDEX_MODEL, ITEM_ATTR_COMMAND, ITEM_ATTR_CUSTOM_PREFIX, ITEM_ATTR_CYCLE, ITEM_ATTR_DEVICE, ITEM_ATTR_GROUP, ITEM_ATTR_LOOKUP, ITEM_ATTR_READ, ITEM_ATTR_READ_GRP, ITEM_ATTR_READ_INIT, ITEM_ATTR_WRITE, PLUGIN_ATTR_CLEAN_STRUCTS)
-    from MD_Commands import MD_Commands
+    from MD_Globals import (sanitize_param, update, CMD_ATTR_CMD_SETTINGS, CMD_ATTR_ITEM_ATTRS, CMD_ATTR_ITEM_TYPE, CMD_ATTR_LOOKUP, CMD_ATTR_OPCODE, CMD_ATTR_PARAMS, CMD_ATTR_READ, CMD_ATTR_READ_CMD, CMD_ATTR_WRITE, CMD_IATTR_ATTRIBUTES, CMD_IATTR_CYCLE, CMD_IATTR_ENFORCE, CMD_IATTR_INITIAL, CMD_IATTR_LOOKUP_ITEM, CMD_IATTR_READ_GROUPS, CMD_IATTR_RG_LEVELS, CMD_IATTR_TEMPLATE, COMMAND_READ, COMMAND_SEP, COMMAND_WRITE, CUSTOM_SEP, INDEX_GENERIC, INDEX_MODEL, ITEM_ATTR_COMMAND, ITEM_ATTR_CHANGES_ONLY, ITEM_ATTR_CUSTOM_PREFIX, ITEM_ATTR_CYCLE, ITEM_ATTR_DEVICE, ITEM_ATTR_GROUP, ITEM_ATTR_LOOKUP, ITEM_ATTR_READ, ITEM_ATTR_READ_GRP, ITEM_ATTR_READ_INIT, ITEM_ATTR_WRITE, PLUGIN_ATTR_ASYNC, PLUGIN_ATTR_CHANGES_ONLY, PLUGIN_ATTR_CLEAN_STRUCTS, PLUGIN_ATTR_ENABLED, STRUCT_CACHE_PREFIX)
+    from MD_Commands import MD_Commands, MD_CommandTrie
 
 else:
     builtins.MD_standalone = False
@@ -582,7 +619,7 @@ else:
     from lib.model.smartplugin import SmartPlugin
     import lib.shyaml as shyaml
 
-    from .MD_Globals import (sanitize_param, update, CMD_ATTR_CMD_SETTINGS, CMD_ATTR_ITEM_ATTRS, CMD_ATTR_ITEM_TYPE, CMD_ATTR_LOOKUP, CMD_ATTR_OPCODE, CMD_ATTR_PARAMS, CMD_ATTR_READ, CMD_ATTR_READ_CMD, CMD_ATTR_WRITE, CMD_IATTR_ATTRIBUTES, CMD_IATTR_CYCLE, CMD_IATTR_ENFORCE, CMD_IATTR_INITIAL, CMD_IATTR_LOOKUP_ITEM, CMD_IATTR_READ_GROUPS, CMD_IATTR_RG_LEVELS, CMD_IATTR_TEMPLATE, COMMAND_READ, COMMAND_SEP, COMMAND_WRITE, CUSTOM_SEP, INDEX_GENERIC, INDEX_MODEL, ITEM_ATTR_COMMAND, ITEM_ATTR_CUSTOM_PREFIX, ITEM_ATTR_CYCLE, ITEM_ATTR_DEVICE, ITEM_ATTR_GROUP, ITEM_ATTR_LOOKUP, ITEM_ATTR_READ, ITEM_ATTR_READ_GRP, ITEM_ATTR_READ_INIT, ITEM_ATTR_WRITE, PLUGIN_ATTR_CLEAN_STRUCTS)
+    from .MD_Globals import (sanitize_param, update, CMD_ATTR_CMD_SETTINGS, CMD_ATTR_ITEM_ATTRS, CMD_ATTR_ITEM_TYPE, CMD_ATTR_LOOKUP, CMD_ATTR_OPCODE, CMD_ATTR_PARAMS, CMD_ATTR_READ, CMD_ATTR_READ_CMD, CMD_ATTR_WRITE, CMD_IATTR_ATTRIBUTES, CMD_IATTR_CYCLE, CMD_IATTR_ENFORCE, CMD_IATTR_INITIAL, CMD_IATTR_LOOKUP_ITEM, CMD_IATTR_READ_GROUPS, CMD_IATTR_RG_LEVELS, CMD_IATTR_TEMPLATE, COMMAND_READ, COMMAND_SEP, COMMAND_WRITE, CUSTOM_SEP, INDEX_GENERIC, INDEX_MODEL, ITEM_ATTR_COMMAND, ITEM_ATTR_CHANGES_ONLY, ITEM_ATTR_CUSTOM_PREFIX, ITEM_ATTR_CYCLE, ITEM_ATTR_DEVICE, ITEM_ATTR_GROUP, ITEM_ATTR_LOOKUP, ITEM_ATTR_READ, ITEM_ATTR_READ_GRP, ITEM_ATTR_READ_INIT, ITEM_ATTR_WRITE, PLUGIN_ATTR_ASYNC, PLUGIN_ATTR_CHANGES_ONLY, PLUGIN_ATTR_CLEAN_STRUCTS, PLUGIN_ATTR_ENABLED, STRUCT_CACHE_PREFIX)
     from .webif import WebInterface
 
 
@@ -616,18 +653,24 @@ class MultiDevice(SmartPlugin):
 
         self.logger.info(f'Initializing MultiDevice-Plugin as {__name__}')
 
-        self._devices = {}              # contains all configured devices - <device_id>: {'device_type': <device_type>, 'device': <class-instance>, 'logger': <logger-instance>, 'params': {'param1': val1, 'param2': val2...}}
+        self._devices = {}              # contains all configured devices - <device_id>: {'device_type': <device_type>, 'device': <class-instance>, 'logger': <logger-instance>, 'params': {'param1': val1, 'param2': val2...}, 'import_time': <seconds>}
         self._items_write = {}          # contains all items with write command - <item_id>: {'device_id': <device_id>, 'command': <command>}
         self._items_read_all = {}       # contains items which trigger 'read all' - <item_id>: <device_id>
         self._items_read_grp = {}       # contains items which trigger 'read group foo' - <item_id>: [<device_id>, <foo>]
         self._commands_read = {}        # contains all commands per device with read command - <device_id>: {<command>: [<item_object>, <item_object>...]}
         self._commands_pseudo = {}      # contains all pseudo commands per device (without command sequence) - <device_id>: {<command>: [<item_object>, <item_object>...]}
+        self._commands_bound = {}       # contains all commands per device bound to items, for prewarming of commands - <device_id>: {<command>, <command>, ...}
         self._commands_read_grp = {}    # contains all commands per device with read group command - <device_id>: {<group>: [<command>, <command>...]}
         self._commands_initial = {}     # contains all commands per device to be read after run() is called - <device_id>: ['command', 'command', ...]
         self._commands_cyclic = {}      # contains all commands per device to be read cyclically - device_id: {<command>: {'cycle': <cycle>, 'next': <next>}}
         self._triggers_initial = {}     # contains all read groups per device to be triggered after run() is called - <device_id>: ['grp', 'grp', ...]
         self._triggers_cyclic = {}      # contains all read groups per device to be triggered cyclically - device_id: {<grp>: {'cycle': <cycle>, 'next': <next>}}
         self._items_custom = {}         # contains item md_custom<x> attributes - <item_id>: {1: custom1, 2: custom2, 3:custom3}
+        self._custom_attr_cache = {}    # contains resolved md_custom<x> attributes for parent items while parsing, cleared in run() - (<item_id>, <x>): <value>
+        self._items_changes_only = set()  # contains items which are only updated on changed values - <item_id>
+        self._last_values = {}          # contains last received value per device and command - (<device_id>, <command>): <value>
+        self._routes = MappingProxyType({})  # read-only routing table, built from _commands_read and _commands_pseudo - (<device_id>, <command>): (<caller>, ((<item>, <changes_only>), ...))
+        self._routes_dirty = True       # routing table needs to be rebuilt after parse_item
 
         self._sh = sh
         self._webif = None
@@ -638,9 +681,15 @@ class MultiDevice(SmartPlugin):
         if sh:
             # get the parameters for the plugin (as defined in metadata plugin.yaml):
             devices = self.get_parameter_value('devices')
+            self._startup_workers = self.get_parameter_value('startup_workers')
+            self._startup_timeout = self.get_parameter_value('startup_timeout')
+            self._asyncio = self.get_parameter_value('asyncio')
         else:
             # set devices to 'only device, kwargs set as config'
             devices = {standalone_device: kwargs}
+            self._startup_workers = 1
+            self._startup_timeout = 0
+            self._asyncio = False
 
         # iterate over all items in plugin configuration 'devices' list
         #
@@ -701,15 +750,28 @@ class MultiDevice(SmartPlugin):
                 self.logger.warning(f'Duplicate device id {device_id} configured for device_types {device_type} and {self._devices[device_id]["device_type"]}. Skipping processing of spare device type {device_type}')
                 continue
 
+            # asyncio mode for all devices, if not set per device
+            if self._asyncio:
+                param.setdefault(PLUGIN_ATTR_ASYNC, True)
+
+            # don't import modules for manually disabled devices
+            if device_type and PLUGIN_ATTR_ENABLED in param and not param[PLUGIN_ATTR_ENABLED]:
+                self.logger.info(f'device {device_id} has attribute "enabled" set to False, not loading device')
+                continue
+
             # did we get a device type?
             if device_type:
                 device_instance = None
+                import_time = None
                 try:
                     # get module
                     mod_str = 'dev_' + device_type + '.device'
                     if not MD_standalone:
                         mod_str = '.' + mod_str
+                    import_start = time.perf_counter()
                     device_module = importlib.import_module(mod_str, __name__)
+                    import_time = time.perf_counter() - import_start
+                    self.logger.debug(f'imported module {"dev_" + device_type + "/device.py"} for device {device_id} in {import_time * 1000:.1f} ms')
                     # get class
                     device_class = getattr(device_module, 'MD_Device')
                     # get class instance
@@ -724,9 +786,10 @@ class MultiDevice(SmartPlugin):
                     dev_logger = logging.getLogger(f'{__name__}.{device_id}')
 
                     # fill class dicts
-                    self._devices[device_id] = {'device_type': device_type, 'device': device_instance, 'logger': dev_logger, 'params': param}
+                    self._devices[device_id] = {'device_type': device_type, 'device': device_instance, 'logger': dev_logger, 'params': param, 'import_time': import_time}
                     self._commands_read[device_id] = {}
                     self._commands_pseudo[device_id] = {}
+                    self._commands_bound[device_id] = set()
                     self._commands_read_grp[device_id] = {}
                     self._commands_initial[device_id] = []
                     self._triggers_initial[device_id] = []
@@ -741,16 +804,12 @@ class MultiDevice(SmartPlugin):
                     # check for and load struct definitions
                     if not MD_standalone:
                         self.logger.debug(f'trying to load struct definitions for device {device_id} from folder dev_{device_type}')
-                        struct_file = os.path.join(self._plugin_dir, 'dev_' + device_type, 'struct.yaml')
-                        raw_struct = shyaml.yaml_load(struct_file, ordered=True, ignore_notfound=True)
+                        structs = self._load_structs(device_type, device_id, param.get('model'))
 
                         # if valid struct definition is found
-                        if raw_struct is not None:
+                        if structs is not None:
 
-                            struct_list = list(raw_struct.keys())
-                            self.logger.debug(f'loaded {len(struct_list)} structs for processing')
-                            # replace all mentions of 'DEVICENAME' with the plugin/device's name
-                            mod_struct = self._process_struct(raw_struct, device_id)
+                            struct_list, mod_struct = structs
 
                             if param.get('model'):
                                 mod_struct[INDEX_MODEL] = mod_struct[param['model']]
@@ -777,12 +836,18 @@ class MultiDevice(SmartPlugin):
         """
         self.logger.debug('Run method called')
 
+        # build routing table for received values
+        self._build_routes()
+
+        # parsing is done, item tree might change before next parse run
+        self._custom_attr_cache.clear()
+
         # hand over relevant assigned commands and runtime-generated data
         self._apply_on_all_devices('set_runtime_data', self._generate_runtime_data)
 
         # start the devices
         self.alive = True
-        self._apply_on_all_devices('start')
+        self._start_devices()
 
     def stop(self):
         """
@@ -814,10 +879,18 @@ class MultiDevice(SmartPlugin):
                 # reached top of item tree
                 return None
 
+            # each parent is resolved only once, siblings and children use the cached value
+            key = (parent.id(), index)
+            if key in self._custom_attr_cache:
+                return self._custom_attr_cache[key]
+
             if self.has_iattr(parent.conf, ITEM_ATTR_CUSTOM_PREFIX + str(index)):
-                return self.get_iattr_value(parent.conf, ITEM_ATTR_CUSTOM_PREFIX + str(index))
+                val = self.get_iattr_value(parent.conf, ITEM_ATTR_CUSTOM_PREFIX + str(index))
+            else:
+                val = find_custom_attr(parent, index)
 
-            return find_custom_attr(parent, index)
+            self._custom_attr_cache[key] = val
+            return val
 
         # item is marked for plugin handling.
         device_id = self.get_iattr_value(item.conf, ITEM_ATTR_DEVICE)
@@ -829,6 +902,9 @@ class MultiDevice(SmartPlugin):
                 self.logger.warning(f'Item {item} requests device {device_id}, which is not configured, ignoring item')
                 return
 
+            # item might add routes
+            self._routes_dirty = True
+
             device = self.get_device(device_id)
             self.logger.debug(f'Item {item}: parse for device {device_id}')
 
@@ -850,6 +926,14 @@ class MultiDevice(SmartPlugin):
                     device.set_custom_item(item, command, index, val)
                     self._items_custom[item.id()][index] = val
 
+            # only update item on changed values?
+            if self.has_iattr(item.conf, ITEM_ATTR_CHANGES_ONLY):
+                changes_only = self.get_iattr_value(item.conf, ITEM_ATTR_CHANGES_ONLY)
+            else:
+                changes_only = device._params.get(PLUGIN_ATTR_CHANGES_ONLY, False)
+            if changes_only:
+                self._items_changes_only.add(item.id())
+
             custom_token = ''
             if device.custom_commands and self._items_custom[item.id()][device.custom_commands]:
                 custom_token = CUSTOM_SEP + self._items_custom[item.id()][device.custom_commands]
@@ -861,6 +945,8 @@ class MultiDevice(SmartPlugin):
                     self.logger.warning(f'Item {item} requests undefined command {command} for device {device_id}, ignoring item')
                     return
 
+                self._commands_bound[device_id].add(command)
+
                 # if "custom commands" are active for device <dev>, modify command to be
                 # <command>#<customx>, where x is the index of the md_custom<x> item attribute
                 # and <customx> is the value of the attribute.
@@ -1008,11 +1094,11 @@ class MultiDevice(SmartPlugin):
                     device_id = self._items_write[item.id()]['device_id']
                     device = self.get_device(device_id)
                     command = self._items_write[item.id()]['command']
+
+                    # item value differs from device value, so next received value must be set
+                    self._last_values.pop((device_id, command), None)
                     dev_log.debug(f'Writing value "{item()}" from item {item.id()} with command "{command}"')
-                    if not device.send_command(command, item(), custom=self._items_custom[item.id()]):
-                        dev_log.debug(f'Writing value "{item()}" from item {item.id()} with command "{command}" failed, resetting item value')
-                        item(item.property.last_value, self.get_shortname() + '.' + device_id)
-                        return None
+                    device.queue_command(command, item(), callback=self._get_write_callback(item, device_id, command, item(), item.property.last_value), custom=self._items_custom[item.id()])
 
                 elif item.id() in self._items_read_all:
 
@@ -1030,6 +1116,34 @@ class MultiDevice(SmartPlugin):
                     dev_log.debug(f'Triggering read_group {group}')
                     device.read_all_commands(group)
 
+    def _get_write_callback(self, item, device_id, command, value, last_value):
+        """
+        Create completion callback for queued write. If writing fails, the
+        item is reset to its value before the write, unless it has been
+        changed again in the meantime.
+
+        :param item: written item
+        :param device_id: device id
+        :param command: write command
+        :param value: written value
+        :param last_value: item value before the write
+        :type device_id: str
+        :type command: str
+        :return: callback function
+        :rtype: function
+        """
+        def callback(result):
+            if result:
+                return
+            dev_log = self._get_device_logger(device_id)
+            if item() != value:
+                dev_log.debug(f'Writing value "{value}" from item {item.id()} with command "{command}" failed, item was changed in the meantime, not resetting item value')
+                return
+            dev_log.debug(f'Writing value "{value}" from item {item.id()} with command "{command}" failed, resetting item value')
+            item(last_value, self.get_shortname() + '.' + device_id)
+
+        return callback
+
     def on_data_received(self, device_id, command, value, by=None):
         """
         Callback function - new data has been received from device.
@@ -1042,25 +1156,83 @@ class MultiDevice(SmartPlugin):
         :type device_id: str
         :type command: str
         """
-        if self.alive:
+        if not self.alive:
+            return
 
-            # from here on, use device's logger so messages are displayed for the device
-            dev_log = self._get_device_logger(device_id)
-            item = None
+        if self._routes_dirty:
+            self._build_routes()
 
-            # check if combination of device_id and command is configured for reading
-            if device_id in self._commands_read:
-                items = self._commands_read[device_id].get(command, [])
-            elif device_id in self._commands_pseudo:
-                items = self._commands_pseudo[device_id].get(command, [])
+        self._set_items(device_id, command, value, self.logger.isEnabledFor(logging.DEBUG))
 
-            if not items:
-                dev_log.warning(f'Command {command} yielded value {value}, not assigned to any item, discarding data')
-                return
+    def on_data_received_many(self, device_id, values):
+        """
+        Callback function - multiple values have been received from device,
+        e.g. from one status message. Values are already in item-compatible
+        format, so find appropriate items and update values in one pass.
+
+        :param device_id: name of the originating device
+        :param values: list of (command, value, by) tuples
+        :type device_id: str
+        :type values: list
+        """
+        if not self.alive:
+            return
+
+        if self._routes_dirty:
+            self._build_routes()
 
-            for item in items:
-                dev_log.debug(f'Command {command} updated item {item.id()} with value {value}')
-                item(value, self.get_shortname() + '.' + device_id)
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        for command, value, by in values:
+            self._set_items(device_id, command, value, debug)
+
+    def _set_items(self, device_id, command, value, debug=False):
+        """
+        set all items routed to device_id and command to value
+
+        :param device_id: name of the originating device
+        :param command: command for or in reply to which data was received
+        :param value: data
+        :param debug: log item updates
+        :type device_id: str
+        :type command: str
+        :type debug: bool
+        """
+        route = self._routes.get((device_id, command))
+        if route is None:
+            self._get_device_logger(device_id).warning(f'Command {command} yielded value {value}, not assigned to any item, discarding data')
+            return
+
+        # compare with last value received for this command
+        key = (device_id, command)
+        unchanged = key in self._last_values and self._last_values[key] == value
+        self._last_values[key] = value
+
+        caller, items = route
+        for item, changes_only in items:
+            if unchanged and changes_only and item() == value:
+                if debug:
+                    self._get_device_logger(device_id).debug(f'Command {command} yielded unchanged value {value}, not updating item {item.id()}')
+                continue
+            if debug:
+                self._get_device_logger(device_id).debug(f'Command {command} updated item {item.id()} with value {value}')
+            item(value, caller)
+
+    def _build_routes(self):
+        """
+        Build read-only routing table from read and pseudo commands, mapping
+        (device_id, command) to the caller string and the items to set.
+        """
+        # reset first, so items parsed while building mark the table dirty again
+        self._routes_dirty = False
+        routes = {}
+        for device_id in self._devices:
+            caller = self.get_shortname() + '.' + device_id
+            for commands in (self._commands_read.get(device_id, {}), self._commands_pseudo.get(device_id, {})):
+                for command, items in commands.items():
+                    routes.setdefault((device_id, command), (caller, []))[1].extend((item, item.id() in self._items_changes_only) for item in items)
+
+        self._routes = MappingProxyType({key: (caller, tuple(items)) for key, (caller, items) in routes.items()})
+        self.logger.debug(f'built routing table with {len(self._routes)} entries')
 
     def _update_device_params(self, device_id):
         """
@@ -1099,6 +1271,81 @@ class MultiDevice(SmartPlugin):
                 kwargs = args_function(device)
             getattr(self.get_device(device), method)(**kwargs)
 
+    def _start_devices(self):
+        """
+        Start all devices concurrently in a thread pool. Returns immediately,
+        start results are checked and logged by a supervisor thread.
+        """
+        executor = ThreadPoolExecutor(max_workers=self._startup_workers, thread_name_prefix=f'{self.get_shortname()}_start')
+        started = {}
+        futures = {executor.submit(self._start_device, device_id, started): device_id for device_id in self._devices}
+
+        # don't wait for running starts, the executor threads end on their own
+        executor.shutdown(wait=False)
+
+        threading.Thread(target=self._supervise_start, args=(futures, started), name=f'{self.get_shortname()}_start_supervisor', daemon=True).start()
+        self.logger.debug(f'dispatched start of {len(futures)} devices with {self._startup_workers} workers')
+
+    def _start_device(self, device_id, started):
+        """
+        Start device, record start time for supervisor
+
+        :param device_id: device to start
+        :param started: dict to record start time in
+        :type device_id: str
+        :type started: dict
+        """
+        if not self.alive:
+            return
+        started[device_id] = time.time()
+        self.get_device(device_id).start()
+
+    def _supervise_start(self, futures, started):
+        """
+        Wait for device starts to finish, log failures and stop devices which
+        didn't start within startup_timeout
+
+        :param futures: dict of <future>: <device_id>
+        :param started: dict of <device_id>: <start time>
+        :type futures: dict
+        :type started: dict
+        """
+        failed = []
+        pending = dict(futures)
+        while pending and self.alive:
+            for future, device_id in list(pending.items()):
+                if future.done():
+                    del pending[future]
+                    if future.cancelled():
+                        continue
+                    e = future.exception()
+                    if e:
+                        self._get_device_logger(device_id).error(f'device {device_id} could not be started, error was {e}')
+                        failed.append(device_id)
+                    else:
+                        self._get_device_logger(device_id).debug(f'device {device_id} started in {time.time() - started[device_id]:.1f} seconds')
+
+                elif self._startup_timeout and device_id in started and time.time() - started[device_id] > self._startup_timeout:
+                    del pending[future]
+                    self._get_device_logger(device_id).error(f'device {device_id} did not start within {self._startup_timeout} seconds, stopping device')
+                    failed.append(device_id)
+                    try:
+                        self.get_device(device_id).stop()
+                    except Exception as e:
+                        self._get_device_logger(device_id).warning(f'error on stopping device {device_id}, error was {e}')
+
+            if pending:
+                wait(list(pending), timeout=0.5, return_when=FIRST_COMPLETED)
+
+        # plugin stopped while devices were starting
+        for future in pending:
+            future.cancel()
+
+        if failed:
+            self.logger.warning(f'{len(futures) - len(failed)} of {len(futures)} devices started, failed devices: {", ".join(failed)}')
+        elif not pending:
+            self.logger.info(f'all {len(futures)} devices started')
+
     def _generate_runtime_data(self, device_id):
         """
         generate dict with device-specific data needed to run, which is
@@ -1107,6 +1354,8 @@ class MultiDevice(SmartPlugin):
         - list of all cyclic commands with cycle times
         - list of all initial read commands
         - callback for returning data to the plugin
+        - callback for returning multiple values at once to the plugin
+        - list of all commands bound to items
         """
         return {
             'read_commands': self._commands_read[device_id].keys(),
@@ -1115,7 +1364,9 @@ class MultiDevice(SmartPlugin):
             'cycle_triggers': self._triggers_cyclic[device_id],
             'initial_commands': self._commands_initial[device_id],
             'initial_triggers': self._triggers_initial[device_id],
-            'callback': self.on_data_received
+            'callback': self.on_data_received,
+            'callback_many': self.on_data_received_many,
+            'bound_commands': self._commands_bound[device_id]
         }
 
     def get_device(self, device_id):
@@ -1126,6 +1377,26 @@ class MultiDevice(SmartPlugin):
         else:
             return None
 
+    def get_latency_stats(self, device_id=None, command=None):
+        """
+        Return latency statistics of all devices or the given device
+
+        :param device_id: device id, return all devices if None
+        :param command: command name, return all commands if None
+        :type device_id: str
+        :type command: str
+        :return: dict of {device_id: {command: {phase: histogram dict}}}
+        :rtype: dict
+        """
+        if device_id is None:
+            devices = list(self._devices.keys())
+        elif device_id in self._devices:
+            devices = [device_id]
+        else:
+            return {}
+
+        return {dev: self._devices[dev]['device'].get_latency_stats(command) for dev in devices}
+
     def _get_device_logger(self, device_id):
         """ getter for device logger, return plugin logger on error """
         log = self.logger
@@ -1134,7 +1405,65 @@ class MultiDevice(SmartPlugin):
             log = dev.get('logger', self.logger)
         return log
 
-    def _process_struct(self, raw_struct, device_id):
+    def _load_structs(self, device_type, device_id, model=None):
+        """
+        load struct definitions for device, replace all mentions of
+        'DEVICENAME' with the device's name and clean structs if configured.
+
+        Cleaned structs are cached by device type, model, file modification
+        time and clean_structs setting, so other devices of the same type and
+        plugin restarts only need to replace the device name.
+
+        :param device_type: device type
+        :param device_id: device name
+        :param model: device model
+        :type device_type: str
+        :type device_id: str
+        :type model: str
+        :return: tuple of (list of struct names, dict of structs) or None if no structs found
+        :rtype: tuple
+        """
+        struct_file = os.path.join(self._plugin_dir, 'dev_' + device_type, 'struct.yaml')
+        try:
+            mtime = os.stat(struct_file).st_mtime_ns
+        except OSError:
+            return None
+
+        clean = bool(self._devices[device_id]['device']._params.get(PLUGIN_ATTR_CLEAN_STRUCTS, False))
+        key = (device_type, model, mtime, clean)
+        if key in _struct_cache:
+            self.logger.debug(f'using cached structs for device type {device_type}')
+        else:
+            raw_struct = shyaml.yaml_load(struct_file, ordered=True, ignore_notfound=True)
+            if raw_struct is None:
+                return None
+
+            struct_list = list(raw_struct.keys())
+            self.logger.debug(f'loaded {len(struct_list)} structs for processing')
+            _struct_cache[key] = (struct_list, self._clean_struct(raw_struct, device_id) if clean else raw_struct)
+
+        struct_list, structs = _struct_cache[key]
+        return list(struct_list), self._replace_devicename(structs, device_id)
+
+    def _replace_devicename(self, node, device_id):
+        """
+        return copy of node with all mentions of 'DEVICENAME' in keys and
+        strings replaced with device_id
+
+        :param node: struct node or value
+        :param device_id: device name
+        :type device_id: str
+        :return: copy of node
+        """
+        if isinstance(node, str):
+            return node.replace('DEVICENAME', device_id)
+        elif isinstance(node, dict):
+            return type(node)((self._replace_devicename(key, device_id), self._replace_devicename(val, device_id)) for key, val in node.items())
+        elif isinstance(node, (list, tuple)):
+            return type(node)(self._replace_devicename(val, device_id) for val in node)
+        return node
+
+    def _clean_struct(self, mod_struct, device_id):
         """ clean structs before adding - remove unsupported commands """
 
         def walk(node, node_name, parent=None, func=None):
@@ -1159,16 +1488,6 @@ class MultiDevice(SmartPlugin):
             if len(node) == 0:
                 del parent[node_name]
 
-        # make struct items' md_device refer to our device
-        try:
-            mod_struct = eval(str(raw_struct).replace('DEVICENAME', device_id))
-        except Exception as e:
-            self.logger.warning(f'importing structs for device {device_id} failed, check struct definitions. Error was: {e}')
-            return {}
-
-        if not self._devices[device_id]['device']._params.get(PLUGIN_ATTR_CLEAN_STRUCTS, False):
-            return mod_struct
-
         obj = OrderedDict({'structs': mod_struct})
 
         # remove all items with invalid 'md_command' attribute from structs
@@ -1199,14 +1518,33 @@ class MultiDevice(SmartPlugin):
 item_tree = {}
 
 
-def create_struct_yaml(device, indentwidth=4, write_output=False, acl=False):
-    """ read commands.py and export struct.yaml """
-    global item_tree
+def _create_struct_part(kind, name, node, item_templates, indentwidth=4, acl=False):
+    """
+    create struct.yaml text for one model or section of commands.py
+
+    This is called by create_struct_yaml(), possibly in worker processes, so
+    it needs to be a module level function and must not use global state.
+
+    :param kind: 'models' for commands dict with models at top level, 'section' for section or 'model' for model-filtered commands
+    :param name: name of model or section
+    :param node: commands dict for model or section
+    :param item_templates: item templates from commands.py
+    :param indentwidth: number of spaces for indentation
+    :param acl: add visu_acl attributes
+    :type kind: str
+    :type name: str
+    :type node: dict
+    :type item_templates: dict
+    :type indentwidth: int
+    :type acl: bool
+    :return: struct.yaml text for model or section
+    :rtype: str
+    """
+    item_tree = {}
+    lines = []
 
     def add_item_to_tree(item_path, item_dict):
         """ add entry for custom read group triggers """
-        global item_tree
-
         dst_path_elems = item_path.split('.')
         item = {dst_path_elems[-1]: item_dict}
         for elem in reversed(dst_path_elems[:-1]):
@@ -1214,6 +1552,7 @@ def create_struct_yaml(device, indentwidth=4, write_output=False, acl=False):
 
         update(item_tree, item)
 
+
     def walk(node, node_name, parent, func, path, indent, gpath, gpathlist, has_models, func_first=True, cut_levels=0):
         """ traverses a nested dict
 
@@ -1415,7 +1754,7 @@ def create_struct_yaml(device, indentwidth=4, write_output=False, acl=False):
 
         def p_text(text, add=0):
             """ print indented text """
-            print(f'{INDENT * (indent + add)}{text}')
+            lines.append(f'{INDENT * (indent + add)}{text}')
 
         # item / level definition
         p_text(f'{node_name}:')
@@ -1427,17 +1766,80 @@ def create_struct_yaml(device, indentwidth=4, write_output=False, acl=False):
             else:
                 p_text(f'{key}: {node[key]}', 1)
 
-        print()
+        lines.append('')
 
-    def removeItemsUndefCmd(node, node_name, parent, path, indent, gpath, gpathlist, cut_levels=0):
-        if CMD_ATTR_ITEM_TYPE in node and path not in cmdlist:
-            del parent[node_name]
+    INDENT = ' ' * indentwidth
 
-    def removeEmptyItems(node, node_name, parent, path, indent, gpath, gpathlist, cut_levels=0):
-        if len(node) == 0:
-            del parent[node_name]
+    if kind == 'models':
+        # create item tree
+        walk(node, '', None, create_item, '', 0, name, [name], True)
+
+        # print item tree
+        walk(item_tree, name, item_tree, print_item, '', 0, '', [], False)
+
+    elif kind == 'section':
+        # create item tree
+        walk(node, name, None, create_item, name, 0, '', [], True)
+
+        # print item tree
+        walk(item_tree[name], name, item_tree, print_item, '', 0, '', [], False)
+
+    else:
+        # create item tree
+        walk(node, name, None, create_item, name, 0, '', [], False, cut_levels=1)
+
+        # print item tree
+        walk(item_tree[name], name, item_tree, print_item, '', 0, '', [], False)
+
+    return ''.join(line + '\n' for line in lines)
+
+
+def create_struct_yaml(device, indentwidth=4, write_output=False, acl=False):
+    """
+    read commands.py and export struct.yaml
+
+    The item tree for each model or section is created separately. Results
+    are cached in dev_<device>/__pycache__/ by a hash of the model's
+    commands and the generator settings, so only models whose command
+    definitions changed are created again, if needed in parallel worker
+    processes. Output is collected and written at once.
+    """
+    def filter_commands(node, path, cmdlist):
+        """ return copy of node without commands not in cmdlist and without empty nodes """
+        result = {}
+        for key, value in node.items():
+            if isinstance(value, dict):
+                cmd = path + COMMAND_SEP + key if path else key
+                if CMD_ATTR_ITEM_TYPE in value and cmd not in cmdlist:
+                    continue
+                value = filter_commands(value, cmd, cmdlist)
+                if not value:
+                    continue
+            result[key] = value
+        return result
+
+    def load_cache():
+        """ load cached struct texts, return empty cache on error """
+        try:
+            with open(cache_file, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            return {}
+
+    def save_cache(cache):
+        """ save cached struct texts, errors are ignored """
+        tmpfile = f'{cache_file}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with open(tmpfile, 'wb') as f:
+                pickle.dump(cache, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpfile, cache_file)
+        except Exception:
+            try:
+                os.remove(tmpfile)
+            except OSError:
+                pass
 
-    INDENT = ' ' * indentwidth
     MODELINE = f'# vim: expandtab:ts={indentwidth}:sw={indentwidth}'
 
     mod_str = 'plugins.multidevice.dev_' + device + '.commands'
@@ -1450,17 +1852,21 @@ def create_struct_yaml(device, indentwidth=4, write_output=False, acl=False):
     top_level_entries = list(commands.keys())
 
     item_templates = getattr(cmd_module, 'item_templates', {})
-    old_stdout = sys.stdout
+    plugin_dir = os.path.dirname(os.path.realpath(__file__))
+    cache_file = os.path.join(plugin_dir, 'dev_' + device, '__pycache__', f'{STRUCT_CACHE_PREFIX}.{sys.implementation.cache_tag}.pickle')
+    file = 'plugins/multidevice/dev_' + device + '/struct.yaml'
     err = None
 
     try:
-        if write_output:
-            file = 'plugins/multidevice/dev_' + device + '/struct.yaml'
-            sys.stdout = open(file, 'w')
+        # generator code is part of the hash, changes to it invalidate the cache
+        generator = hashlib.sha1()
+        for source in ('__init__.py', 'MD_Globals.py'):
+            with open(os.path.join(plugin_dir, source), 'rb') as f:
+                generator.update(f.read())
+        settings = repr((generator.hexdigest(), item_templates, indentwidth, acl))
 
-        print('%YAML 1.1')
-        print('---')
-        print(MODELINE)
+        # list of (kind, name, commands) for each part of struct.yaml
+        parts = []
 
         # this means the commands dict has 'ALL' and model names at the top level
         # otherwise, these be commands or sections
@@ -1470,39 +1876,20 @@ def create_struct_yaml(device, indentwidth=4, write_output=False, acl=False):
 
             for model in top_level_entries:
 
-                # create model-specific commands dict
-                m_commands = commands.get(INDEX_GENERIC, {})
-                update(m_commands, commands.get(model))
-
-                # create work obj for entry
-                obj = {model: m_commands}
-
-                item_tree = {}
-
-                # create item tree
-                walk(obj[model], '', None, create_item, '', 0, model, [model], True)
-
-                # print item tree
-                walk(item_tree, model, item_tree, print_item, '', 0, '', [], False)
+                # create model-specific commands dict, copy 'ALL' to keep it unchanged
+                m_commands = update(update({}, commands.get(INDEX_GENERIC, {})), commands.get(model))
+                parts.append(('models', model, m_commands))
 
         else:
 
-            # create flat commands, 'valid command' comparison needs full cmd path
-            flat_commands = deepcopy(commands)
-            MD_Commands._flatten_cmds(None, flat_commands)
-
             # output sections separately and unchanged
             for section in top_level_entries:
+                parts.append(('section', section, commands[section]))
 
-                item_tree = {}
-
-                obj = {section: commands[section]}
-
-                # create item tree
-                walk(obj[section], section, None, create_item, section, 0, '', [], True)
-
-                # print item tree
-                walk(item_tree[section], section, item_tree, print_item, '', 0, '', [], False)
+            # create flat commands, 'valid command' comparison needs full cmd path
+            flat_commands = deepcopy(commands)
+            MD_Commands._flatten_cmds(None, flat_commands)
+            cmd_trie = MD_CommandTrie(flat_commands)
 
             # get model definitions
             # if not present, fake it to include all sections
@@ -1512,36 +1899,50 @@ def create_struct_yaml(device, indentwidth=4, write_output=False, acl=False):
 
             for model in models:
 
-                item_tree = {}
-
                 # create list of valid commands
-                cmdlist = models[model]
+                cmdlist = list(models[model])
                 if model != INDEX_GENERIC:
                     cmdlist += models.get(INDEX_GENERIC, [])
-                cmdlist = MD_Commands._get_cmdlist(None, flat_commands, cmdlist)
+                cmdlist = set(MD_Commands._get_cmdlist(None, flat_commands, cmdlist, cmd_trie))
 
-                # create new obj for model m, include m['ALL']
-                # as we modify obj, we need to copy this
-                obj = {model: deepcopy(commands)}
+                # create model view, only containing model-valid commands and no empty nodes
+                parts.append(('model', model, filter_commands(commands, '', cmdlist)))
 
-                # remove all items with model-invalid 'md_command' attribute obj
-                walk(obj[model], model, obj, removeItemsUndefCmd, '', 0, model, [model], True, False)
+        cache = load_cache()
+        digests = [hashlib.sha1(repr((kind, name, node)).encode() + settings.encode()).hexdigest() for kind, name, node in parts]
+        todo = [index for index, digest in enumerate(digests) if digest not in cache]
 
-                # remove all empty items from obj
-                walk(obj[model], model, obj, removeEmptyItems, '', 0, model, [model], True, False)
+        if todo:
+            args = [[parts[index][arg] for index in todo] for arg in range(3)]
+            texts = None
+            if len(todo) > 1:
+                try:
+                    with ProcessPoolExecutor() as executor:
+                        texts = list(executor.map(_create_struct_part, *args, [item_templates] * len(todo), [indentwidth] * len(todo), [acl] * len(todo)))
+                except Exception:
+                    # no worker processes available, create parts in this process
+                    texts = None
+            if texts is None:
+                texts = [_create_struct_part(kind, name, node, item_templates, indentwidth, acl) for kind, name, node in zip(*args)]
 
-                # create item tree
-                walk(obj[model], model, obj, create_item, model, 0, '', [], False, cut_levels=1)
+            for index, text in zip(todo, texts):
+                cache[digests[index]] = text
 
-                # print item tree
-                walk(item_tree[model], model, item_tree, print_item, '', 0, '', [], False)
+            # only keep current parts
+            save_cache({digest: cache[digest] for digest in digests})
+
+        output = ''.join(['%YAML 1.1\n', '---\n', MODELINE + '\n'] + [cache[digest] for digest in digests])
+
+        if write_output:
+            with open(file, 'w') as f:
+                f.write(output)
+        else:
+            sys.stdout.write(output)
 
     except OSError as e:
         err = f'Error: file {file} could not be opened. Original error: {e}'
     except Exception as e:
         err = f'Unknown error occured while processing. Original error: {e}'
-    finally:
-        sys.stdout = old_stdout
 
     if err:
         print(err)
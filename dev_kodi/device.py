@@ -101,6 +101,9 @@ class MD_Device(MD_Device):
 
         query_playerinfo = []
 
+        # values from one reply or notification are collected and sent to the plugin in one batch
+        values = []
+
         processed = False
 
         # replies to requests sent by us
@@ -112,8 +115,8 @@ class MD_Device(MD_Device):
                     query_playerinfo = self._activeplayers = [result_data[0].get('playerid')]
                     self._playerid = self._activeplayers[0]
                     self.logger.debug(f'received GetActivePlayers, set playerid to {self._playerid}')
-                    self._data_received_callback(self.device_id, 'info.player', self._playerid)
-                    self._data_received_callback(self.device_id, 'info.media', result_data[0].get('type').capitalize())
+                    values.append(('info.player', self._playerid))
+                    values.append(('info.media', result_data[0].get('type').capitalize()))
                 elif len(result_data) > 1:
                     # multiple active players. Have not yet seen this happen
                     self._activeplayers = []
@@ -125,16 +128,16 @@ class MD_Device(MD_Device):
                 else:
                     # no active players
                     self._activeplayers = []
-                    self._data_received_callback(self.device_id, 'info.state', 'No active player')
-                    self._data_received_callback(self.device_id, 'info.player', 0)
-                    self._data_received_callback(self.device_id, 'info.title', '')
-                    self._data_received_callback(self.device_id, 'info.media', '')
-                    self._data_received_callback(self.device_id, 'control.stop', True)
-                    self._data_received_callback(self.device_id, 'control.playpause', False)
-                    self._data_received_callback(self.device_id, 'info.streams', None)
-                    self._data_received_callback(self.device_id, 'info.subtitles', None)
-                    self._data_received_callback(self.device_id, 'control.audio', '')
-                    self._data_received_callback(self.device_id, 'control.subtitle', '')
+                    values.append(('info.state', 'No active player'))
+                    values.append(('info.player', 0))
+                    values.append(('info.title', ''))
+                    values.append(('info.media', ''))
+                    values.append(('control.stop', True))
+                    values.append(('control.playpause', False))
+                    values.append(('info.streams', None))
+                    values.append(('info.subtitles', None))
+                    values.append(('control.audio', ''))
+                    values.append(('control.subtitle', ''))
                     self._playerid = 0
                     self.logger.debug('received GetActivePlayers, reset playerid to 0')
 
@@ -144,8 +147,8 @@ class MD_Device(MD_Device):
                 muted = result_data.get('muted')
                 volume = result_data.get('volume')
                 self.logger.debug(f'received GetProperties: change mute to {muted} and volume to {volume}')
-                self._data_received_callback(self.device_id, 'control.mute', muted)
-                self._data_received_callback(self.device_id, 'control.volume', volume)
+                values.append(('control.mute', muted))
+                values.append(('control.volume', volume))
 
             # got favourites
             elif command == 'Favourites.GetFavourites':
@@ -155,7 +158,7 @@ class MD_Device(MD_Device):
                 else:
                     item_dict = {item['title']: item for item in result_data.get('favourites')}
                     self.logger.debug(f'favourites found: {item_dict}')
-                    self._data_received_callback(self.device_id, 'status.get_favourites', item_dict)
+                    values.append(('status.get_favourites', item_dict))
 
             # got item info
             elif command == 'Player.GetItem':
@@ -164,38 +167,38 @@ class MD_Device(MD_Device):
                 player_type = result_data['item'].get('type')
                 if not title:
                     title = result_data['item'].get('label')
-                self._data_received_callback(self.device_id, 'info.media', player_type.capitalize())
+                values.append(('info.media', player_type.capitalize()))
                 if player_type == 'audio' and 'artist' in result_data['item']:
                     artist = 'unknown' if len(result_data['item'].get('artist')) == 0 else result_data['item'].get('artist')[0]
                     title = artist + ' - ' + title
                 if title:
-                    self._data_received_callback(self.device_id, 'info.title', title)
+                    values.append(('info.title', title))
                 self.logger.debug(f'received GetItem: update player info to title={title}, type={player_type}')
 
             # got player status
             elif command == 'Player.GetProperties':
                 processed = True
                 self.logger.debug('Received Player.GetProperties, update media data')
-                self._data_received_callback(self.device_id, 'control.speed', result_data.get('speed'))
-                self._data_received_callback(self.device_id, 'control.seek', result_data.get('percentage'))
-                self._data_received_callback(self.device_id, 'info.streams', result_data.get('audiostreams'))
-                self._data_received_callback(self.device_id, 'control.audio', result_data.get('currentaudiostream'))
-                self._data_received_callback(self.device_id, 'info.subtitles', result_data.get('subtitles'))
+                values.append(('control.speed', result_data.get('speed')))
+                values.append(('control.seek', result_data.get('percentage')))
+                values.append(('info.streams', result_data.get('audiostreams')))
+                values.append(('control.audio', result_data.get('currentaudiostream')))
+                values.append(('info.subtitles', result_data.get('subtitles')))
                 if result_data.get('subtitleenabled'):
                     subtitle = result_data.get('currentsubtitle')
                 else:
                     subtitle = 'Off'
-                self._data_received_callback(self.device_id, 'control.subtitle', subtitle)
+                values.append(('control.subtitle', subtitle))
 
                 # speed != 0 -> play; speed == 0 -> pause
                 if result_data.get('speed') == 0:
-                    self._data_received_callback(self.device_id, 'info.state', 'Paused')
-                    self._data_received_callback(self.device_id, 'control.stop', False)
-                    self._data_received_callback(self.device_id, 'control.playpause', False)
+                    values.append(('info.state', 'Paused'))
+                    values.append(('control.stop', False))
+                    values.append(('control.playpause', False))
                 else:
-                    self._data_received_callback(self.device_id, 'info.state', 'Playing')
-                    self._data_received_callback(self.device_id, 'control.stop', False)
-                    self._data_received_callback(self.device_id, 'control.playpause', True)
+                    values.append(('info.state', 'Playing'))
+                    values.append(('control.stop', False))
+                    values.append(('control.playpause', True))
 
         # not replies, but event notifications.
         elif 'method' in data:
@@ -204,39 +207,39 @@ class MD_Device(MD_Device):
             if data['method'] == 'Player.OnResume':
                 processed = True
                 self.logger.debug('received: resumed player')
-                self._data_received_callback(self.device_id, 'info.state', 'Playing')
-                self._data_received_callback(self.device_id, 'control.stop', False)
-                self._data_received_callback(self.device_id, 'control.playpause', True)
+                values.append(('info.state', 'Playing'))
+                values.append(('control.stop', False))
+                values.append(('control.playpause', True))
                 query_playerinfo.append(data['params']['data']['player']['playerid'])
 
             elif data['method'] == 'Player.OnPause':
                 processed = True
                 self.logger.debug('received: paused player')
-                self._data_received_callback(self.device_id, 'info.state', 'Paused')
-                self._data_received_callback(self.device_id, 'control.stop', False)
-                self._data_received_callback(self.device_id, 'control.playpause', False)
+                values.append(('info.state', 'Paused'))
+                values.append(('control.stop', False))
+                values.append(('control.playpause', False))
                 query_playerinfo.append(data['params']['data']['player']['playerid'])
 
             elif data['method'] == 'Player.OnStop':
                 processed = True
                 self.logger.debug('received: stopped player, set playerid to 0')
-                self._data_received_callback(self.device_id, 'info.state', 'No active player')
-                self._data_received_callback(self.device_id, 'info.media', '')
-                self._data_received_callback(self.device_id, 'info.title', '')
-                self._data_received_callback(self.device_id, 'info.player', 0)
-                self._data_received_callback(self.device_id, 'control.stop', True)
-                self._data_received_callback(self.device_id, 'control.playpause', False)
-                self._data_received_callback(self.device_id, 'info.streams', None)
-                self._data_received_callback(self.device_id, 'info.subtitles', None)
-                self._data_received_callback(self.device_id, 'control.audio', '')
-                self._data_received_callback(self.device_id, 'control.subtitle', '')
+                values.append(('info.state', 'No active player'))
+                values.append(('info.media', ''))
+                values.append(('info.title', ''))
+                values.append(('info.player', 0))
+                values.append(('control.stop', True))
+                values.append(('control.playpause', False))
+                values.append(('info.streams', None))
+                values.append(('info.subtitles', None))
+                values.append(('control.audio', ''))
+                values.append(('control.subtitle', ''))
                 self._activeplayers = []
                 self._playerid = 0
 
             elif data['method'] == 'GUI.OnScreensaverActivated':
                 processed = True
                 self.logger.debug('received: activated screensaver')
-                self._data_received_callback(self.device_id, 'info.state', 'Screensaver')
+                values.append(('info.state', 'Screensaver'))
 
             elif data['method'][:9] == 'Player.On':
                 processed = True
@@ -246,22 +249,24 @@ class MD_Device(MD_Device):
                     if p_id:
                         self._playerid = p_id
                         self._activeplayers.append(p_id)
-                        self._data_received_callback(self.device_id, 'info.player', p_id)
+                        values.append(('info.player', p_id))
                     query_playerinfo.append(p_id)
                 except KeyError:
                     pass
 
                 try:
-                    self._data_received_callback(self.device_id, 'info.media', data['params']['data']['item']['channeltype'])
-                    self._data_received_callback(self.device_id, 'info.title', data['params']['data']['item']['title'])
+                    values.append(('info.media', data['params']['data']['item']['channeltype']))
+                    values.append(('info.title', data['params']['data']['item']['title']))
                 except KeyError:
                     pass
 
             elif data['method'] == 'Application.OnVolumeChanged':
                 processed = True
                 self.logger.debug('received: volume changed, got new values mute: {} and volume: {}'.format(data['params']['data']['muted'], data['params']['data']['volume']))
-                self._data_received_callback(self.device_id, 'control.mute', data['params']['data']['muted'])
-                self._data_received_callback(self.device_id, 'control.volume', data['params']['data']['volume'])
+                values.append(('control.mute', data['params']['data']['muted']))
+                values.append(('control.volume', data['params']['data']['volume']))
+
+        self._dispatch_many(values)
 
         # if active playerid(s) was changed, update status for active player(s)
         if query_playerinfo:
@@ -33,12 +33,22 @@ class MD_Device(MD_Device):
         if not res:
             self.logger.debug(f'custom token not found in {data}, ignoring')
             return None
-        elif res in self._custom_values[self.custom_commands] or res in ('', '-'):
+        elif res in ('', '-'):
             return res
+
+        custom = self._find_custom_value(res)
+        if custom is not None:
+            return custom
         else:
             self.logger.debug(f'received custom token {res}, not in list of known tokens {self._custom_values[self.custom_commands]}')
             return None
 
+    def _normalize_custom_value(self, value):
+        """ MAC addresses are compared in lowercase with colons """
+        if isinstance(value, str):
+            return value.lower().replace('-', ':')
+        return value
+
     def _transform_received_data(self, data):
         if isinstance(data, dict) and 'result' in data and len(data['result']) == 1:
             data['result'] = list(data['result'].values())[0]
@@ -58,17 +68,26 @@ class MD_Device(MD_Device):
 
     def _process_additional_data(self, command, data, value, custom, by):
 
+        # values are collected and sent to the plugin in one batch
+        values = []
+
         def _dispatch(command, value, custom=None, send=False):
             if custom:
                 command = command + CUSTOM_SEP + custom
             if send:
                 self.send_command(command, value)
-            elif self._data_received_callback:
-                self._data_received_callback(self.device_id, command, value)
+            else:
+                values.append((command, value))
+
+        def _flush():
+            self._dispatch_many(values)
+            values.clear()
 
         def _trigger_read(command, custom=None):
             if custom:
                 command = command + CUSTOM_SEP + custom
+            # keep order of collected values and read results
+            _flush()
             self.logger.debug(f"Sending read command for {command}")
             self.send_command(command)
 
@@ -116,3 +135,5 @@ class MD_Device(MD_Device):
                 for id, i in enumerate(pdata):
                     if id > 0 and id <= 5:
                         _dispatch(f'player.playlist.nextsong{id}', i.get("title"), custom)
+
+        _flush()
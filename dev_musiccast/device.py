@@ -68,12 +68,18 @@ class MD_Device(MD_Device):
 
     def data_callback(self, device_id, command, data, by=None):
 
+        # values are collected and sent to the plugin in one batch
+        values = []
+
         def _dispatch(command, value, custom=None):
-            # send command via callback to plugin
+            # collect command for sending to plugin
             if custom:
                 command = command + CUSTOM_SEP + custom
-            if self._plugin_callback:
-                self._plugin_callback(device_id, command, value)
+            values.append((command, value))
+
+        def _flush():
+            self._dispatch_many(values, self._plugin_callback)
+            values.clear()
 
         def _check_value(token, value, custom):
             # test if current token designates valid command and process it
@@ -97,6 +103,8 @@ class MD_Device(MD_Device):
                     if custom:
                         cmd = cmd + CUSTOM_SEP + custom
                     self.logger.debug(f'found trigger command {token}, issuing command {cmd}')
+                    # keep order of collected values and command results
+                    _flush()
                     self.send_command(cmd)
 
         # start method
@@ -142,3 +150,5 @@ class MD_Device(MD_Device):
                         _check_value(l1 + COMMAND_SEP + l2, data[l1][l2], custom)
             else:
                 _check_value(l1, data[l1], custom)
+
+        _flush()
@@ -32,6 +32,12 @@ class MD_Device(MD_Device):
         self._use_callbacks = True
         self._params[PLUGIN_ATTR_RECURSIVE] = 1
 
+    def _normalize_custom_value(self, value):
+        """ MAC addresses are compared in lowercase with colons """
+        if isinstance(value, str):
+            return value.lower().replace('-', ':')
+        return value
+
     def on_connect(self, by=None):
         self.logger.debug("Activating listen mode after connection.")
         self.send_command('server.listenmode', True)
@@ -51,17 +57,26 @@ class MD_Device(MD_Device):
 
     def _process_additional_data(self, command, data, value, custom, by):
 
+        # values are collected and sent to the plugin in one batch
+        values = []
+
         def _dispatch(command, value, custom=None, send=False):
             if custom:
                 command = command + CUSTOM_SEP + custom
             if send:
                 self.send_command(command, value)
-            elif self._data_received_callback:
-                self._data_received_callback(self.device_id, command, value)
+            else:
+                values.append((command, value))
+
+        def _flush():
+            self._dispatch_many(values)
+            values.clear()
 
         def _trigger_read(command, custom=None):
             if custom:
                 command = command + CUSTOM_SEP + custom
+            # keep order of collected values and read results
+            _flush()
             self.logger.debug(f"Sending read command for {command}")
             self.send_command(command)
 
@@ -116,3 +131,5 @@ class MD_Device(MD_Device):
         # update play and stop items based on playmode
         if command == 'player.control.stop' or (command == 'player.control.playpause' and value == "False"):
             _trigger_read('player.control.playmode', custom)
+
+        _flush()
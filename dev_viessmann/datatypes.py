@@ -9,6 +9,12 @@ else:
 import re
 import dateutil
 import datetime
+import struct
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 # V = Viessmann, generic numeric type
@@ -40,6 +46,32 @@ class DT_V(DT.Datatype):
         else:
             return type(val)
 
+    @staticmethod
+    def get_layout(entries):
+        """
+        create layout for get_shng_data_block()
+
+        :param entries: list of (offset, length, signed, mult) tuples, one per command
+        :type entries: list
+        :return: layout object
+        :rtype: DatapointLayout
+        """
+        return DatapointLayout(entries)
+
+    @staticmethod
+    def get_shng_data_block(data, layout):
+        """
+        decode all datapoints in data at once
+
+        :param data: block of raw data, e.g. from a block read or a logged frame
+        :type data: bytes | bytearray
+        :param layout: layout as created by get_layout()
+        :type layout: DatapointLayout
+        :return: list of values in order of the layout entries
+        :rtype: list
+        """
+        return layout.decode(data)
+
 
 # S = serial
 class DT_S(DT_V):
@@ -143,6 +175,114 @@ class DT_H(DT_V):
 """
 
 
+class DatapointLayout(object):
+    """ precomputed layout for decoding blocks of numeric datapoints
+
+    Each entry describes one datapoint as (offset, length, signed, mult) with
+    the same meaning as the parameters of DT_V. Values are decoded exactly
+    like DT_V.get_shng_data() does.
+
+    If the entries don't overlap and all lengths are 1, 2, 4 or 8 bytes, the
+    whole block is decoded with a single struct.unpack_from() call, else each
+    datapoint is unpacked on its own. decode_many() decodes multiple blocks of
+    the same layout (e.g. logged frames) and uses NumPy if available.
+    """
+    _formats = {1: 'b', 2: 'h', 4: 'i', 8: 'q'}
+
+    def __init__(self, entries):
+        self.entries = tuple((int(offset), int(length), bool(signed), mult) for offset, length, signed, mult in entries)
+        self.size = max((offset + length for offset, length, signed, mult in self.entries), default=0)
+
+        # (index, mult, convert to int) for all entries with multiplier
+        self._mults = tuple((i, float(mult), isinstance(mult, int)) for i, (offset, length, signed, mult) in enumerate(self.entries) if mult)
+
+        # single struct for whole block, if possible
+        self._struct = None
+        self._order = None
+        order = sorted(range(len(self.entries)), key=lambda i: self.entries[i][0])
+        fmt = '<'
+        pos = 0
+        for i in order:
+            offset, length, signed, mult = self.entries[i]
+            if offset < pos or length not in self._formats:
+                break
+            code = self._formats[length]
+            fmt += 'x' * (offset - pos) + (code if signed else code.upper())
+            pos = offset + length
+        else:
+            self._struct = struct.Struct(fmt)
+            # position of each entry in the unpacked tuple
+            self._order = tuple(order.index(i) for i in range(len(self.entries)))
+
+        # fallback: single struct per entry, None for lengths not supported by struct
+        self._fields = tuple((struct.Struct('<' + (self._formats[length] if signed else self._formats[length].upper())) if length in self._formats else None, offset, length, signed) for offset, length, signed, mult in self.entries)
+
+        # numpy structured dtype, overlapping fields are allowed here
+        self._dtype = None
+        if np is not None and all(length in self._formats for offset, length, signed, mult in self.entries):
+            self._dtype = np.dtype({'names': [f'f{i}' for i in range(len(self.entries))],
+                                    'formats': [f'<{"i" if signed else "u"}{length}' for offset, length, signed, mult in self.entries],
+                                    'offsets': [offset for offset, length, signed, mult in self.entries],
+                                    'itemsize': self.size})
+
+    def _apply_mults(self, values):
+        for i, mult, to_int in self._mults:
+            val = round(float(values[i]) / mult, 2)
+            values[i] = int(val) if to_int else val
+        return values
+
+    def decode(self, data):
+        """
+        decode one block
+
+        :param data: raw data
+        :type data: bytes | bytearray
+        :return: list of values in order of the layout entries
+        :rtype: list
+        """
+        if len(data) < self.size:
+            raise ValueError(f'data length {len(data)} is shorter than layout size {self.size}')
+
+        if self._struct is not None:
+            unpacked = self._struct.unpack_from(data)
+            values = [unpacked[pos] for pos in self._order]
+        else:
+            values = [fmt.unpack_from(data, offset)[0] if fmt else bytes2int(data[offset:offset + length], signed) for fmt, offset, length, signed in self._fields]
+
+        return self._apply_mults(values)
+
+    def decode_many(self, blocks):
+        """
+        decode multiple blocks of the same layout
+
+        :param blocks: list of raw data blocks, each at least self.size bytes long
+        :type blocks: list
+        :return: list of value lists, one per block
+        :rtype: list
+        """
+        if self._dtype is None or not blocks:
+            return [self.decode(block) for block in blocks]
+
+        if any(len(block) < self.size for block in blocks):
+            raise ValueError(f'data shorter than layout size {self.size}')
+
+        buffer = b''.join(bytes(block[:self.size]) for block in blocks)
+        decoded = np.frombuffer(buffer, dtype=self._dtype, count=len(blocks))
+        columns = [decoded[f'f{i}'] for i in range(len(self.entries))]
+        for i, mult, to_int in self._mults:
+            columns[i] = columns[i] / mult
+        columns = [column.tolist() for column in columns]
+
+        # round in python to get exactly the same values as DT_V
+        for i, mult, to_int in self._mults:
+            if to_int:
+                columns[i] = [int(round(val, 2)) for val in columns[i]]
+            else:
+                columns[i] = [round(val, 2) for val in columns[i]]
+
+        return [list(values) for values in zip(*columns)]
+
+
 def int2bytes(value, length=0, signed=False):
     """ convert value to bytearray, see MD_Command.py """
     if not length:
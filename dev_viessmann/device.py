@@ -2,11 +2,13 @@
 # vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
 
 
+import time
+
 if MD_standalone:
-    from MD_Globals import PLUGIN_ATTR_SERIAL_PORT
+    from MD_Globals import (LATENCY_DECODE, LATENCY_ENCODE, PLUGIN_ATTR_SERIAL_PORT, PRIO_GROUP, REQUEST_DICT_COMMAND)
     from MD_Device import MD_Device
 else:
-    from ..MD_Globals import PLUGIN_ATTR_SERIAL_PORT
+    from ..MD_Globals import (LATENCY_DECODE, LATENCY_ENCODE, PLUGIN_ATTR_SERIAL_PORT, PRIO_GROUP, REQUEST_DICT_COMMAND)
     from ..MD_Device import MD_Device
 
 
@@ -16,6 +18,75 @@ class MD_Device(MD_Device):
     Standalone mode is automatic device type discovery
     """
 
+    def _read_commands(self, commands, priority=PRIO_GROUP):
+        """
+        With KW protocol, queue reading commands in sequence after syncing only
+        once. As the sequence can't be interrupted, it is queued as one job.
+        Otherwise, queue commands one by one.
+
+        :param commands: list of commands to read
+        :param priority: queue priority
+        :type commands: list
+        :type priority: int
+        """
+        if self._params.get('viess_proto') != 'KW' or len(commands) < 2:
+            return super()._read_commands(commands, priority)
+
+        self._queue_job(priority, self._read_sequence, commands, key=tuple(commands))
+
+    def _read_sequence(self, commands):
+        """
+        Read commands in sequence with KW protocol
+
+        :param commands: list of commands to read
+        :type commands: list
+        """
+        if not self.alive or not self._connection:
+            return
+
+        if not self._connection.connected():
+            self._connection.open()
+            if not self._connection.connected():
+                self.logger.warning(f'trying to read commands {commands}, but connection could not be established.')
+                return
+
+        kwargs = self._params.copy()
+        cmds = []
+        data_dicts = []
+        for cmd in commands:
+            start = time.perf_counter()
+            try:
+                data_dict = self._transform_send_data(self._commands.get_send_data(cmd, None, **kwargs), **kwargs)
+            except Exception as e:
+                self.logger.warning(f'command {cmd} produced error on creating read request, skipping. Error was: {e}')
+            else:
+                self._latency.record(cmd, LATENCY_ENCODE, time.perf_counter() - start)
+                # identify command for wire latency
+                data_dict[REQUEST_DICT_COMMAND] = cmd
+                data_dicts.append(data_dict)
+                cmds.append(cmd)
+
+        self.logger.debug(f'reading commands {cmds} in sequence')
+        try:
+            results = self._connection.send_sequence(data_dicts)
+        except OSError as e:
+            self.logger.debug(f'error on reading commands {cmds}, error was {e}')
+            return
+
+        for cmd, result in zip(cmds, results):
+            if result:
+                start = time.perf_counter()
+                try:
+                    value = self._commands.get_shng_data(cmd, result, **kwargs)
+                    self._latency.record(cmd, LATENCY_DECODE, time.perf_counter() - start)
+                except Exception as e:
+                    self.logger.info(f'command {cmd} received result {result}, error {e} occurred while converting. Discarding result.')
+                else:
+                    self.logger.debug(f'command {cmd} received result {result}, converted to value {value}')
+                    self._observe_value(cmd, value)
+                    if self._data_received_callback:
+                        self._data_received_callback(self.device_id, cmd, value, None)
+
 #
 # methods for standalone mode
 #
@@ -152,7 +223,7 @@ class MD_Device(MD_Device):
         # first, initialize Viessmann object for use
         self.alive = True
         self._params['viess_proto'] = protocol
-        self._get_connection()
+        self._connection = self._get_connection()
         self.set_runtime_data(callback=self._cb_standalone)
 
         err = None
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+#
+# check selection of asyncio connection classes
+#
+# run from SmartHomeNG base directory:
+#
+#   python3 -m unittest plugins/multidevice/tests/test_aio_connection.py
+
+import importlib
+import os
+import sys
+import unittest
+
+BASE = os.path.sep.join(os.path.abspath(__file__).split(os.path.sep)[:-4])
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+from plugins.multidevice import MD_Connection
+
+
+def get_device(device_type, device_id, **kwargs):
+    """ return device instance of device_type """
+    device_module = importlib.import_module(f'plugins.multidevice.dev_{device_type}.device')
+    return device_module.MD_Device(device_type, device_id, **kwargs)
+
+
+class TestAioConnection(unittest.TestCase):
+
+    def setUp(self):
+        # device.yaml is read relative to SmartHomeNG base directory
+        self._cwd = os.getcwd()
+        os.chdir(BASE)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+
+    def test_musiccast_asyncio(self):
+        device = get_device('musiccast', 'mc_aio', host='127.0.0.1', asyncio=True)
+        self.assertFalse(device.disabled)
+        self.assertIsInstance(device._get_connection(), MD_Connection.MD_Connection_Aio_Net_Udp_Request)
+
+    def test_musiccast_threaded(self):
+        device = get_device('musiccast', 'mc_thread', host='127.0.0.1')
+        self.assertFalse(device.disabled)
+        connection = device._get_connection()
+        self.assertIsInstance(connection, MD_Connection.MD_Connection_Net_Udp_Request)
+        self.assertNotIsInstance(connection, MD_Connection.MD_Connection_Aio)
+
+
+if __name__ == '__main__':
+    unittest.main()
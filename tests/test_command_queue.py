@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+#
+# check priority command queue of devices
+#
+# run from SmartHomeNG base directory:
+#
+#   python3 -m unittest plugins/multidevice/tests/test_command_queue.py
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+BASE = os.path.sep.join(os.path.abspath(__file__).split(os.path.sep)[:-4])
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+from plugins.multidevice.MD_Device import MD_Device
+from plugins.multidevice.MD_Globals import PRIO_CYCLIC, PRIO_GROUP
+
+TIMEOUT = 5
+
+
+class TestCommandQueue(unittest.TestCase):
+
+    def setUp(self):
+        # device.yaml is read relative to SmartHomeNG base directory
+        self._cwd = os.getcwd()
+        os.chdir(BASE)
+
+        self.device = MD_Device('example', 'queue')
+        self.device.send_command = self.send_command
+        self.sent = []
+
+        # block queue worker until released
+        self.blocked = threading.Event()
+        self.release = threading.Event()
+
+        self.device.alive = True
+        self.device._start_queue_worker()
+
+    def tearDown(self):
+        self.release.set()
+        self.device.stop()
+        os.chdir(self._cwd)
+
+    def send_command(self, command, value=None, **kwargs):
+        """ record commands instead of sending """
+        self.sent.append((command, value))
+        return True
+
+    def block_worker(self):
+        """ occupy queue worker until self.release is set """
+        def block():
+            self.blocked.set()
+            self.release.wait(TIMEOUT)
+            return True
+
+        self.device._queue_job(PRIO_CYCLIC, block)
+        self.assertTrue(self.blocked.wait(TIMEOUT))
+
+    def wait_sent(self):
+        """ wait for all jobs queued until now """
+        self.assertTrue(self.device.queue_command('done', priority=PRIO_CYCLIC + 1, wait=True))
+        return self.sent[:-1]
+
+    def test_write_preempts_reads(self):
+        self.block_worker()
+        self.device.queue_command('cmd1', priority=PRIO_CYCLIC)
+        self.device.queue_command('cmd2', priority=PRIO_GROUP)
+        self.device.queue_command('cmd1', 42)
+        self.release.set()
+        self.assertEqual(self.wait_sent(), [('cmd1', 42), ('cmd2', None), ('cmd1', None)])
+
+    def test_duplicate_read(self):
+        self.block_worker()
+        self.assertTrue(self.device.queue_command('cmd1', priority=PRIO_CYCLIC))
+        self.assertTrue(self.device.queue_command('cmd1', priority=PRIO_CYCLIC))
+        self.assertTrue(self.device.queue_command('cmd1', priority=PRIO_GROUP))
+
+        # writes are never suppressed
+        self.device.queue_command('cmd1', 1)
+        self.device.queue_command('cmd1', 1)
+        self.release.set()
+        self.assertEqual(self.wait_sent(), [('cmd1', 1), ('cmd1', 1), ('cmd1', None)])
+
+        # read can be queued again after it was sent
+        self.sent = []
+        self.device.queue_command('cmd1', priority=PRIO_CYCLIC)
+        self.assertEqual(self.wait_sent(), [('cmd1', None)])
+
+    def test_wait_returns_after_stop(self):
+        self.block_worker()
+        results = []
+        waiting = threading.Thread(target=lambda: results.append(self.device.queue_command('cmd1', 1, wait=True)))
+        waiting.start()
+
+        # stop while the write is waiting in queue
+        deadline = time.time() + TIMEOUT
+        while self.device._queue.empty() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(self.device._queue.empty())
+        self.device.stop()
+        waiting.join(TIMEOUT)
+        self.assertFalse(waiting.is_alive())
+        self.assertEqual(results, [False])
+        self.assertEqual(self.sent, [])
+
+    def test_callback_after_stop(self):
+        self.device.stop()
+        results = []
+        self.assertFalse(self.device.queue_command('cmd1', 1, callback=results.append))
+        self.assertEqual(results, [False])
+        self.assertEqual(self.sent, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
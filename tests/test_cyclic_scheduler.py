@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+#
+# check cyclic read scheduling from the deadline heap
+#
+# run from SmartHomeNG base directory:
+#
+#   python3 -m unittest plugins/multidevice/tests/test_cyclic_scheduler.py
+
+import heapq
+import os
+import sys
+import unittest
+from unittest import mock
+
+BASE = os.path.sep.join(os.path.abspath(__file__).split(os.path.sep)[:-4])
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+from plugins.multidevice.MD_Device import MD_Device
+from plugins.multidevice.MD_Globals import PLUGIN_ATTR_ADAPTIVE, PRIO_CYCLIC
+
+NOW = 1000.0
+
+
+class Connection(object):
+    """ connection stub, always connected """
+
+    def connected(self):
+        return True
+
+
+class TestCyclicScheduler(unittest.TestCase):
+
+    def setUp(self):
+        # device.yaml is read relative to SmartHomeNG base directory
+        self._cwd = os.getcwd()
+        os.chdir(BASE)
+
+        self.device = MD_Device('example', 'cyclic')
+        self.device.alive = True
+        self.device._connection = Connection()
+        self.device._commands_cyclic = {'cmd1': {'cycle': 10, 'next': 0}, 'cmd2': {'cycle': 10, 'next': 0}}
+        self.device._triggers_cyclic = {}
+
+        # record reads instead of queueing them
+        self.reads = []
+        self.device._read_commands = lambda commands, priority: self.reads.append((list(commands), priority))
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+
+    def set_heap(self, *entries):
+        """ set cyclic heap from (due, command) tuples """
+        self.device._cyclic_heap = [[due, seq, False, cmd] for seq, (due, cmd) in enumerate(entries)]
+        heapq.heapify(self.device._cyclic_heap)
+
+    def read_at(self, currenttime):
+        """ run cyclic read at currenttime, return read commands """
+        self.reads = []
+        with mock.patch('time.time', return_value=currenttime):
+            self.device._read_cyclic_values()
+        return [cmd for commands, priority in self.reads for cmd in commands]
+
+    def next_due(self, command):
+        return self.device._commands_cyclic[command]['next']
+
+    def test_only_due_entries(self):
+        self.set_heap((NOW - 1, 'cmd1'), (NOW + 5, 'cmd2'))
+        self.assertEqual(self.read_at(NOW), ['cmd1'])
+        self.assertEqual(self.reads[0][1], PRIO_CYCLIC)
+
+        # cmd1 keeps its phase, cmd2 is untouched
+        self.assertEqual(self.next_due('cmd1'), NOW + 9)
+        self.assertEqual(sorted(entry[0] for entry in self.device._cyclic_heap), [NOW + 5, NOW + 9])
+
+        self.assertEqual(self.read_at(NOW + 4), [])
+        self.assertEqual(self.read_at(NOW + 5), ['cmd2'])
+
+    def test_no_catch_up(self):
+        # three cycles missed, read only once and reschedule from now
+        self.set_heap((NOW - 25, 'cmd1'), (NOW + 5, 'cmd2'))
+        self.assertEqual(self.read_at(NOW), ['cmd1'])
+        self.assertEqual(self.next_due('cmd1'), NOW + 10)
+        self.assertEqual(self.read_at(NOW + 1), [])
+
+    def test_phases(self):
+        self.device._commands_cyclic['cmd3'] = {'cycle': 20, 'next': 0}
+        heap = self.device._get_cyclic_heap(NOW)
+        dues = sorted(entry[0] for entry in heap)
+
+        # entries are spread over their cycle, first entries of both cycles don't coincide
+        self.assertEqual(len(set(dues)), 3)
+        self.assertEqual(dues[0], NOW)
+        self.assertTrue(all(NOW <= due < NOW + 20 for due in dues))
+
+    def test_adaptive(self):
+        self.device._params[PLUGIN_ATTR_ADAPTIVE] = 40
+        self.device._commands_cyclic = {'cmd1': {'cycle': 10, 'next': 0}}
+
+        # first read and first value
+        self.set_heap((NOW, 'cmd1'))
+        self.assertEqual(self.read_at(NOW), ['cmd1'])
+        self.device._observe_value('cmd1', 1)
+
+        # unchanged value doubles interval
+        self.assertEqual(self.read_at(NOW + 10), ['cmd1'])
+        self.device._observe_value('cmd1', 1)
+        self.assertEqual(self.device._cyclic_adaptive['cmd1']['interval'], 20)
+
+        # skipped, but rescheduled with configured cycle
+        self.assertEqual(self.read_at(NOW + 20), [])
+        self.assertEqual(self.next_due('cmd1'), NOW + 30)
+        self.assertEqual(self.read_at(NOW + 30), ['cmd1'])
+
+        # changed value resets interval
+        self.device._observe_value('cmd1', 2)
+        self.assertEqual(self.device._cyclic_adaptive['cmd1']['interval'], 10)
+        self.assertEqual(self.read_at(NOW + 40), ['cmd1'])
+
+    def test_adaptive_max(self):
+        self.device._params[PLUGIN_ATTR_ADAPTIVE] = 30
+        self.device._commands_cyclic = {'cmd1': {'cycle': 10, 'next': 0}}
+        self.device._is_adaptive_due('cmd1', NOW)
+        for i in range(5):
+            self.device._observe_value('cmd1', 1)
+        self.assertEqual(self.device._cyclic_adaptive['cmd1']['interval'], 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+#
+# measure memory used by MD_Command objects of a device type
+#
+# usage (from plugin directory):
+#
+#   tools/bench_command_memory.py [device_type [model [command_class]]]
+#
+# e.g. tools/bench_command_memory.py viessmann V200KW2 MD_Command_Viessmann
+#
+# The plugin package is imported without running __init__.py, the
+# SmartHomeNG base directory is added to the module search path for lib.*
+#
+# For comparison, the same commands are also created as baseline objects with
+# the former command layout: attributes in the instance dict, logger stored
+# per instance and one datatype instance per command.
+
+import builtins
+import gc
+import logging
+import importlib
+import os
+import sys
+import tracemalloc
+import types
+
+builtins.MD_standalone = False
+
+plugin_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(plugin_dir)))
+
+pkg = types.ModuleType('multidevice')
+pkg.__path__ = [plugin_dir]
+sys.modules['multidevice'] = pkg
+
+MD_Globals = importlib.import_module('multidevice.MD_Globals')
+MD_Command = importlib.import_module('multidevice.MD_Command')
+MD_Commands = importlib.import_module('multidevice.MD_Commands')
+
+
+class BaselineCommand(object):
+    """ former MD_Command layout without __slots__ and shared datatypes """
+
+    def __init__(self, device_id, command, dt_class, **kwargs):
+        self.logger = logging.getLogger(f'multidevice.{device_id}')
+        self.device_id = device_id
+        self.name = command
+        self._plugin_params = kwargs['plugin']
+        for arg in MD_Globals.COMMAND_PARAMS:
+            if kwargs['cmd'].get(arg, None):
+                setattr(self, arg, kwargs['cmd'][arg])
+        self._DT = dt_class()
+
+
+def measure(create):
+    """ return bytes allocated by create() and kept afterwards """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = create()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+    return sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+
+device_type = sys.argv[1] if len(sys.argv) > 1 else 'viessmann'
+model = sys.argv[2] if len(sys.argv) > 2 else None
+cls = getattr(MD_Command, sys.argv[3] if len(sys.argv) > 3 else 'MD_Command')
+
+commands = MD_Commands.MD_Commands(device_type, 'bench', cls, model=model)
+
+# recreate command definitions from loaded commands
+compiled = {}
+dt_classes = {}
+for name, cmd in commands._commands.items():
+    compiled[name] = {attr: getattr(cmd, attr) for attr in MD_Globals.COMMAND_PARAMS if getattr(cmd, attr, None)}
+    dt_classes[name] = type(cmd._DT)
+
+count = len(compiled)
+if not count:
+    print(f'no commands found for device type {device_type}')
+    sys.exit(1)
+
+old_commands = commands._commands
+commands._commands = {}
+
+plugin = {}
+baseline = measure(lambda: [BaselineCommand('bench', name, dt_classes[name], cmd=kw, plugin=plugin) for name, kw in compiled.items()])
+total = measure(lambda: commands._build_commands(compiled))
+
+print(f'device type {device_type}, model {model}, command class {cls.__name__}')
+print(f'baseline: {count} commands, {baseline} bytes, {baseline / count:.0f} bytes per command')
+print(f'current:  {count} commands, {total} bytes, {total / count:.0f} bytes per command')
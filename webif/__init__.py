@@ -129,6 +129,18 @@ class WebInterface(SmartPluginWebIf):
         cherrypy.response.headers['Content-Type'] = 'application/json'
         return json.dumps(data).encode('utf-8')
 
+    @cherrypy.expose
+    def latency(self, device=None, command=None):
+        """
+        Return latency statistics as JSON
+
+        :param device: device id, return all devices if None
+        :param command: command name, return all commands if None
+        :return: JSON dict of {device_id: {command: {phase: histogram dict}}}
+        """
+        cherrypy.response.headers['Content-Type'] = 'application/json'
+        return json.dumps(self.plugin.get_latency_stats(device, command)).encode('utf-8')
+
     @cherrypy.expose
     def get_data_html(self, dataSet=None):
         """